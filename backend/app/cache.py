@@ -1,43 +1,150 @@
 from __future__ import annotations
 
+import threading
 import time
-from typing import Any, Dict, Tuple, Optional
+from collections import OrderedDict
+from typing import Any, Optional
 
 from .config import settings
 
 
+class _CacheShard:
+    """One independently locked slice of SimpleCache (hot/warm generations)."""
+
+    __slots__ = ("hot", "warm", "epoch", "lock", "max_entries")
+
+    def __init__(self, max_entries: int, now: float) -> None:
+        self.hot: OrderedDict[int, Any] = OrderedDict()
+        self.warm: OrderedDict[int, Any] = OrderedDict()
+        self.epoch = now
+        self.lock = threading.Lock()
+        self.max_entries = max_entries
+
+    def __len__(self) -> int:
+        return len(self.hot) + len(self.warm)
+
+    def lookup(self, key: int) -> Optional[Any]:
+        hot = self.hot
+        if key in hot:
+            hot.move_to_end(key)
+            return hot[key]
+        # Warm hits are not promoted: that would extend their lifetime past the TTL
+        return self.warm.get(key)
+
+    def insert(self, key: int, value: Any) -> None:
+        hot = self.hot
+        self.warm.pop(key, None)
+        hot[key] = value
+        hot.move_to_end(key)
+        if len(hot) + len(self.warm) > self.max_entries:
+            # The warm generation is older than anything in hot, so evict from it first
+            if self.warm:
+                self.warm.popitem(last=False)
+            else:
+                hot.popitem(last=False)
+
+    def rotate(self, now: float, ttl: float) -> int:
+        window = ttl / 2
+        elapsed = now - self.epoch
+        if window > 0 and elapsed < window:
+            return 0
+
+        dropped = len(self.warm)
+        if window <= 0 or elapsed >= 2 * window:
+            # Both generations are past the TTL
+            dropped += len(self.hot)
+            self.warm = OrderedDict()
+        else:
+            self.warm = self.hot
+        self.hot = OrderedDict()
+        # Advance by whole windows so generations stay aligned to window
+        # boundaries; restarting at `now` would let entries outlive the TTL
+        if window > 0:
+            self.epoch += (elapsed // window) * window
+        else:
+            self.epoch = now
+        return dropped
+
+
 class SimpleCache:
     """
-    Minimal in-memory cache keyed by (fen, depth).
+    Minimal in-memory LRU cache keyed by (fen, depth).
+    Bounded to ``max_entries``; the least recently used entry is evicted first.
     Intended as a drop-in placeholder for a future Redis-based cache.
+
+    Expiry is generational rather than per entry: time is split into
+    windows of half a TTL, new entries go into the ``hot`` generation, which
+    becomes ``warm`` at the next window boundary, and the warm generation is
+    dropped wholesale at the boundary after that. An entry is therefore
+    never returned once it is ttl old (it is dropped somewhere between ttl/2
+    and ttl after insertion) without storing a timestamp per entry.
+
+    The store is split into ``shards`` (a power of two) slices, each with its
+    own lock, so concurrent requests rarely contend. Capacity and LRU order
+    are tracked per shard.
     """
 
-    def __init__(self) -> None:
-        self._store: Dict[Tuple[str, int], Tuple[float, Any]] = {}
+    def __init__(self, max_entries: Optional[int] = None, shards: int = 16) -> None:
+        if shards < 1 or shards & (shards - 1):
+            raise ValueError(f"shards must be a power of two, got {shards}")
         self.ttl_seconds = 300  # 5 minutes
+        self.sweep_interval = 512  # writes between expiry sweeps
+        self._writes = 0
+        self.max_entries = settings.CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        per_shard = max(1, -(-self.max_entries // shards))
+        now = time.monotonic()
+        self._shards = [_CacheShard(per_shard, now) for _ in range(shards)]
+        self._shard_mask = shards - 1
+
+    def make_key(self, fen: str, depth: int) -> int:
+        """
+        Pre-hash (fen, depth) into a single 64-bit int.
 
-    def make_key(self, fen: str, depth: int) -> Tuple[str, int]:
-        return fen, depth
+        The depth is folded into the top byte so lookups hash one int instead
+        of a (str, int) tuple. Keys can collide, so entries also store the
+        (fen, depth) they were written for and get() checks it.
+        """
+        return hash(fen) ^ ((depth & 0xFF) << 56)
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
 
     def get(self, fen: str, depth: int) -> Optional[Any]:
         if not settings.CACHE_ENABLED:
             return None
 
         key = self.make_key(fen, depth)
-        item = self._store.get(key)
-        if not item:
-            return None
-        ts, value = item
-        if time.time() - ts > self.ttl_seconds:
-            self._store.pop(key, None)
+        shard = self._shards[key & self._shard_mask]
+        with shard.lock:
+            shard.rotate(time.monotonic(), self.ttl_seconds)
+            entry = shard.lookup(key)
+        if entry is None or entry[0] != fen or entry[1] != depth:
             return None
-        return value
+        return entry[2]
 
     def set(self, fen: str, depth: int, value: Any) -> None:
         if not settings.CACHE_ENABLED:
             return
         key = self.make_key(fen, depth)
-        self._store[key] = (time.time(), value)
+        shard = self._shards[key & self._shard_mask]
+        with shard.lock:
+            shard.rotate(time.monotonic(), self.ttl_seconds)
+            shard.insert(key, (fen, depth, value))
+
+        # Shards that are never read again still release expired entries
+        self._writes += 1
+        if self._writes % self.sweep_interval == 0:
+            self.evict_expired()
+
+    def evict_expired(self) -> int:
+        """Rotate generations where due; returns the number of entries dropped."""
+        now = time.monotonic()
+        ttl = self.ttl_seconds
+        dropped = 0
+        for shard in self._shards:
+            with shard.lock:
+                dropped += shard.rotate(now, ttl)
+        return dropped
 
 
 cache = SimpleCache()
@@ -14,6 +14,9 @@ class Settings:
         self.ALLOW_CORS: bool = os.getenv("BF_ALLOW_CORS", "true").lower() == "true"
         self.ENGINE_POOL_SIZE: int = int(os.getenv("BF_ENGINE_POOL_SIZE", "1"))
         self.CACHE_ENABLED: bool = os.getenv("BF_CACHE_ENABLED", "false").lower() == "true"
+        self.CACHE_MAX_ENTRIES: int = int(os.getenv("BF_CACHE_MAX", "10000"))
+        self.REDIS_URL: str | None = os.getenv("BF_REDIS_URL")  # unset: in-process session store
+        self.SESSION_TTL_SECONDS: int = int(os.getenv("BF_SESSION_TTL", "86400"))  # Redis expiry, refreshed on write
 
 
 settings = Settings()
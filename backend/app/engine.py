@@ -16,6 +16,7 @@ regardless of whether the underlying backend uses CPU or GPU.
 from __future__ import annotations
 
 from dataclasses import dataclass
+from itertools import starmap
 from typing import Sequence, Tuple, List
 
 import numpy as np
@@ -28,16 +29,20 @@ except Exception:
 # Internal core engine
 from .engine_core.backend import xp, GPU  # noqa: F401  (GPU info may be useful elsewhere)
 from .engine_core.engine_batch import (
-    compute_attack_maps_batch as _core_compute_attack_maps_batch,
-    evaluate_batch as _core_evaluate_batch,
+    compute_attack_bitboards_batch as _core_compute_attack_bitboards_batch,
+    unpack_bitboards,
+    evaluate_batch_host as _core_evaluate_batch_host,
     generate_moves_batch as _core_generate_moves_batch,
 )
+from .engine_core.engine_cpu import EngineCPU
 from .engine_core.moves import (
     MOVE_IDX,
     MOVE_FROM,
     MOVE_TO,
     MOVE_PROMO,
     MOVE_FLAGS,
+    pack_moves,
+    unpack_moves,
 )
 
 
@@ -86,14 +91,49 @@ class SingleMove:
 # Internal helpers
 # =====================================================================
 
-def _to_numpy(arr) -> np.ndarray:
-    """Convert xp/NumPy/CuPy array to a NumPy ndarray."""
-    if isinstance(arr, np.ndarray):
+# Core move rows are laid out in Move field order, and SingleMove is the same
+# minus the leading board index, so rows convert through plain slice views.
+assert (MOVE_IDX, MOVE_FROM, MOVE_TO, MOVE_PROMO, MOVE_FLAGS) == (0, 1, 2, 3, 4)
+
+
+# The backend is fixed at import time, so bind the matching converter once
+# instead of probing for CuPy on every call.
+if GPU:
+    def _to_numpy(arr) -> np.ndarray:
+        """Convert a CuPy (or NumPy) array to a NumPy ndarray."""
+        if isinstance(arr, cp.ndarray):  # type: ignore[union-attr]
+            return cp.asnumpy(arr)  # type: ignore[union-attr]
+        return np.asarray(arr)
+
+    def _moves_to_numpy(moves, n_boards: int) -> np.ndarray:
+        """
+        Copy a (M,5) int16 device move array to the host as packed integers
+        (4 bytes per move instead of 10 for batches up to 4096 boards) and
+        unpack it there.
+        """
+        if moves.shape[0] == 0:
+            return np.zeros((0, 5), dtype=np.int16)
+        return unpack_moves(cp.asnumpy(pack_moves(moves, n_boards)))  # type: ignore[union-attr]
+else:
+    def _to_numpy(arr) -> np.ndarray:
+        """Backend arrays are already NumPy; np.asarray does not copy them."""
+        return np.asarray(arr)
+
+    def _moves_to_numpy(moves, n_boards: int) -> np.ndarray:
+        """Move arrays are already NumPy rows; nothing to transfer."""
+        return np.asarray(moves)
+
+
+def _to_backend(arr: np.ndarray):
+    """
+    Move a normalized int8 NumPy array to the backend array type.
+
+    On the CPU backend a contiguous int8 array is already in the right form
+    and is returned as-is instead of going through another asarray call.
+    """
+    if xp is np and arr.dtype == np.int8 and arr.flags.c_contiguous:
         return arr
-    if cp is not None and isinstance(arr, cp.ndarray):  # type: ignore[attr-defined]
-        return cp.asnumpy(arr)  # type: ignore[call-arg]
-    # Fallback
-    return np.asarray(arr)
+    return xp.asarray(arr, dtype=xp.int8)
 
 
 def _normalize_board_batch(
@@ -108,6 +148,18 @@ def _normalize_board_batch(
         - (N,64)     → batch
         - any Sequence-of-Sequences convertible to np.ndarray
     """
+    # Fast path: already-normalized (N,64) int8 batches pass straight through
+    if (
+        isinstance(piece, np.ndarray)
+        and isinstance(color, np.ndarray)
+        and piece.dtype == np.int8
+        and color.dtype == np.int8
+        and piece.ndim == 2
+        and piece.shape[1] == 64
+        and piece.shape == color.shape
+    ):
+        return piece, color
+
     piece_np = np.asarray(piece, dtype=np.int8)
     color_np = np.asarray(color, dtype=np.int8)
 
@@ -178,15 +230,8 @@ def evaluate_position_single(
         All fields are Python ints.
     """
     piece_batch, color_batch = _normalize_board_batch(piece, color)  # → (1,64)
-    # Move to backend array type
-    piece_xp = xp.asarray(piece_batch, dtype=xp.int8)
-    color_xp = xp.asarray(color_batch, dtype=xp.int8)
 
-    wo_xp, wd_xp, bo_xp, bd_xp = _core_evaluate_batch(piece_xp, color_xp)
-    wo = int(_to_numpy(wo_xp)[0])
-    wd = int(_to_numpy(wd_xp)[0])
-    bo = int(_to_numpy(bo_xp)[0])
-    bd = int(_to_numpy(bd_xp)[0])
+    wo, wd, bo, bd = (int(s[0]) for s in _core_evaluate_batch_host(piece_batch, color_batch))
 
     return Evaluation(white_off=wo, white_def=wd, black_off=bo, black_def=bd)
 
@@ -207,17 +252,11 @@ def evaluate_position_batch(
         of shape (N,) each.
     """
     piece_np, color_np = _normalize_board_batch(piece_batch, color_batch)
-    piece_xp = xp.asarray(piece_np, dtype=xp.int8)
-    color_xp = xp.asarray(color_np, dtype=xp.int8)
 
-    wo_xp, wd_xp, bo_xp, bd_xp = _core_evaluate_batch(piece_xp, color_xp)
+    # Host in, host out: the core stages GPU transfers through pinned memory
+    wo, wd, bo, bd = _core_evaluate_batch_host(piece_np, color_np)
 
-    return BatchedEvaluation(
-        white_off=_to_numpy(wo_xp),
-        white_def=_to_numpy(wd_xp),
-        black_off=_to_numpy(bo_xp),
-        black_def=_to_numpy(bd_xp),
-    )
+    return BatchedEvaluation(white_off=wo, white_def=wd, black_off=bo, black_def=bd)
 
 
 # =====================================================================
@@ -235,11 +274,12 @@ def attack_maps_batch(
         (white_att, black_att) each as NumPy bool array of shape (N,64).
     """
     piece_np, color_np = _normalize_board_batch(piece_batch, color_batch)
-    piece_xp = xp.asarray(piece_np, dtype=xp.int8)
-    color_xp = xp.asarray(color_np, dtype=xp.int8)
+    piece_xp = _to_backend(piece_np)
+    color_xp = _to_backend(color_np)
 
-    w_xp, b_xp = _core_compute_attack_maps_batch(piece_xp, color_xp)
-    return _to_numpy(w_xp), _to_numpy(b_xp)
+    # Transfer packed bitboards (8 bytes per board) and expand on the host
+    w_xp, b_xp = _core_compute_attack_bitboards_batch(piece_xp, color_xp)
+    return unpack_bitboards(_to_numpy(w_xp)), unpack_bitboards(_to_numpy(b_xp))
 
 
 def attack_maps_single(
@@ -252,8 +292,13 @@ def attack_maps_single(
     Returns:
         (white_att[64], black_att[64]) as NumPy bool arrays.
     """
-    w_batch, b_batch = attack_maps_batch(piece, color)
-    return w_batch[0], b_batch[0]
+    piece_np, color_np = _normalize_board_batch(piece, color)
+    piece_xp = _to_backend(piece_np)
+    color_xp = _to_backend(color_np)
+
+    # Only the two packed bitboards are transferred
+    w_xp, b_xp = _core_compute_attack_bitboards_batch(piece_xp, color_xp)
+    return unpack_bitboards(_to_numpy(w_xp))[0], unpack_bitboards(_to_numpy(b_xp))[0]
 
 
 # =====================================================================
@@ -279,22 +324,19 @@ def generate_moves_single(
     piece_np, color_np = _normalize_board_batch(piece, color)  # (1,64)
     stm_batch = _normalize_stm_batch(stm, N=1)
 
-    piece_xp = xp.asarray(piece_np, dtype=xp.int8)
-    color_xp = xp.asarray(color_np, dtype=xp.int8)
-    stm_xp = xp.asarray(stm_batch, dtype=xp.int8)
+    piece_xp = _to_backend(piece_np)
+    color_xp = _to_backend(color_np)
+    stm_xp = _to_backend(stm_batch)
 
     moves_xp = _core_generate_moves_batch(piece_xp, color_xp, stm_xp)
-    moves_np = _to_numpy(moves_xp)  # shape (M,5)
+    moves_np = _moves_to_numpy(moves_xp, 1)  # shape (M,5)
+    if moves_np.shape[0] == 0:
+        return []
 
-    out: List[SingleMove] = []
-    for row in moves_np:
-        # row[B_MOVE_IDX] is always 0 in single-position use
-        from_sq = int(row[MOVE_FROM])
-        to_sq = int(row[MOVE_TO])
-        promo = int(row[MOVE_PROMO])
-        flags = int(row[MOVE_FLAGS])
-        out.append(SingleMove(from_sq=from_sq, to_sq=to_sq, promo=promo, flags=flags))
-    return out
+    # MOVE_IDX is always 0 in single-position use. One tolist() call converts
+    # every cell to a Python int instead of unwrapping NumPy scalars per field.
+    rows = moves_np[:, MOVE_FROM:].tolist()
+    return list(starmap(SingleMove, rows))
 
 
 def generate_moves_batch(
@@ -317,30 +359,17 @@ def generate_moves_batch(
     N = piece_np.shape[0]
     stm_np = _normalize_stm_batch(stm_batch, N=N)
 
-    piece_xp = xp.asarray(piece_np, dtype=xp.int8)
-    color_xp = xp.asarray(color_np, dtype=xp.int8)
-    stm_xp = xp.asarray(stm_np, dtype=xp.int8)
+    piece_xp = _to_backend(piece_np)
+    color_xp = _to_backend(color_np)
+    stm_xp = _to_backend(stm_np)
 
     moves_xp = _core_generate_moves_batch(piece_xp, color_xp, stm_xp)
-    moves_np = _to_numpy(moves_xp)
-
-    out: List[Move] = []
-    for row in moves_np:
-        idx = int(row[MOVE_IDX])
-        from_sq = int(row[MOVE_FROM])
-        to_sq = int(row[MOVE_TO])
-        promo = int(row[MOVE_PROMO])
-        flags = int(row[MOVE_FLAGS])
-        out.append(
-            Move(
-                board_idx=idx,
-                from_sq=from_sq,
-                to_sq=to_sq,
-                promo=promo,
-                flags=flags,
-            )
-        )
-    return out
+    moves_np = _moves_to_numpy(moves_xp, N)
+    if moves_np.shape[0] == 0:
+        return []
+
+    rows = moves_np.tolist()
+    return list(starmap(Move, rows))
 
 
 # =====================================================================
@@ -352,3 +381,22 @@ def backend_name() -> str:
     if GPU:
         return "GPU (CuPy)"
     return "CPU (NumPy + Numba)"
+
+
+def warmup() -> None:
+    """
+    Run every public entry point once on a tiny position.
+
+    Numba loads (or compiles) each kernel on its first call in a process;
+    calling this at startup moves that cost out of the first request.
+    """
+    piece = np.zeros(64, dtype=np.int8)
+    color = np.full(64, -1, dtype=np.int8)
+    piece[[4, 12, 60]] = (6, 1, 6)  # Ke1, e2 pawn, Ke8
+    color[[4, 12, 60]] = (0, 0, 1)
+
+    evaluate_position_batch(piece, color)
+    attack_maps_batch(piece, color)
+    generate_moves_batch(piece, color, 0)
+    # The opponent router calls the single-board CPU evaluator directly
+    EngineCPU.evaluate(piece, color)
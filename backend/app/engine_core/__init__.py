@@ -9,16 +9,22 @@ Public API:
     - GPU: Boolean indicating if GPU is available
     - Engine: Single-board engine class (CPU or GPU)
     - compute_attack_maps_batch: Batch attack map computation
+    - compute_attack_bitboards_batch: Batch attack maps as packed uint64 bitboards
+    - unpack_bitboards: Expand (N,) bitboards into (N, 64) bool maps
     - evaluate_batch: Batch position evaluation
     - generate_moves_batch: Batch move generation
+    - Position: Mutable single board with incremental make/unmake
 """
 
 from .backend import xp, GPU, Engine
 from .engine_batch import (
     compute_attack_maps_batch,
+    compute_attack_bitboards_batch,
+    unpack_bitboards,
     evaluate_batch,
     generate_moves_batch,
 )
+from .position import Position
 from .moves import (
     MOVE_IDX,
     MOVE_FROM,
@@ -32,8 +38,11 @@ __all__ = [
     "GPU",
     "Engine",
     "compute_attack_maps_batch",
+    "compute_attack_bitboards_batch",
+    "unpack_bitboards",
     "evaluate_batch",
     "generate_moves_batch",
+    "Position",
     "MOVE_IDX",
     "MOVE_FROM",
     "MOVE_TO",
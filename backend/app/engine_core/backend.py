@@ -45,12 +45,20 @@ if not GPU:
 # 3. Load the appropriate engine implementation
 # ================================================================
 if GPU:
-    from .engine_gpu import EngineGPU as Engine
-else:
+    try:
+        # engine_gpu compiles its CUDA kernels at import; if that fails
+        # (e.g. NVRTC missing), run on the CPU rather than not at all
+        from .engine_gpu import EngineGPU as Engine
+    except Exception:
+        import numpy as np
+        xp = np
+        GPU = False
+
+if not GPU:
     from .engine_cpu import EngineCPU as Engine
 
 # ================================================================
-# 4. Developer-friendly printout
+# 4. Developer-friendly description (call explicitly; nothing runs at import)
 # ================================================================
 def backend_info():
     if GPU:
@@ -64,5 +72,3 @@ def backend_info():
             return "Backend: GPU (CuPy) - Unknown GPU"
     else:
         return "Backend: CPU (NumPy + Numba)"
-
-print(backend_info())
@@ -0,0 +1,112 @@
+# coalesce.py
+"""
+Coalesce many single-board requests into one batch call.
+
+Search code tends to ask for one evaluation per tree expansion. Launching a
+batch kernel for N=1 costs nearly as much as for N=512, so concurrent
+callers submit boards here and a worker thread flushes them as one batch,
+either when BATCH_MAX boards are waiting or FLUSH_US after the first one
+arrived.
+"""
+
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+
+import numpy as np
+
+BATCH_MAX = 512
+FLUSH_US = 100
+
+
+def _host(arr):
+    """Host view of an array; CuPy arrays are fetched in one transfer."""
+    return arr.get() if hasattr(arr, 'get') else np.asarray(arr)
+
+
+class BatchCoalescer:
+    """
+    Queue (piece_arr, color_arr) boards and resolve each with its slice of
+    one `batch_fn(piece_batch, color_batch)` call.
+
+    `batch_fn` must return a tuple of (N,) arrays; each Future resolves to a
+    tuple of Python scalars, one per output, in the same shape as the
+    single-board Engine methods return.
+    """
+
+    def __init__(self, batch_fn, batch_max: int = BATCH_MAX, flush_us: int = FLUSH_US) -> None:
+        self._batch_fn = batch_fn
+        self._batch_max = batch_max
+        self._flush_s = flush_us / 1e6
+        self._pending = []
+        self._first_at = 0.0
+        self._cond = threading.Condition(threading.Lock())
+        self._worker = None
+
+    def submit(self, piece_arr, color_arr) -> Future:
+        future = Future()
+        with self._cond:
+            if self._worker is None:
+                # Started on first use so importing the engine spawns no threads
+                self._worker = threading.Thread(
+                    target=self._run, name="batch-coalescer", daemon=True
+                )
+                self._worker.start()
+            if not self._pending:
+                self._first_at = time.monotonic()
+            self._pending.append((piece_arr, color_arr, future))
+            if len(self._pending) == 1 or len(self._pending) >= self._batch_max:
+                self._cond.notify()
+        return future
+
+    def _take_batch(self):
+        """Block until a batch is due, then detach it from the queue."""
+        with self._cond:
+            while True:
+                if not self._pending:
+                    self._cond.wait()
+                    continue
+                remaining = self._first_at + self._flush_s - time.monotonic()
+                if len(self._pending) >= self._batch_max or remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = self._pending[:self._batch_max]
+            del self._pending[:self._batch_max]
+            if self._pending:
+                # Leftovers start a fresh window rather than inheriting an expired one
+                self._first_at = time.monotonic()
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            # Claim each Future; ones the caller already cancelled are dropped
+            # here and can no longer be cancelled once claimed
+            batch = [entry for entry in self._take_batch() if entry[2].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                piece_batch = np.stack([_host(piece) for piece, _, _ in batch]).astype(np.int8, copy=False)
+                color_batch = np.stack([_host(color) for _, color, _ in batch]).astype(np.int8, copy=False)
+                outputs = [_host(out) for out in self._batch_fn(piece_batch, color_batch)]
+            except Exception as exc:
+                for _, _, future in batch:
+                    _resolve(future, exception=exc)
+                continue
+            for i, (_, _, future) in enumerate(batch):
+                try:
+                    result = tuple(out[i].item() for out in outputs)
+                except Exception as exc:
+                    _resolve(future, exception=exc)
+                else:
+                    _resolve(future, result=result)
+
+
+def _resolve(future: Future, result=None, exception=None) -> None:
+    """Settle one Future without letting a bad one end the worker loop."""
+    try:
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        pass
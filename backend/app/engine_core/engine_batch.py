@@ -1,38 +1,101 @@
 # engine_batch.py
 """
 Batch operations for chess engine.
-Uses native GPU batch methods when available, falls back to CPU loop otherwise.
+Uses native GPU batch methods when available, falls back to parallel
+Numba (prange) kernels on the CPU otherwise.
 """
 
+import os
+
+import numpy as np
+from numba import config as numba_config, njit, prange
+
 from .backend import xp, GPU, Engine as SingleEngine
-from .moves import (
-    MOVE_IDX, MOVE_FROM, MOVE_TO, MOVE_PROMO, MOVE_FLAGS
+from .chess_utils import board_to_bitboards
+from .engine_cpu import (
+    _compute_attack_bitboards, _evaluate, _count_moves_bb, _generate_moves_bb
 )
+from .moves import MOVE_IDX, MOVE_FROM
+
+# The prange kernels below are first launched from worker threads (the
+# request threadpool, the startup warmup), and may be launched from several
+# at once. Numba's default workqueue layer supports neither: it aborts on
+# concurrent launches and hangs at interpreter exit when first started off
+# the main thread. So unless the operator chose a layer with
+# NUMBA_THREADING_LAYER, use OpenMP when libgomp is present and otherwise
+# any thread-safe layer (TBB).
+if 'NUMBA_THREADING_LAYER' not in os.environ:
+    try:
+        from numba.np.ufunc import omppool  # noqa: F401 -- fails without libgomp
+    except ImportError:
+        numba_config.THREADING_LAYER = 'threadsafe'
+    else:
+        numba_config.THREADING_LAYER = 'omp'
+
+
+def _is_device(arr):
+    """True for arrays already resident on the GPU (CuPy or any CUDA array)."""
+    return hasattr(arr, '__cuda_array_interface__')
+
+
+def _to_device(arr):
+    """Upload host arrays once; device arrays pass through without a copy."""
+    return arr if _is_device(arr) else xp.asarray(arr)
 
 ###########################################################################
 # Batch Attack Maps
 ###########################################################################
 
-def compute_attack_maps_batch(piece_arr_batch, color_arr_batch):
+def compute_attack_bitboards_batch(piece_arr_batch, color_arr_batch):
     """
-    Compute attack maps for batch of positions.
-    Uses native GPU batch method if available, otherwise loops over CPU.
+    Compute attack sets for batch of positions as packed bitboards.
+
+    Returns:
+        (white_bb, black_bb): uint64 arrays (N,); bit sq is set when the
+        side attacks square sq
     """
     # Use native GPU batch method if available
-    if GPU and hasattr(SingleEngine, 'compute_attack_maps_batch'):
-        return SingleEngine.compute_attack_maps_batch(piece_arr_batch, color_arr_batch)
+    if GPU and hasattr(SingleEngine, 'compute_attack_bitboards_batch'):
+        return SingleEngine.compute_attack_bitboards_batch(
+            _to_device(piece_arr_batch), _to_device(color_arr_batch)
+        )
 
-    # Fall back to CPU loop
+    # Fall back to CPU: one parallel Numba kernel over all positions
     N = piece_arr_batch.shape[0]
-    white = xp.zeros((N, 64), dtype=xp.bool_)
-    black = xp.zeros((N, 64), dtype=xp.bool_)
+    white = np.empty(N, dtype=np.uint64)
+    black = np.empty(N, dtype=np.uint64)
+    _attack_bitboards_batch_cpu(piece_arr_batch, color_arr_batch, white, black)
+
+    return xp.asarray(white), xp.asarray(black)
+
 
-    for i in range(N):
-        w, b = SingleEngine.compute_attack_maps(piece_arr_batch[i], color_arr_batch[i])
-        white[i] = w
-        black[i] = b
+@njit(parallel=True, cache=True)
+def _attack_bitboards_batch_cpu(piece_arr_batch, color_arr_batch, white, black):
+    """Fill (N,) uint64 attack bitboards; positions are independent, so prange."""
+    for i in prange(piece_arr_batch.shape[0]):
+        white[i], black[i] = _compute_attack_bitboards(piece_arr_batch[i], color_arr_batch[i])
 
-    return white, black
+
+def unpack_bitboards(bb):
+    """Expand (N,) uint64 bitboards into (N, 64) bool maps, on bb's own device."""
+    mod = xp if _is_device(bb) else np
+    # Little-endian bytes, least significant bit first, is square order a1..h8;
+    # unpackbits yields 0/1 bytes that reinterpret as bool without a cast
+    bits = mod.unpackbits(mod.ascontiguousarray(bb, dtype=mod.uint64).view(mod.uint8), bitorder='little')
+    return bits.reshape(-1, 64).view(mod.bool_)
+
+
+def compute_attack_maps_batch(piece_arr_batch, color_arr_batch):
+    """
+    Compute attack maps for batch of positions.
+
+    Returns:
+        (white_att, black_att): bool arrays (N, 64). Callers that only test
+        or combine squares should prefer compute_attack_bitboards_batch,
+        which is 8x smaller.
+    """
+    white_bb, black_bb = compute_attack_bitboards_batch(piece_arr_batch, color_arr_batch)
+    return unpack_bitboards(white_bb), unpack_bitboards(black_bb)
 
 
 ###########################################################################
@@ -42,29 +105,49 @@ def compute_attack_maps_batch(piece_arr_batch, color_arr_batch):
 def evaluate_batch(piece_arr_batch, color_arr_batch):
     """
     Evaluate batch of positions.
-    Uses native GPU batch method if available, otherwise loops over CPU.
+    Uses native GPU batch method if available, otherwise a parallel CPU kernel.
     """
     # Use native GPU batch method if available
     if GPU and hasattr(SingleEngine, 'evaluate_batch'):
-        return SingleEngine.evaluate_batch(piece_arr_batch, color_arr_batch)
+        return SingleEngine.evaluate_batch(_to_device(piece_arr_batch), _to_device(color_arr_batch))
 
-    # Fall back to CPU loop
+    # Fall back to CPU: one parallel Numba kernel over all positions
     N = piece_arr_batch.shape[0]
-    white_off = xp.zeros(N, dtype=xp.int32)
-    white_def = xp.zeros(N, dtype=xp.int32)
-    black_off = xp.zeros(N, dtype=xp.int32)
-    black_def = xp.zeros(N, dtype=xp.int32)
-
-    for i in range(N):
-        wo, wd, bo, bd = SingleEngine.evaluate(
-            piece_arr_batch[i], color_arr_batch[i]
-        )
-        white_off[i] = int(wo)
-        white_def[i] = int(wd)
-        black_off[i] = int(bo)
-        black_def[i] = int(bd)
+    white_off = np.empty(N, dtype=np.int32)
+    white_def = np.empty(N, dtype=np.int32)
+    black_off = np.empty(N, dtype=np.int32)
+    black_def = np.empty(N, dtype=np.int32)
+    _evaluate_batch_cpu(
+        piece_arr_batch, color_arr_batch, white_off, white_def, black_off, black_def
+    )
+
+    return (
+        xp.asarray(white_off), xp.asarray(white_def),
+        xp.asarray(black_off), xp.asarray(black_def),
+    )
+
+
+def evaluate_batch_host(piece_arr_batch, color_arr_batch):
+    """
+    evaluate_batch for NumPy inputs, returning NumPy (N,) int32 arrays.
+
+    On the GPU the boards go through pinned staging buffers on a persistent
+    stream (one sync per call) instead of pageable uploads and downloads.
+    """
+    if GPU and hasattr(SingleEngine, 'evaluate_batch_host'):
+        return SingleEngine.evaluate_batch_host(piece_arr_batch, color_arr_batch)
 
-    return white_off, white_def, black_off, black_def
+    N = piece_arr_batch.shape[0]
+    scores = np.empty((4, N), dtype=np.int32)
+    _evaluate_batch_cpu(piece_arr_batch, color_arr_batch, *scores)
+    return tuple(scores)
+
+
+@njit(parallel=True, cache=True)
+def _evaluate_batch_cpu(piece_arr_batch, color_arr_batch, wo, wd, bo, bd):
+    """Evaluate each position into preallocated (N,) outputs."""
+    for i in prange(piece_arr_batch.shape[0]):
+        wo[i], wd[i], bo[i], bd[i] = _evaluate(piece_arr_batch[i], color_arr_batch[i])
 
 
 ###########################################################################
@@ -74,36 +157,51 @@ def evaluate_batch(piece_arr_batch, color_arr_batch):
 def generate_moves_batch(piece_arr_batch, color_arr_batch, stm_batch):
     """
     Generate moves for batch of positions.
-    Uses native GPU batch method if available, otherwise loops over CPU.
+    Uses native GPU batch method if available, otherwise a parallel CPU kernel.
     """
     # Use native GPU batch method if available
     if GPU and hasattr(SingleEngine, 'generate_moves_batch'):
-        return SingleEngine.generate_moves_batch(piece_arr_batch, color_arr_batch, stm_batch)
-
-    # Fall back to CPU loop
-    xp_local = xp
-    moves_accum = []
-
-    for i in range(piece_arr_batch.shape[0]):
-        moves_single = SingleEngine.generate_pseudo_legal_moves(
-            piece_arr_batch[i],
-            color_arr_batch[i],
-            int(stm_batch[i])
+        return SingleEngine.generate_moves_batch(
+            _to_device(piece_arr_batch), _to_device(color_arr_batch), _to_device(stm_batch)
         )
 
-        if moves_single.shape[0] == 0:
-            continue
+    # Fall back to CPU: two parallel Numba passes (count, then fill)
+    return xp.asarray(_generate_moves_batch_host(piece_arr_batch, color_arr_batch, stm_batch))
 
-        out = xp_local.empty((moves_single.shape[0], 5), dtype=xp_local.int16)
-        out[:, MOVE_IDX]   = i
-        out[:, MOVE_FROM]  = moves_single[:, 0]
-        out[:, MOVE_TO]    = moves_single[:, 1]
-        out[:, MOVE_PROMO] = moves_single[:, 2]
-        out[:, MOVE_FLAGS] = moves_single[:, 3]
 
-        moves_accum.append(out)
-
-    if not moves_accum:
-        return xp_local.zeros((0,5), dtype=xp_local.int16)
+def _generate_moves_batch_host(piece_arr_batch, color_arr_batch, stm_batch):
+    """
+    (M, 5) int16 move rows for NumPy inputs, from the parallel CPU kernels.
 
-    return xp_local.concatenate(moves_accum, axis=0)
+    Counts every position's moves in parallel, prefix-sums the counts, then
+    generates straight into one pre-sized output.
+    """
+    N = piece_arr_batch.shape[0]
+    stm_batch = np.asarray(stm_batch)
+    piece_bbs = np.empty((N, 2, 7), dtype=np.uint64)
+    counts = np.empty(N, dtype=np.int64)
+    _count_moves_batch_cpu(piece_arr_batch, color_arr_batch, stm_batch, piece_bbs, counts)
+
+    offsets = np.zeros(N + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    out = np.empty((offsets[N], 5), dtype=np.int16)
+    _fill_moves_batch_cpu(piece_bbs, stm_batch, offsets, out)
+    return out
+
+
+@njit(parallel=True, cache=True)
+def _count_moves_batch_cpu(piece_arr_batch, color_arr_batch, stm_batch, piece_bbs, counts):
+    """Pass 1: convert each board to bitboards and count its moves."""
+    for i in prange(piece_arr_batch.shape[0]):
+        piece_bbs[i] = board_to_bitboards(piece_arr_batch[i], color_arr_batch[i])
+        counts[i] = _count_moves_bb(piece_bbs[i], stm_batch[i])
+
+
+@njit(parallel=True, cache=True)
+def _fill_moves_batch_cpu(piece_bbs, stm_batch, offsets, out):
+    """Pass 2: generate board i's moves directly into out[offsets[i]:offsets[i+1]]."""
+    for i in prange(piece_bbs.shape[0]):
+        start = offsets[i]
+        stop = offsets[i + 1]
+        _generate_moves_bb(piece_bbs[i], stm_batch[i], out[start:stop, MOVE_FROM:])
+        out[start:stop, MOVE_IDX] = i
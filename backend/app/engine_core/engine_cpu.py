@@ -5,55 +5,200 @@ from numba import njit
 from .chess_utils import (
     PIECE_NONE, PIECE_PAWN, PIECE_KNIGHT, PIECE_BISHOP,
     PIECE_ROOK, PIECE_QUEEN, PIECE_KING,
-    COLOR_WHITE, COLOR_BLACK,
-    get_knight_attacks, get_king_attacks, get_pawn_attacks,
+    COLOR_WHITE, COLOR_BLACK, BB_EMPTY,
+    get_knight_attacks, get_king_attacks,
     get_bishop_attacks, get_rook_attacks, get_queen_attacks,
-    get_rank, get_file
+    ctz64, next_sq, popcount64, bb_to_bool64, board_to_bitboards,
+    KING_SHIELD_MASKS,
+    NOT_FILE_A, NOT_FILE_H, RANK_1, RANK_3, RANK_6, RANK_8
 )
 
 
-@njit(cache=True)
-def _evaluate_king_safety(king_sq, color, piece_arr, color_arr):
+@njit(cache=True, inline='always')
+def _evaluate_king_safety(king_sq, color, pawns):
     """
     Evaluate king safety.
 
     Args:
         king_sq: King square (0-63)
         color: King color (0=white, 1=black)
-        piece_arr: Piece array
-        color_arr: Color array
+        pawns: Bitboard of that side's pawns
 
     Returns:
         King safety score (higher is safer)
     """
-    safety = 100  # Base safety
+    # Base safety plus a pawn shield bonus per own pawn in front of the king
+    return 100 + popcount64(pawns & KING_SHIELD_MASKS[color, king_sq]) * 10
+
+
+# Upper bound on pseudo-legal moves per position (max ~218 in chess)
+MAX_MOVES = 256
+
+
+@njit(cache=True, inline='always')
+def _piece_attacks(piece, sq, occ):
+    """Attack bitboard of a non-pawn piece on `sq`."""
+    if piece == PIECE_KNIGHT:
+        return get_knight_attacks(sq)
+    if piece == PIECE_BISHOP:
+        return get_bishop_attacks(sq, occ)
+    if piece == PIECE_ROOK:
+        return get_rook_attacks(sq, occ)
+    if piece == PIECE_QUEEN:
+        return get_queen_attacks(sq, occ)
+    return get_king_attacks(sq)
 
-    king_rank = get_rank(king_sq)
-    king_file = get_file(king_sq)
 
-    # Pawn shield bonus
+@njit(cache=True)
+def _side_attacks_mobility(piece_bb, color, occ):
+    """
+    Attack set and pseudo-legal mobility of one side in a single pass.
+
+    Mobility is the per-piece attack count (plus pawn single pushes), so
+    every attack bitboard is generated once and both OR-ed and popcounted.
+    """
+    pawns = piece_bb[color, PIECE_PAWN]
     if color == COLOR_WHITE:
-        # Check for pawns in front of king
-        for file_offset in (-1, 0, 1):
-            check_file = king_file + file_offset
-            if 0 <= check_file < 8:
-                # Check rank in front of king
-                if king_rank < 7:
-                    check_sq = (king_rank + 1) * 8 + check_file
-                    if piece_arr[check_sq] == PIECE_PAWN and color_arr[check_sq] == COLOR_WHITE:
-                        safety += 10
-    else:  # BLACK
-        # Check for pawns in front of king
-        for file_offset in (-1, 0, 1):
-            check_file = king_file + file_offset
-            if 0 <= check_file < 8:
-                # Check rank in front of king
-                if king_rank > 0:
-                    check_sq = (king_rank - 1) * 8 + check_file
-                    if piece_arr[check_sq] == PIECE_PAWN and color_arr[check_sq] == COLOR_BLACK:
-                        safety += 10
-
-    return safety
+        west = (pawns & NOT_FILE_A) << np.uint64(7)
+        east = (pawns & NOT_FILE_H) << np.uint64(9)
+        pushes = (pawns << np.uint64(8)) & ~occ
+    else:
+        west = (pawns & NOT_FILE_A) >> np.uint64(9)
+        east = (pawns & NOT_FILE_H) >> np.uint64(7)
+        pushes = (pawns >> np.uint64(8)) & ~occ
+    att = west | east
+    mobility = popcount64(west) + popcount64(east) + popcount64(pushes)
+
+    for piece in range(PIECE_KNIGHT, PIECE_KING + 1):
+        bb = piece_bb[color, piece]
+        while bb:
+            sq, bb = next_sq(bb)
+            piece_att = _piece_attacks(piece, sq, occ)
+            att |= piece_att
+            mobility += popcount64(piece_att)
+
+    return att, mobility
+
+
+@njit(cache=True)
+def _compute_attack_bitboards(piece_arr, color_arr):
+    piece_bb = board_to_bitboards(piece_arr, color_arr)
+    occ = piece_bb[COLOR_WHITE, PIECE_NONE] | piece_bb[COLOR_BLACK, PIECE_NONE]
+    white_att, _ = _side_attacks_mobility(piece_bb, COLOR_WHITE, occ)
+    black_att, _ = _side_attacks_mobility(piece_bb, COLOR_BLACK, occ)
+    return white_att, black_att
+
+
+# Material values (kings carry no material)
+_V_PAWN = 100
+_V_KNIGHT = 320
+_V_BISHOP = 330
+_V_ROOK = 500
+_V_QUEEN = 900
+
+
+@njit(cache=True, inline='always')
+def _side_material(piece_bb, color):
+    """Material for one side: popcount of each piece bitboard times its value."""
+    return (
+        popcount64(piece_bb[color, PIECE_PAWN]) * _V_PAWN
+        + popcount64(piece_bb[color, PIECE_KNIGHT]) * _V_KNIGHT
+        + popcount64(piece_bb[color, PIECE_BISHOP]) * _V_BISHOP
+        + popcount64(piece_bb[color, PIECE_ROOK]) * _V_ROOK
+        + popcount64(piece_bb[color, PIECE_QUEEN]) * _V_QUEEN
+    )
+
+
+@njit(cache=True, nogil=True)
+def _evaluate(piece_arr, color_arr):
+    """Single-position evaluation shared by EngineCPU.evaluate and batch kernels."""
+    return _evaluate_bb(board_to_bitboards(piece_arr, color_arr))
+
+
+@njit(cache=True, nogil=True)
+def _evaluate_bb(piece_bb):
+    """Evaluation from the (2, 7) bitboard layout."""
+    occ = piece_bb[COLOR_WHITE, PIECE_NONE] | piece_bb[COLOR_BLACK, PIECE_NONE]
+
+    white_material = _side_material(piece_bb, COLOR_WHITE)
+    black_material = _side_material(piece_bb, COLOR_BLACK)
+    _, white_mobility = _side_attacks_mobility(piece_bb, COLOR_WHITE, occ)
+    _, black_mobility = _side_attacks_mobility(piece_bb, COLOR_BLACK, occ)
+
+    # King safety evaluation
+    white_king_safety = 0
+    black_king_safety = 0
+
+    white_kings = piece_bb[COLOR_WHITE, PIECE_KING]
+    if white_kings:
+        white_king_safety = _evaluate_king_safety(
+            ctz64(white_kings), COLOR_WHITE, piece_bb[COLOR_WHITE, PIECE_PAWN]
+        )
+
+    black_kings = piece_bb[COLOR_BLACK, PIECE_KING]
+    if black_kings:
+        black_king_safety = _evaluate_king_safety(
+            ctz64(black_kings), COLOR_BLACK, piece_bb[COLOR_BLACK, PIECE_PAWN]
+        )
+
+    # Combine scores
+    white_off = white_material + white_mobility
+    white_def = white_king_safety
+    black_off = black_material + black_mobility
+    black_def = black_king_safety
+
+    return white_off, white_def, black_off, black_def
+
+
+@njit(cache=True, nogil=True)
+def _generate_moves_into(piece_arr, color_arr, stm, moves_buffer):
+    """
+    Write pseudo-legal moves into moves_buffer as [from, to, promo, flags]
+    rows and return how many were written.
+    """
+    return _generate_moves_bb(board_to_bitboards(piece_arr, color_arr), stm, moves_buffer)
+
+
+@njit(cache=True, nogil=True)
+def _generate_moves_bb(piece_bb, stm, moves_buffer):
+    """Bitboard move generator behind _generate_moves_into."""
+    own_occ = piece_bb[stm, PIECE_NONE]
+    opp_occ = piece_bb[1 - stm, PIECE_NONE]
+    move_count = 0
+
+    pawns = piece_bb[stm, PIECE_PAWN]
+    if stm == COLOR_WHITE:
+        move_count = _add_pawn_moves_white(pawns, own_occ, opp_occ, moves_buffer, move_count)
+    else:
+        move_count = _add_pawn_moves_black(pawns, own_occ, opp_occ, moves_buffer, move_count)
+
+    bb = piece_bb[stm, PIECE_KNIGHT]
+    while bb:
+        sq, bb = next_sq(bb)
+        move_count = _add_knight_moves(sq, own_occ, opp_occ, moves_buffer, move_count)
+
+    bb = piece_bb[stm, PIECE_BISHOP]
+    while bb:
+        sq, bb = next_sq(bb)
+        move_count = _add_bishop_moves(sq, own_occ, opp_occ, moves_buffer, move_count)
+
+    bb = piece_bb[stm, PIECE_ROOK]
+    while bb:
+        sq, bb = next_sq(bb)
+        move_count = _add_rook_moves(sq, own_occ, opp_occ, moves_buffer, move_count)
+
+    bb = piece_bb[stm, PIECE_QUEEN]
+    while bb:
+        sq, bb = next_sq(bb)
+        move_count = _add_queen_moves(sq, own_occ, opp_occ, moves_buffer, move_count)
+
+    bb = piece_bb[stm, PIECE_KING]
+    while bb:
+        sq, bb = next_sq(bb)
+        move_count = _add_king_moves(sq, own_occ, opp_occ, moves_buffer, move_count)
+
+    return move_count
+
 
 class EngineCPU:
     """
@@ -61,6 +206,21 @@ class EngineCPU:
     Evaluates single boards (not batch).
     """
 
+    @staticmethod
+    @njit(cache=True)
+    def compute_attack_bitboards(piece_arr, color_arr):
+        """
+        Compute attack bitboards for both sides.
+
+        Args:
+            piece_arr: (64,) array of piece types
+            color_arr: (64,) array of colors
+
+        Returns:
+            (white_att, black_att): uint64 bitboards (bit n = square n attacked)
+        """
+        return _compute_attack_bitboards(piece_arr, color_arr)
+
     @staticmethod
     @njit(cache=True)
     def compute_attack_maps(piece_arr, color_arr):
@@ -74,43 +234,11 @@ class EngineCPU:
         Returns:
             (white_att, black_att): Both (64,) bool arrays
         """
-        white_att = np.zeros(64, dtype=np.bool_)
-        black_att = np.zeros(64, dtype=np.bool_)
-
-        for sq in range(64):
-            if piece_arr[sq] == PIECE_NONE:
-                continue
-
-            piece = piece_arr[sq]
-            color = color_arr[sq]
-
-            # Get attacked squares based on piece type
-            if piece == PIECE_PAWN:
-                attacks = get_pawn_attacks(sq, color)
-            elif piece == PIECE_KNIGHT:
-                attacks = get_knight_attacks(sq)
-            elif piece == PIECE_BISHOP:
-                attacks = get_bishop_attacks(sq, piece_arr)
-            elif piece == PIECE_ROOK:
-                attacks = get_rook_attacks(sq, piece_arr)
-            elif piece == PIECE_QUEEN:
-                attacks = get_queen_attacks(sq, piece_arr)
-            elif piece == PIECE_KING:
-                attacks = get_king_attacks(sq)
-            else:
-                continue
-
-            # Mark attacked squares
-            for target in attacks:
-                if color == COLOR_WHITE:
-                    white_att[target] = True
-                else:
-                    black_att[target] = True
-
-        return white_att, black_att
+        white_att, black_att = _compute_attack_bitboards(piece_arr, color_arr)
+        return bb_to_bool64(white_att), bb_to_bool64(black_att)
 
     @staticmethod
-    @njit(cache=True)
+    @njit(cache=True, nogil=True)
     def evaluate(piece_arr, color_arr):
         """
         Evaluate a position.
@@ -122,93 +250,7 @@ class EngineCPU:
         Returns:
             (white_off, white_def, black_off, black_def): Offensive and defensive scores
         """
-        # Material values
-        piece_values = np.array([0, 100, 320, 330, 500, 900, 0], dtype=np.int32)
-
-        white_material = 0
-        black_material = 0
-        white_mobility = 0
-        black_mobility = 0
-        white_king_sq = -1
-        black_king_sq = -1
-
-        # Single pass: count material and find kings
-        for sq in range(64):
-            if piece_arr[sq] == PIECE_NONE:
-                continue
-
-            piece = piece_arr[sq]
-            color = color_arr[sq]
-            value = piece_values[piece]
-
-            if color == COLOR_WHITE:
-                white_material += value
-                if piece == PIECE_KING:
-                    white_king_sq = sq
-            else:
-                black_material += value
-                if piece == PIECE_KING:
-                    black_king_sq = sq
-
-        # Mobility: count pseudo-legal moves
-        for sq in range(64):
-            if piece_arr[sq] == PIECE_NONE:
-                continue
-
-            piece = piece_arr[sq]
-            color = color_arr[sq]
-
-            # Count moves for this piece
-            move_count = 0
-
-            if piece == PIECE_PAWN:
-                attacks = get_pawn_attacks(sq, color)
-                move_count = len(attacks)
-                # Add forward moves
-                if color == COLOR_WHITE:
-                    if sq + 8 < 64 and piece_arr[sq + 8] == PIECE_NONE:
-                        move_count += 1
-                else:
-                    if sq - 8 >= 0 and piece_arr[sq - 8] == PIECE_NONE:
-                        move_count += 1
-            elif piece == PIECE_KNIGHT:
-                attacks = get_knight_attacks(sq)
-                move_count = len(attacks)
-            elif piece == PIECE_BISHOP:
-                attacks = get_bishop_attacks(sq, piece_arr)
-                move_count = len(attacks)
-            elif piece == PIECE_ROOK:
-                attacks = get_rook_attacks(sq, piece_arr)
-                move_count = len(attacks)
-            elif piece == PIECE_QUEEN:
-                attacks = get_queen_attacks(sq, piece_arr)
-                move_count = len(attacks)
-            elif piece == PIECE_KING:
-                attacks = get_king_attacks(sq)
-                move_count = len(attacks)
-
-            if color == COLOR_WHITE:
-                white_mobility += move_count
-            else:
-                black_mobility += move_count
-
-        # King safety evaluation
-        white_king_safety = 0
-        black_king_safety = 0
-
-        if white_king_sq >= 0:
-            white_king_safety = _evaluate_king_safety(white_king_sq, COLOR_WHITE, piece_arr, color_arr)
-
-        if black_king_sq >= 0:
-            black_king_safety = _evaluate_king_safety(black_king_sq, COLOR_BLACK, piece_arr, color_arr)
-
-        # Combine scores
-        white_off = white_material + white_mobility
-        white_def = white_king_safety
-        black_off = black_material + black_mobility
-        black_def = black_king_safety
-
-        return white_off, white_def, black_off, black_def
+        return _evaluate(piece_arr, color_arr)
 
     @staticmethod
     @njit(cache=True)
@@ -225,39 +267,8 @@ class EngineCPU:
             (M, 4) array where each row is [from_sq, to_sq, promo, flags]
         """
         # Pre-allocate buffer (max ~218 moves in chess, use 256 for safety)
-        moves_buffer = np.empty((256, 4), dtype=np.int16)
-        move_count = 0
-
-        for sq in range(64):
-            if color_arr[sq] != stm:
-                continue
-
-            piece = piece_arr[sq]
-
-            if piece == PIECE_PAWN:
-                move_count = _add_pawn_moves(
-                    sq, stm, piece_arr, color_arr, moves_buffer, move_count
-                )
-            elif piece == PIECE_KNIGHT:
-                move_count = _add_knight_moves(
-                    sq, stm, piece_arr, color_arr, moves_buffer, move_count
-                )
-            elif piece == PIECE_BISHOP:
-                move_count = _add_bishop_moves(
-                    sq, stm, piece_arr, color_arr, moves_buffer, move_count
-                )
-            elif piece == PIECE_ROOK:
-                move_count = _add_rook_moves(
-                    sq, stm, piece_arr, color_arr, moves_buffer, move_count
-                )
-            elif piece == PIECE_QUEEN:
-                move_count = _add_queen_moves(
-                    sq, stm, piece_arr, color_arr, moves_buffer, move_count
-                )
-            elif piece == PIECE_KING:
-                move_count = _add_king_moves(
-                    sq, stm, piece_arr, color_arr, moves_buffer, move_count
-                )
+        moves_buffer = np.empty((MAX_MOVES, 4), dtype=np.int16)
+        move_count = _generate_moves_into(piece_arr, color_arr, stm, moves_buffer)
 
         # Return only filled portion
         return moves_buffer[:move_count]
@@ -265,6 +276,66 @@ class EngineCPU:
 
 # Move generation helper functions
 
+@njit(cache=True, inline='always')
+def _pawn_targets_white(pawns, occ, opp_occ):
+    """Set-wise white pawn targets: (single, double, capture_west, capture_east)."""
+    empty = ~occ
+    single = (pawns << np.uint64(8)) & empty
+    double = ((single & RANK_3) << np.uint64(8)) & empty
+    capture_west = ((pawns & NOT_FILE_A) << np.uint64(7)) & opp_occ
+    capture_east = ((pawns & NOT_FILE_H) << np.uint64(9)) & opp_occ
+    return single, double, capture_west, capture_east
+
+
+@njit(cache=True, inline='always')
+def _pawn_targets_black(pawns, occ, opp_occ):
+    """Set-wise black pawn targets: (single, double, capture_west, capture_east)."""
+    empty = ~occ
+    single = (pawns >> np.uint64(8)) & empty
+    double = ((single & RANK_6) >> np.uint64(8)) & empty
+    capture_west = ((pawns & NOT_FILE_A) >> np.uint64(9)) & opp_occ
+    capture_east = ((pawns & NOT_FILE_H) >> np.uint64(7)) & opp_occ
+    return single, double, capture_west, capture_east
+
+
+@njit(cache=True, inline='always')
+def _pawn_targets(pawns, stm, occ, opp_occ):
+    """
+    Set-wise pawn move targets for the side to move.
+
+    Returns:
+        (single, double, capture_west, capture_east) target bitboards
+    """
+    if stm == COLOR_WHITE:
+        return _pawn_targets_white(pawns, occ, opp_occ)
+    return _pawn_targets_black(pawns, occ, opp_occ)
+
+
+@njit(cache=True, nogil=True)
+def _count_moves_bb(piece_bb, stm):
+    """Number of rows _generate_moves_bb would emit, from popcounts alone."""
+    own_occ = piece_bb[stm, PIECE_NONE]
+    opp_occ = piece_bb[1 - stm, PIECE_NONE]
+    occ = own_occ | opp_occ
+    promo_rank = RANK_8 if stm == COLOR_WHITE else RANK_1
+
+    single, double, capture_west, capture_east = _pawn_targets(
+        piece_bb[stm, PIECE_PAWN], stm, occ, opp_occ
+    )
+    count = popcount64(double)
+    for targets in (single, capture_west, capture_east):
+        # Each promotion square expands to four rows (N, B, R, Q)
+        count += popcount64(targets & ~promo_rank) + 4 * popcount64(targets & promo_rank)
+
+    for piece in range(PIECE_KNIGHT, PIECE_KING + 1):
+        bb = piece_bb[stm, piece]
+        while bb:
+            sq, bb = next_sq(bb)
+            count += popcount64(_piece_attacks(piece, sq, occ) & ~own_occ)
+
+    return count
+
+
 # Move flags
 FLAG_NORMAL = 0
 FLAG_CAPTURE = 1
@@ -273,161 +344,122 @@ FLAG_CASTLING = 4
 FLAG_DOUBLE_PUSH = 8
 
 
-@njit(cache=True)
-def _add_pawn_moves(sq, stm, piece_arr, color_arr, moves_buffer, move_count):
-    """Add pawn moves to buffer."""
-    sq_rank = get_rank(sq)
-    sq_file = get_file(sq)
+@njit(cache=True, inline='always')
+def _push_move(moves_buffer, move_count, from_sq, to_sq, promo, flags):
+    """Store one move row with scalar writes (no temporary array); returns the new count."""
+    moves_buffer[move_count, 0] = from_sq
+    moves_buffer[move_count, 1] = to_sq
+    moves_buffer[move_count, 2] = promo
+    moves_buffer[move_count, 3] = flags
+    return move_count + 1
 
-    if stm == COLOR_WHITE:
-        # Forward one square
-        target = sq + 8
-        if target < 64 and piece_arr[target] == PIECE_NONE:
-            # Check for promotion
-            if sq_rank == 6:  # 7th rank
-                # Add all promotion moves
-                for promo in (PIECE_KNIGHT, PIECE_BISHOP, PIECE_ROOK, PIECE_QUEEN):
-                    moves_buffer[move_count] = np.array([sq, target, promo, FLAG_NORMAL], dtype=np.int16)
-                    move_count += 1
-            else:
-                moves_buffer[move_count] = np.array([sq, target, 0, FLAG_NORMAL], dtype=np.int16)
-                move_count += 1
-
-                # Forward two squares from starting position
-                if sq_rank == 1:  # 2nd rank
-                    target2 = sq + 16
-                    if piece_arr[target2] == PIECE_NONE:
-                        moves_buffer[move_count] = np.array([sq, target2, 0, FLAG_DOUBLE_PUSH], dtype=np.int16)
-                        move_count += 1
-
-        # Captures
-        for file_offset in (-1, 1):
-            target_file = sq_file + file_offset
-            if 0 <= target_file < 8:
-                target = sq + 8 + file_offset
-                if target < 64 and color_arr[target] == COLOR_BLACK:
-                    # Check for promotion
-                    if sq_rank == 6:  # 7th rank
-                        for promo in (PIECE_KNIGHT, PIECE_BISHOP, PIECE_ROOK, PIECE_QUEEN):
-                            moves_buffer[move_count] = np.array([sq, target, promo, FLAG_CAPTURE], dtype=np.int16)
-                            move_count += 1
-                    else:
-                        moves_buffer[move_count] = np.array([sq, target, 0, FLAG_CAPTURE], dtype=np.int16)
-                        move_count += 1
-
-    else:  # BLACK
-        # Forward one square
-        target = sq - 8
-        if target >= 0 and piece_arr[target] == PIECE_NONE:
-            # Check for promotion
-            if sq_rank == 1:  # 2nd rank
-                for promo in (PIECE_KNIGHT, PIECE_BISHOP, PIECE_ROOK, PIECE_QUEEN):
-                    moves_buffer[move_count] = np.array([sq, target, promo, FLAG_NORMAL], dtype=np.int16)
-                    move_count += 1
-            else:
-                moves_buffer[move_count] = np.array([sq, target, 0, FLAG_NORMAL], dtype=np.int16)
-                move_count += 1
-
-                # Forward two squares from starting position
-                if sq_rank == 6:  # 7th rank
-                    target2 = sq - 16
-                    if piece_arr[target2] == PIECE_NONE:
-                        moves_buffer[move_count] = np.array([sq, target2, 0, FLAG_DOUBLE_PUSH], dtype=np.int16)
-                        move_count += 1
-
-        # Captures
-        for file_offset in (-1, 1):
-            target_file = sq_file + file_offset
-            if 0 <= target_file < 8:
-                target = sq - 8 + file_offset
-                if target >= 0 and color_arr[target] == COLOR_WHITE:
-                    # Check for promotion
-                    if sq_rank == 1:  # 2nd rank
-                        for promo in (PIECE_KNIGHT, PIECE_BISHOP, PIECE_ROOK, PIECE_QUEEN):
-                            moves_buffer[move_count] = np.array([sq, target, promo, FLAG_CAPTURE], dtype=np.int16)
-                            move_count += 1
-                    else:
-                        moves_buffer[move_count] = np.array([sq, target, 0, FLAG_CAPTURE], dtype=np.int16)
-                        move_count += 1
 
+@njit(cache=True, inline='always')
+def _push_targets(moves_buffer, move_count, from_sq, targets, flags):
+    """Push one row per set bit of `targets`, all sharing the same flags."""
+    while targets:
+        to_sq, targets = next_sq(targets)
+        move_count = _push_move(moves_buffer, move_count, from_sq, to_sq, 0, flags)
     return move_count
 
 
-@njit(cache=True)
-def _add_knight_moves(sq, stm, piece_arr, color_arr, moves_buffer, move_count):
-    """Add knight moves to buffer."""
-    attacks = get_knight_attacks(sq)
+@njit(cache=True, inline='always')
+def _push_pawn_targets(moves_buffer, move_count, targets, delta, promo_rank, flags):
+    """
+    Push pawn moves for a set-wise target bitboard.
 
-    for target in attacks:
-        if color_arr[target] == stm:
-            continue  # Can't capture own piece
+    The origin of each target is `to_sq - delta`. Targets on `promo_rank`
+    expand to four rows (N, B, R, Q); the rest get a single row.
+    """
+    quiet = targets & ~promo_rank
+    while quiet:
+        to_sq, quiet = next_sq(quiet)
+        move_count = _push_move(moves_buffer, move_count, to_sq - delta, to_sq, 0, flags)
+
+    promos = targets & promo_rank
+    while promos:
+        to_sq, promos = next_sq(promos)
+        for promo in range(PIECE_KNIGHT, PIECE_QUEEN + 1):
+            move_count = _push_move(moves_buffer, move_count, to_sq - delta, to_sq, promo, flags)
+    return move_count
 
-        flags = FLAG_CAPTURE if color_arr[target] != -1 else FLAG_NORMAL
-        moves_buffer[move_count] = np.array([sq, target, 0, flags], dtype=np.int16)
-        move_count += 1
 
+@njit(cache=True)
+def _add_pawn_moves_white(pawns, own_occ, opp_occ, moves_buffer, move_count):
+    """Add moves for all white pawns, one target set at a time."""
+    single, double, capture_west, capture_east = _pawn_targets_white(
+        pawns, own_occ | opp_occ, opp_occ
+    )
+    move_count = _push_pawn_targets(moves_buffer, move_count, single, 8, RANK_8, FLAG_NORMAL)
+    move_count = _push_pawn_targets(moves_buffer, move_count, double, 16, BB_EMPTY, FLAG_DOUBLE_PUSH)
+    move_count = _push_pawn_targets(moves_buffer, move_count, capture_west, 7, RANK_8, FLAG_CAPTURE)
+    move_count = _push_pawn_targets(moves_buffer, move_count, capture_east, 9, RANK_8, FLAG_CAPTURE)
     return move_count
 
 
 @njit(cache=True)
-def _add_bishop_moves(sq, stm, piece_arr, color_arr, moves_buffer, move_count):
-    """Add bishop moves to buffer."""
-    attacks = get_bishop_attacks(sq, piece_arr)
-
-    for target in attacks:
-        if color_arr[target] == stm:
-            continue  # Can't capture own piece
+def _add_pawn_moves_black(pawns, own_occ, opp_occ, moves_buffer, move_count):
+    """Add moves for all black pawns, one target set at a time."""
+    single, double, capture_west, capture_east = _pawn_targets_black(
+        pawns, own_occ | opp_occ, opp_occ
+    )
+    move_count = _push_pawn_targets(moves_buffer, move_count, single, -8, RANK_1, FLAG_NORMAL)
+    move_count = _push_pawn_targets(moves_buffer, move_count, double, -16, BB_EMPTY, FLAG_DOUBLE_PUSH)
+    move_count = _push_pawn_targets(moves_buffer, move_count, capture_west, -9, RANK_1, FLAG_CAPTURE)
+    move_count = _push_pawn_targets(moves_buffer, move_count, capture_east, -7, RANK_1, FLAG_CAPTURE)
+    return move_count
 
-        flags = FLAG_CAPTURE if color_arr[target] != -1 else FLAG_NORMAL
-        moves_buffer[move_count] = np.array([sq, target, 0, flags], dtype=np.int16)
-        move_count += 1
 
+@njit(cache=True)
+def _add_knight_moves(sq, own_occ, opp_occ, moves_buffer, move_count):
+    """Add knight moves to buffer."""
+    attacks = get_knight_attacks(sq)
+    move_count = _push_targets(moves_buffer, move_count, sq, attacks & opp_occ, FLAG_CAPTURE)
+    move_count = _push_targets(
+        moves_buffer, move_count, sq, attacks & ~(own_occ | opp_occ), FLAG_NORMAL
+    )
     return move_count
 
 
 @njit(cache=True)
-def _add_rook_moves(sq, stm, piece_arr, color_arr, moves_buffer, move_count):
-    """Add rook moves to buffer."""
-    attacks = get_rook_attacks(sq, piece_arr)
-
-    for target in attacks:
-        if color_arr[target] == stm:
-            continue  # Can't capture own piece
+def _add_bishop_moves(sq, own_occ, opp_occ, moves_buffer, move_count):
+    """Add bishop moves to buffer."""
+    attacks = get_bishop_attacks(sq, own_occ | opp_occ)
+    move_count = _push_targets(moves_buffer, move_count, sq, attacks & opp_occ, FLAG_CAPTURE)
+    move_count = _push_targets(
+        moves_buffer, move_count, sq, attacks & ~(own_occ | opp_occ), FLAG_NORMAL
+    )
+    return move_count
 
-        flags = FLAG_CAPTURE if color_arr[target] != -1 else FLAG_NORMAL
-        moves_buffer[move_count] = np.array([sq, target, 0, flags], dtype=np.int16)
-        move_count += 1
 
+@njit(cache=True)
+def _add_rook_moves(sq, own_occ, opp_occ, moves_buffer, move_count):
+    """Add rook moves to buffer."""
+    attacks = get_rook_attacks(sq, own_occ | opp_occ)
+    move_count = _push_targets(moves_buffer, move_count, sq, attacks & opp_occ, FLAG_CAPTURE)
+    move_count = _push_targets(
+        moves_buffer, move_count, sq, attacks & ~(own_occ | opp_occ), FLAG_NORMAL
+    )
     return move_count
 
 
 @njit(cache=True)
-def _add_queen_moves(sq, stm, piece_arr, color_arr, moves_buffer, move_count):
+def _add_queen_moves(sq, own_occ, opp_occ, moves_buffer, move_count):
     """Add queen moves to buffer."""
-    attacks = get_queen_attacks(sq, piece_arr)
-
-    for target in attacks:
-        if color_arr[target] == stm:
-            continue  # Can't capture own piece
-
-        flags = FLAG_CAPTURE if color_arr[target] != -1 else FLAG_NORMAL
-        moves_buffer[move_count] = np.array([sq, target, 0, flags], dtype=np.int16)
-        move_count += 1
-
+    attacks = get_queen_attacks(sq, own_occ | opp_occ)
+    move_count = _push_targets(moves_buffer, move_count, sq, attacks & opp_occ, FLAG_CAPTURE)
+    move_count = _push_targets(
+        moves_buffer, move_count, sq, attacks & ~(own_occ | opp_occ), FLAG_NORMAL
+    )
     return move_count
 
 
 @njit(cache=True)
-def _add_king_moves(sq, stm, piece_arr, color_arr, moves_buffer, move_count):
+def _add_king_moves(sq, own_occ, opp_occ, moves_buffer, move_count):
     """Add king moves to buffer."""
     attacks = get_king_attacks(sq)
-
-    for target in attacks:
-        if color_arr[target] == stm:
-            continue  # Can't capture own piece
-
-        flags = FLAG_CAPTURE if color_arr[target] != -1 else FLAG_NORMAL
-        moves_buffer[move_count] = np.array([sq, target, 0, flags], dtype=np.int16)
-        move_count += 1
-
+    move_count = _push_targets(moves_buffer, move_count, sq, attacks & opp_occ, FLAG_CAPTURE)
+    move_count = _push_targets(
+        moves_buffer, move_count, sq, attacks & ~(own_occ | opp_occ), FLAG_NORMAL
+    )
     return move_count
@@ -5,17 +5,34 @@ For single-board operations, we convert to NumPy and use CPU implementation.
 For batch operations, we use native GPU kernels for maximum performance.
 """
 
+import threading
+
 import cupy as cp
+import cupyx
 import numpy as np
 
 # Import CPU implementation to use for single-board operations
 from .engine_cpu import EngineCPU
+from .coalesce import BatchCoalescer
+from .chess_utils import (
+    KNIGHT_ATTACKS, KING_ATTACKS,
+    BISHOP_MASKS, BISHOP_MAGICS, BISHOP_SHIFTS, BISHOP_OFFSETS, BISHOP_ATTACKS,
+    ROOK_MASKS, ROOK_MAGICS, ROOK_SHIFTS, ROOK_OFFSETS, ROOK_ATTACKS,
+)
+
+
+def _to_host(arr):
+    """
+    Host view of a single board. NumPy input is used as-is; a 64-byte board
+    is not worth a device round trip, so single-board results stay on the host.
+    """
+    return arr.get() if isinstance(arr, cp.ndarray) else arr
 
 
 class EngineGPU:
     """
     GPU backend using CuPy.
-    Single-board operations delegate to CPU.
+    Single-board operations delegate to CPU and return NumPy results.
     Batch operations use native GPU kernels for performance.
     """
 
@@ -25,19 +42,13 @@ class EngineGPU:
         Compute attack maps (delegates to CPU for single board).
 
         Args:
-            piece_arr: CuPy array (64,)
-            color_arr: CuPy array (64,)
+            piece_arr: NumPy or CuPy array (64,)
+            color_arr: NumPy or CuPy array (64,)
 
         Returns:
-            (white_att, black_att): CuPy bool arrays (64,)
+            (white_att, black_att): NumPy bool arrays (64,)
         """
-        # Convert to NumPy, compute on CPU, convert back
-        piece_np = cp.asnumpy(piece_arr)
-        color_np = cp.asnumpy(color_arr)
-
-        white_np, black_np = EngineCPU.compute_attack_maps(piece_np, color_np)
-
-        return cp.asarray(white_np), cp.asarray(black_np)
+        return EngineCPU.compute_attack_maps(_to_host(piece_arr), _to_host(color_arr))
 
     @staticmethod
     def evaluate(piece_arr, color_arr):
@@ -45,17 +56,13 @@ class EngineGPU:
         Evaluate position (delegates to CPU for single board).
 
         Args:
-            piece_arr: CuPy array (64,)
-            color_arr: CuPy array (64,)
+            piece_arr: NumPy or CuPy array (64,)
+            color_arr: NumPy or CuPy array (64,)
 
         Returns:
             (white_off, white_def, black_off, black_def): Python ints
         """
-        # Convert to NumPy, compute on CPU
-        piece_np = cp.asnumpy(piece_arr)
-        color_np = cp.asnumpy(color_arr)
-
-        return EngineCPU.evaluate(piece_np, color_np)
+        return EngineCPU.evaluate(_to_host(piece_arr), _to_host(color_arr))
 
     @staticmethod
     def generate_pseudo_legal_moves(piece_arr, color_arr, stm):
@@ -63,20 +70,31 @@ class EngineGPU:
         Generate pseudo-legal moves (delegates to CPU for single board).
 
         Args:
-            piece_arr: CuPy array (64,)
-            color_arr: CuPy array (64,)
+            piece_arr: NumPy or CuPy array (64,)
+            color_arr: NumPy or CuPy array (64,)
             stm: Side to move (0=white, 1=black)
 
         Returns:
-            CuPy array (M, 4)
+            NumPy array (M, 4)
+        """
+        return EngineCPU.generate_pseudo_legal_moves(_to_host(piece_arr), _to_host(color_arr), stm)
+
+    @staticmethod
+    def async_evaluate(piece_arr, color_arr):
         """
-        # Convert to NumPy, compute on CPU, convert back
-        piece_np = cp.asnumpy(piece_arr)
-        color_np = cp.asnumpy(color_arr)
+        Queue one board for evaluation as part of a coalesced GPU batch.
 
-        moves_np = EngineCPU.generate_pseudo_legal_moves(piece_np, color_np, stm)
+        Concurrent callers (e.g. parallel search workers) share a single
+        evaluate_batch launch instead of paying for one each.
 
-        return cp.asarray(moves_np)
+        Args:
+            piece_arr: NumPy or CuPy array (64,)
+            color_arr: NumPy or CuPy array (64,)
+
+        Returns:
+            Future resolving to (white_off, white_def, black_off, black_def)
+        """
+        return _EVALUATE_COALESCER.submit(piece_arr, color_arr)
 
     # ========================================================================
     # BATCH OPERATIONS (Native GPU Implementation)
@@ -95,44 +113,51 @@ class EngineGPU:
             (white_off, white_def, black_off, black_def): CuPy arrays (N,)
         """
         N = piece_batch.shape[0]
+        piece_batch = cp.ascontiguousarray(piece_batch, dtype=cp.int8)
+        color_batch = cp.ascontiguousarray(color_batch, dtype=cp.int8)
+        white_off = cp.empty(N, dtype=cp.int32)
+        white_def = cp.empty(N, dtype=cp.int32)
+        black_off = cp.empty(N, dtype=cp.int32)
+        black_def = cp.empty(N, dtype=cp.int32)
+        _launch_evaluate(piece_batch, color_batch, white_off, white_def, black_off, black_def)
+        return white_off, white_def, black_off, black_def
 
-        # Material counting (vectorized)
-        # Piece values: [Empty, Pawn, Knight, Bishop, Rook, Queen, King]
-        piece_values = cp.array([0, 100, 320, 330, 500, 900, 0], dtype=cp.int32)
-
-        # Broadcast indexing: piece_batch (N, 64) -> material (N, 64)
-        material = piece_values[piece_batch]
+    @staticmethod
+    def evaluate_batch_host(piece_batch, color_batch):
+        """
+        Evaluate a batch of host boards and return host scores.
 
-        # Create masks for white and black pieces
-        white_mask = (color_batch == 0).astype(cp.int32)
-        black_mask = (color_batch == 1).astype(cp.int32)
+        For request handlers whose boards start and end on the CPU: inputs
+        are staged through reused pinned buffers and the upload, kernel and
+        download are queued on one persistent stream with a single sync.
 
-        # Sum material for each side (N,)
-        white_material = cp.sum(material * white_mask, axis=1)
-        black_material = cp.sum(material * black_mask, axis=1)
+        Args:
+            piece_batch: NumPy array (N, 64)
+            color_batch: NumPy array (N, 64)
 
-        # Mobility counting (simplified: count pieces that can move)
-        # For now, use piece count as proxy for mobility
-        # TODO: Implement proper move counting on GPU
-        white_mobility = cp.sum(white_mask * (piece_batch > 0), axis=1) * 10
-        black_mobility = cp.sum(black_mask * (piece_batch > 0), axis=1) * 10
+        Returns:
+            (white_off, white_def, black_off, black_def): NumPy int32 arrays (N,)
+        """
+        return _evaluate_batch_host_gpu(piece_batch, color_batch)
 
-        # King safety (simplified: count pawns near king)
-        white_king_safety = _evaluate_king_safety_batch_gpu(piece_batch, color_batch, 0)
-        black_king_safety = _evaluate_king_safety_batch_gpu(piece_batch, color_batch, 1)
+    @staticmethod
+    def compute_attack_bitboards_batch(piece_batch, color_batch):
+        """
+        Compute packed attack bitboards for batch of positions with one GPU kernel.
 
-        # Combine scores
-        white_off = white_material + white_mobility
-        white_def = white_king_safety
-        black_off = black_material + black_mobility
-        black_def = black_king_safety
+        Args:
+            piece_batch: CuPy array (N, 64)
+            color_batch: CuPy array (N, 64)
 
-        return white_off, white_def, black_off, black_def
+        Returns:
+            (white_bb, black_bb): CuPy uint64 arrays (N,)
+        """
+        return _compute_attack_bitboards_batch_gpu(piece_batch, color_batch)
 
     @staticmethod
     def compute_attack_maps_batch(piece_batch, color_batch):
         """
-        Compute attack maps for batch of positions using GPU kernels.
+        Compute attack maps for batch of positions with one fused GPU kernel.
 
         Args:
             piece_batch: CuPy array (N, 64)
@@ -141,17 +166,8 @@ class EngineGPU:
         Returns:
             (white_att, black_att): CuPy bool arrays (N, 64)
         """
-        N = piece_batch.shape[0]
-        white_att = cp.zeros((N, 64), dtype=cp.bool_)
-        black_att = cp.zeros((N, 64), dtype=cp.bool_)
-
-        # Compute attacks for each piece type
-        _compute_pawn_attacks_batch_gpu(piece_batch, color_batch, white_att, black_att)
-        _compute_knight_attacks_batch_gpu(piece_batch, color_batch, white_att, black_att)
-        _compute_king_attacks_batch_gpu(piece_batch, color_batch, white_att, black_att)
-        _compute_sliding_attacks_batch_gpu(piece_batch, color_batch, white_att, black_att)
-
-        return white_att, black_att
+        white_bb, black_bb = _compute_attack_bitboards_batch_gpu(piece_batch, color_batch)
+        return _bitboards_to_bool_gpu(white_bb), _bitboards_to_bool_gpu(black_bb)
 
     @staticmethod
     def generate_moves_batch(piece_batch, color_batch, stm_batch):
@@ -167,324 +183,632 @@ class EngineGPU:
             moves: CuPy array (M, 5) where M = total moves across all boards
                    Columns: [board_idx, from_sq, to_sq, promo, flags]
         """
-        N = piece_batch.shape[0]
-
-        # Pre-allocate buffer (max 256 moves per position)
-        max_moves = N * 256
-        moves_buffer = cp.zeros((max_moves, 5), dtype=cp.int16)
-        move_counts = cp.zeros(N, dtype=cp.int32)
+        moves_buffer, move_counts = _generate_moves_batch_gpu(piece_batch, color_batch, stm_batch)
+        # Threads append concurrently, so a board's moves are not in CPU order
+        return _compact_moves_gpu(moves_buffer, move_counts)
 
-        # Generate moves using GPU kernel
-        _generate_moves_batch_gpu(
-            piece_batch, color_batch, stm_batch,
-            moves_buffer, move_counts
-        )
-
-        # Compact: remove empty slots
-        total_moves = int(cp.sum(move_counts))
-        if total_moves == 0:
-            return cp.zeros((0, 5), dtype=cp.int16)
 
-        # Use prefix sum for compaction
-        offsets = cp.cumsum(move_counts) - move_counts
-        moves = cp.empty((total_moves, 5), dtype=cp.int16)
-        _compact_moves_gpu(moves_buffer, move_counts, offsets, moves, N)
-
-        return moves
+_EVALUATE_COALESCER = BatchCoalescer(EngineGPU.evaluate_batch)
 
 
 # ============================================================================
-# GPU Helper Functions and Kernels
+# CUDA Kernels
 # ============================================================================
 
-def _evaluate_king_safety_batch_gpu(piece_batch, color_batch, side):
-    """
-    Evaluate king safety for a batch of positions (vectorized).
-
-    Args:
-        piece_batch: CuPy array (N, 64)
-        color_batch: CuPy array (N, 64)
-        side: 0 for white, 1 for black
-
-    Returns:
-        CuPy array (N,) - king safety scores
-    """
-    N = piece_batch.shape[0]
-
-    # Find king positions (piece == 6, color == side)
-    king_mask = (piece_batch == 6) & (color_batch == side)
+# Per-board kernels run one 64-thread group per board (one thread per
+# square) and pack several boards into each block: 64-thread blocks would
+# hit the per-SM resident-block limit long before the warp limit.
+_BOARDS_PER_BLOCK = 4
+_BOARD_LAYOUT = f"#define BOARDS_PER_BLOCK {_BOARDS_PER_BLOCK}\n"
 
-    # For simplicity, count pawns of same color (pawn shield)
-    pawn_mask = (piece_batch == 1) & (color_batch == side)
-    pawn_count = cp.sum(pawn_mask.astype(cp.int32), axis=1)
 
-    # Simple king safety: 15 points per pawn
-    return pawn_count * 15
+def _board_launch(n_boards):
+    """(grid, block) dimensions for a per-board kernel over n_boards boards."""
+    return (-(-n_boards // _BOARDS_PER_BLOCK),), (64 * _BOARDS_PER_BLOCK,)
 
 
-# ============================================================================
-# CUDA Kernels for Attack Maps (Lazy-loaded)
-# ============================================================================
-
-# Kernel cache (loaded on first use)
-_knight_attacks_kernel = None
-_king_attacks_kernel = None
-_pawn_attacks_kernel = None
+_EVALUATE_SRC = _BOARD_LAYOUT + r'''
+// Piece values: [Empty, Pawn, Knight, Bishop, Rook, Queen, King]
+__constant__ int piece_values[7] = {0, 100, 320, 330, 500, 900, 0};
 
+__device__ __forceinline__ unsigned warp_sum(unsigned v) {
+    for (int delta = 16; delta > 0; delta >>= 1)
+        v += __shfl_down_sync(0xffffffffu, v, delta);
+    return v;
+}
 
-def _get_knight_attacks_kernel():
-    """Lazy-load knight attacks kernel."""
-    global _knight_attacks_kernel
-    if _knight_attacks_kernel is None:
-        _knight_attacks_kernel = cp.RawKernel(r'''
 extern "C" __global__
-void knight_attacks(
-    const char* piece,
-    const char* color,
-    bool* white_att,
-    bool* black_att,
+void evaluate(
+    const signed char* piece,
+    const signed char* color,
+    int* white_off,
+    int* white_def,
+    int* black_off,
+    int* black_def,
     int n_boards
 ) {
-    int board_idx = blockIdx.x;
-    int sq = threadIdx.x;
-
-    if (board_idx >= n_boards || sq >= 64) return;
+    // One thread per square, BOARDS_PER_BLOCK boards per block. Simplified
+    // GPU scoring:
+    //   off = material + 10 per piece (mobility proxy)
+    //   def = 15 per pawn (pawn-shield proxy)
+    __shared__ unsigned partial[BOARDS_PER_BLOCK][2][2];
+
+    int local = threadIdx.x >> 6;
+    int board_idx = blockIdx.x * BOARDS_PER_BLOCK + local;
+    int sq = threadIdx.x & 63;
+    // Threads past the last board idle through the barrier rather than exit
+    bool active = board_idx < n_boards;
 
     int offset = board_idx * 64;
-    if (piece[offset + sq] != 2) return;  // Not a knight
-
-    // Knight move offsets
-    const int offsets[8] = {-17, -15, -10, -6, 6, 10, 15, 17};
-    const int file_diffs[8] = {-1, 1, -2, 2, 2, -2, 1, -1};
-
-    int sq_file = sq % 8;
-    int sq_rank = sq / 8;
-
-    for (int i = 0; i < 8; i++) {
-        int target = sq + offsets[i];
-        if (target < 0 || target >= 64) continue;
+    int p = active ? piece[offset + sq] : 0;
+    int c = active ? color[offset + sq] : -1;
+    unsigned off = (p > 0) ? piece_values[p] + 10 : 0;
+    unsigned def = (p == 1) ? 15 : 0;
+
+    // White and black share one 32-bit word, 16 bits each, halving the
+    // shuffles. A side's total fits: even 64 queens sum to 64 * 910 < 2^16.
+    int shift = (c == 1) ? 16 : 0;
+    unsigned off_sum = warp_sum(c >= 0 ? off << shift : 0);
+    unsigned def_sum = warp_sum(c >= 0 ? def << shift : 0);
+
+    int warp = sq >> 5;
+    if ((sq & 31) == 0) {
+        partial[local][warp][0] = off_sum;
+        partial[local][warp][1] = def_sum;
+    }
+    __syncthreads();
+
+    if (sq == 0 && active) {
+        unsigned off_total = partial[local][0][0] + partial[local][1][0];
+        unsigned def_total = partial[local][0][1] + partial[local][1][1];
+        white_off[board_idx] = off_total & 0xFFFF;
+        white_def[board_idx] = def_total & 0xFFFF;
+        black_off[board_idx] = off_total >> 16;
+        black_def[board_idx] = def_total >> 16;
+    }
+}
+'''
 
-        int target_file = target % 8;
-        int target_rank = target / 8;
+# Helpers shared by the attack and move-generation kernels
+_KERNEL_PRELUDE = _BOARD_LAYOUT + r'''
+typedef unsigned long long u64;
 
-        // Check file difference matches expected
-        if (abs(target_file - sq_file) != abs(file_diffs[i])) continue;
+__device__ __forceinline__ u64 magic_lookup(
+    int sq, u64 occ,
+    const u64* mask, const u64* magic, const u64* shift,
+    const u64* offset, const u64* table
+) {
+    u64 idx = ((occ & mask[sq]) * magic[sq]) >> shift[sq];
+    return table[offset[sq] + idx];
+}
+'''
 
-        if (color[offset + sq] == 0) {
-            white_att[offset + target] = true;
-        } else {
-            black_att[offset + target] = true;
-        }
+_ATTACK_BITBOARDS_SRC = _KERNEL_PRELUDE + r'''
+__device__ __forceinline__ u64 warp_or(u64 v) {
+    for (int delta = 16; delta > 0; delta >>= 1) {
+        v |= __shfl_xor_sync(0xffffffffu, v, delta);
     }
+    return v;
 }
-''', 'knight_attacks')
-    return _knight_attacks_kernel
-
 
-def _get_king_attacks_kernel():
-    """Lazy-load king attacks kernel."""
-    global _king_attacks_kernel
-    if _king_attacks_kernel is None:
-        _king_attacks_kernel = cp.RawKernel(r'''
 extern "C" __global__
-void king_attacks(
-    const char* piece,
-    const char* color,
-    bool* white_att,
-    bool* black_att,
+void attack_bitboards(
+    const signed char* piece,
+    const signed char* color,
+    const u64* knight_att,
+    const u64* king_att,
+    const u64* b_mask, const u64* b_magic, const u64* b_shift,
+    const u64* b_offset, const u64* b_table,
+    const u64* r_mask, const u64* r_magic, const u64* r_shift,
+    const u64* r_offset, const u64* r_table,
+    u64* white_out,
+    u64* black_out,
     int n_boards
 ) {
-    int board_idx = blockIdx.x;
-    int sq = threadIdx.x;
-
-    if (board_idx >= n_boards || sq >= 64) return;
+    // One thread per square, BOARDS_PER_BLOCK boards per block: each board
+    // is two warps covering four ranks each. Per-warp results are combined
+    // with ballots and shuffles, so the only shared-memory traffic is one
+    // write per warp.
+    __shared__ unsigned occ_half[BOARDS_PER_BLOCK][2];
+    __shared__ u64 warp_att[BOARDS_PER_BLOCK][2][2];  // [board][warp][color]
+
+    int local = threadIdx.x >> 6;
+    int board_idx = blockIdx.x * BOARDS_PER_BLOCK + local;
+    int sq = threadIdx.x & 63;
+    int lane = sq & 31;
+    int warp = sq >> 5;
+    // Threads past the last board idle through the barriers rather than exit
+    bool active = board_idx < n_boards;
 
     int offset = board_idx * 64;
-    if (piece[offset + sq] != 6) return;  // Not a king
-
-    // King move offsets
-    const int offsets[8] = {-9, -8, -7, -1, 1, 7, 8, 9};
+    signed char p = active ? piece[offset + sq] : 0;
+    signed char c = active ? color[offset + sq] : -1;
+    unsigned occupied = __ballot_sync(0xffffffffu, p != 0);
+    if (lane == 0) occ_half[local][warp] = occupied;
+    __syncthreads();
+    u64 occ = ((u64)occ_half[local][1] << 32) | occ_half[local][0];
+
+    u64 att = 0;
+    int file = sq & 7;
+    switch (p) {
+    case 1:  // Pawn
+        if (c == 0) {
+            if (file > 0 && sq + 7 < 64) att |= 1ULL << (sq + 7);
+            if (file < 7 && sq + 9 < 64) att |= 1ULL << (sq + 9);
+        } else {
+            if (file > 0 && sq - 9 >= 0) att |= 1ULL << (sq - 9);
+            if (file < 7 && sq - 7 >= 0) att |= 1ULL << (sq - 7);
+        }
+        break;
+    case 2:  // Knight
+        att = knight_att[sq];
+        break;
+    case 3:  // Bishop
+        att = magic_lookup(sq, occ, b_mask, b_magic, b_shift, b_offset, b_table);
+        break;
+    case 4:  // Rook
+        att = magic_lookup(sq, occ, r_mask, r_magic, r_shift, r_offset, r_table);
+        break;
+    case 5:  // Queen
+        att = magic_lookup(sq, occ, b_mask, b_magic, b_shift, b_offset, b_table)
+            | magic_lookup(sq, occ, r_mask, r_magic, r_shift, r_offset, r_table);
+        break;
+    case 6:  // King
+        att = king_att[sq];
+        break;
+    }
+    u64 white_att = warp_or(c == 0 ? att : 0);
+    u64 black_att = warp_or(c == 1 ? att : 0);
+    if (lane == 0) {
+        warp_att[local][warp][0] = white_att;
+        warp_att[local][warp][1] = black_att;
+    }
+    __syncthreads();
 
-    int sq_file = sq % 8;
+    if (!active) return;
+    if (sq == 0) white_out[board_idx] = warp_att[local][0][0] | warp_att[local][1][0];
+    if (sq == 1) black_out[board_idx] = warp_att[local][0][1] | warp_att[local][1][1];
+}
+'''
 
-    for (int i = 0; i < 8; i++) {
-        int target = sq + offsets[i];
-        if (target < 0 || target >= 64) continue;
 
-        int target_file = target % 8;
+# Per-board move slots in the generation buffer (matches engine_cpu.MAX_MOVES)
+_GPU_MAX_MOVES = 256
 
-        // Check for board wrap
-        if (abs(target_file - sq_file) > 1) continue;
+_GENERATE_MOVES_SRC = _KERNEL_PRELUDE + r'''
+#define MAX_MOVES 256
+#define FLAG_CAPTURE 1
+#define FLAG_DOUBLE_PUSH 8
 
-        if (color[offset + sq] == 0) {
-            white_att[offset + target] = true;
-        } else {
-            black_att[offset + target] = true;
-        }
+__device__ __forceinline__ void emit_move(
+    short* moves_buffer, int* count, int board_idx,
+    int from_sq, int to_sq, int promo, int flags
+) {
+    int slot = atomicAdd(count, 1);
+    if (slot < MAX_MOVES) {
+        short* row = moves_buffer + ((long long)board_idx * MAX_MOVES + slot) * 5;
+        row[0] = (short)board_idx;
+        row[1] = (short)from_sq;
+        row[2] = (short)to_sq;
+        row[3] = (short)promo;
+        row[4] = (short)flags;
     }
 }
-''', 'king_attacks')
-    return _king_attacks_kernel
 
+__device__ __forceinline__ void emit_pawn_move(
+    short* moves_buffer, int* count, int board_idx,
+    int from_sq, int to_sq, bool promotes, int flags
+) {
+    if (promotes) {
+        for (int promo = 2; promo <= 5; promo++)  // N, B, R, Q
+            emit_move(moves_buffer, count, board_idx, from_sq, to_sq, promo, flags);
+    } else {
+        emit_move(moves_buffer, count, board_idx, from_sq, to_sq, 0, flags);
+    }
+}
 
-def _get_pawn_attacks_kernel():
-    """Lazy-load pawn attacks kernel."""
-    global _pawn_attacks_kernel
-    if _pawn_attacks_kernel is None:
-        _pawn_attacks_kernel = cp.RawKernel(r'''
 extern "C" __global__
-void pawn_attacks(
-    const char* piece,
-    const char* color,
-    bool* white_att,
-    bool* black_att,
+void generate_moves(
+    const signed char* piece,
+    const signed char* color,
+    const signed char* stm_batch,
+    const u64* knight_att,
+    const u64* king_att,
+    const u64* b_mask, const u64* b_magic, const u64* b_shift,
+    const u64* b_offset, const u64* b_table,
+    const u64* r_mask, const u64* r_magic, const u64* r_shift,
+    const u64* r_offset, const u64* r_table,
+    short* moves_buffer,
+    int* move_counts,
     int n_boards
 ) {
-    int board_idx = blockIdx.x;
-    int sq = threadIdx.x;
-
-    if (board_idx >= n_boards || sq >= 64) return;
+    // One thread per square, BOARDS_PER_BLOCK boards per block; each thread
+    // emits the moves of its own piece into its board's MAX_MOVES slots
+    __shared__ u64 side_occ[BOARDS_PER_BLOCK][2];
+
+    int local = threadIdx.x >> 6;
+    int board_idx = blockIdx.x * BOARDS_PER_BLOCK + local;
+    int sq = threadIdx.x & 63;
+    // Threads past the last board idle through the barriers rather than exit
+    bool active = board_idx < n_boards;
+
+    if (sq == 0) {
+        side_occ[local][0] = 0;
+        side_occ[local][1] = 0;
+        // The count is reset here rather than by a separate memset launch;
+        // the barrier below orders it before this block's atomicAdds
+        if (active) move_counts[board_idx] = 0;
+    }
+    __syncthreads();
 
     int offset = board_idx * 64;
-    if (piece[offset + sq] != 1) return;  // Not a pawn
-
-    int sq_file = sq % 8;
-    int sq_rank = sq / 8;
-
-    if (color[offset + sq] == 0) {  // White pawn
-        // Attacks diagonally forward (rank + 1)
-        if (sq_rank < 7) {
-            if (sq_file > 0) {
-                white_att[offset + sq + 7] = true;  // Up-left
-            }
-            if (sq_file < 7) {
-                white_att[offset + sq + 9] = true;  // Up-right
-            }
+    signed char p = active ? piece[offset + sq] : 0;
+    signed char c = active ? color[offset + sq] : -1;
+    if (p != 0 && c >= 0) atomicOr(&side_occ[local][c], 1ULL << sq);
+    __syncthreads();
+
+    if (p == 0) return;
+    int stm = stm_batch[board_idx];
+    if (c != stm) return;
+
+    u64 own = side_occ[local][stm];
+    u64 opp = side_occ[local][1 - stm];
+    u64 occ = own | opp;
+    int* count = &move_counts[board_idx];
+
+    if (p == 1) {  // Pawn
+        int rank = sq >> 3;
+        int file = sq & 7;
+        int up = (stm == 0) ? 8 : -8;
+        bool promotes = (stm == 0) ? (rank == 6) : (rank == 1);
+        bool on_start = (stm == 0) ? (rank == 1) : (rank == 6);
+
+        int to = sq + up;
+        if (to >= 0 && to < 64 && !((occ >> to) & 1ULL)) {
+            emit_pawn_move(moves_buffer, count, board_idx, sq, to, promotes, 0);
+            int to2 = to + up;
+            if (on_start && !((occ >> to2) & 1ULL))
+                emit_move(moves_buffer, count, board_idx, sq, to2, 0, FLAG_DOUBLE_PUSH);
+        }
+        if (file > 0) {
+            to = sq + up - 1;
+            if (to >= 0 && to < 64 && ((opp >> to) & 1ULL))
+                emit_pawn_move(moves_buffer, count, board_idx, sq, to, promotes, FLAG_CAPTURE);
         }
-    } else {  // Black pawn
-        // Attacks diagonally forward (rank - 1)
-        if (sq_rank > 0) {
-            if (sq_file > 0) {
-                black_att[offset + sq - 9] = true;  // Down-left
-            }
-            if (sq_file < 7) {
-                black_att[offset + sq - 7] = true;  // Down-right
-            }
+        if (file < 7) {
+            to = sq + up + 1;
+            if (to >= 0 && to < 64 && ((opp >> to) & 1ULL))
+                emit_pawn_move(moves_buffer, count, board_idx, sq, to, promotes, FLAG_CAPTURE);
         }
+        return;
+    }
+
+    u64 att = 0;
+    switch (p) {
+    case 2:  // Knight
+        att = knight_att[sq];
+        break;
+    case 3:  // Bishop
+        att = magic_lookup(sq, occ, b_mask, b_magic, b_shift, b_offset, b_table);
+        break;
+    case 4:  // Rook
+        att = magic_lookup(sq, occ, r_mask, r_magic, r_shift, r_offset, r_table);
+        break;
+    case 5:  // Queen
+        att = magic_lookup(sq, occ, b_mask, b_magic, b_shift, b_offset, b_table)
+            | magic_lookup(sq, occ, r_mask, r_magic, r_shift, r_offset, r_table);
+        break;
+    case 6:  // King
+        att = king_att[sq];
+        break;
+    }
+
+    u64 targets = att & ~own;
+    while (targets) {
+        int to = __ffsll((long long)targets) - 1;
+        targets &= targets - 1;
+        int flags = ((opp >> to) & 1ULL) ? FLAG_CAPTURE : 0;
+        emit_move(moves_buffer, count, board_idx, sq, to, 0, flags);
     }
 }
-''', 'pawn_attacks')
-    return _pawn_attacks_kernel
+'''
 
 
-def _compute_knight_attacks_batch_gpu(piece_batch, color_batch, white_att, black_att):
-    """Launch knight attacks kernel."""
-    N = piece_batch.shape[0]
-    kernel = _get_knight_attacks_kernel()
-    # RawKernel call: kernel((grid,), (block,), (args,))
-    kernel(
-        (N,), (64,),  # grid and block dimensions
-        (piece_batch, color_batch, white_att, black_att, N)
-    )
+_COMPACT_MOVES_SRC = r'''
+extern "C" __global__
+void compact_moves(
+    const short* moves_buffer,
+    const int* move_counts,
+    const long long* offsets,
+    short* moves,
+    int n_boards,
+    int max_moves
+) {
+    // One block per board, one thread per slot: copy the filled slots of
+    // board i to moves[offsets[i]:offsets[i] + count]
+    int board_idx = blockIdx.x;
+    int slot = threadIdx.x;
+    if (board_idx >= n_boards) return;
 
+    int count = min(move_counts[board_idx], max_moves);
+    if (slot >= count) return;
 
-def _compute_king_attacks_batch_gpu(piece_batch, color_batch, white_att, black_att):
-    """Launch king attacks kernel."""
+    const short* src = moves_buffer + ((long long)board_idx * max_moves + slot) * 5;
+    short* dst = moves + (offsets[board_idx] + slot) * 5;
+    for (int k = 0; k < 5; k++) dst[k] = src[k];
+}
+'''
+
+
+# Kernels are compiled and lookup tables uploaded once at import, so the
+# first batch call does not pay NVRTC compilation. CuPy keeps compiled
+# binaries in its on-disk kernel cache (keyed by source and device
+# architecture), so later processes load them instead of recompiling.
+_EVALUATE_KERNEL = cp.RawKernel(_EVALUATE_SRC, 'evaluate')
+_ATTACK_BITBOARDS_KERNEL = cp.RawKernel(_ATTACK_BITBOARDS_SRC, 'attack_bitboards')
+_GENERATE_MOVES_KERNEL = cp.RawKernel(_GENERATE_MOVES_SRC, 'generate_moves')
+_COMPACT_MOVES_KERNEL = cp.RawKernel(_COMPACT_MOVES_SRC, 'compact_moves')
+for _kernel in (
+    _EVALUATE_KERNEL, _ATTACK_BITBOARDS_KERNEL, _GENERATE_MOVES_KERNEL, _COMPACT_MOVES_KERNEL
+):
+    _kernel.compile()
+
+_ATTACK_TABLES = tuple(cp.asarray(t) for t in (
+    KNIGHT_ATTACKS, KING_ATTACKS,
+    BISHOP_MASKS, BISHOP_MAGICS, BISHOP_SHIFTS, BISHOP_OFFSETS, BISHOP_ATTACKS,
+    ROOK_MASKS, ROOK_MAGICS, ROOK_SHIFTS, ROOK_OFFSETS, ROOK_ATTACKS,
+))
+
+
+# Per-call scratch buffers, reused across calls so a fixed-size batch loop
+# allocates nothing after the first call. Each buffer only grows; callers
+# get a view of the leading elements. Buffers are per thread: within one
+# thread every consumer of a scratch buffer is queued on the stream before
+# the next call can overwrite it, but another thread's launches could land
+# in between. Everything else comes from CuPy's default memory pool, which
+# already recycles same-size blocks.
+_SCRATCH = threading.local()
+
+
+# Pinned staging buffers start large enough for one board per legal move in
+# a position (at most 218), the batch an opponent request evaluates, so
+# request-sized batches never regrow them.
+_PINNED_MIN_BOARDS = 218
+
+
+def _get_scratch(name, shape, dtype):
+    """Uninitialized device buffer of `shape`, reused between this thread's calls under `name`."""
+    size = 1
+    for dim in shape:
+        size *= dim
+    buffers = _SCRATCH.__dict__
+    buf = buffers.get(name)
+    if buf is None or buf.dtype != dtype or buf.size < size:
+        buf = cp.empty(max(size, 1), dtype=dtype)
+        buffers[name] = buf
+    return buf[:size].reshape(shape)
+
+
+def _get_pinned_total():
+    """This thread's one-element pinned host buffer for reading a device total."""
+    total = getattr(_SCRATCH, 'pinned_total', None)
+    if total is None:
+        total = _SCRATCH.pinned_total = cupyx.empty_pinned((1,), dtype=np.int64)
+    return total
+
+
+def _get_pinned(name, shape, dtype):
+    """Pinned host buffer of `shape`, reused between this thread's calls under `name`."""
+    size = 1
+    for dim in shape:
+        size *= dim
+    buffers = _SCRATCH.__dict__
+    key = 'pinned_' + name
+    buf = buffers.get(key)
+    if buf is None or buf.dtype != dtype or buf.size < size:
+        buf = cupyx.empty_pinned(max(size, _PINNED_MIN_BOARDS * 64), dtype=dtype)
+        buffers[key] = buf
+    return buf[:size].reshape(shape)
+
+
+def _get_stream():
+    """This thread's persistent non-blocking stream for host round trips."""
+    stream = getattr(_SCRATCH, 'stream', None)
+    if stream is None:
+        stream = _SCRATCH.stream = cp.cuda.Stream(non_blocking=True)
+    return stream
+
+
+def _launch_evaluate(piece_batch, color_batch, white_off, white_def, black_off, black_def):
+    """Launch the evaluate kernel on the current stream into preallocated (N,) outputs."""
     N = piece_batch.shape[0]
-    kernel = _get_king_attacks_kernel()
-    kernel(
-        (N,), (64,),  # grid and block dimensions
-        (piece_batch, color_batch, white_att, black_att, N)
+    if N == 0:
+        return
+    # One fused pass: each board is read once and reduced to four scores
+    _EVALUATE_KERNEL(
+        *_board_launch(N),
+        (piece_batch, color_batch, white_off, white_def, black_off, black_def, cp.int32(N))
     )
 
 
-def _compute_pawn_attacks_batch_gpu(piece_batch, color_batch, white_att, black_att):
-    """Launch pawn attacks kernel."""
-    N = piece_batch.shape[0]
-    kernel = _get_pawn_attacks_kernel()
-    kernel(
-        (N,), (64,),  # grid and block dimensions
-        (piece_batch, color_batch, white_att, black_att, N)
-    )
+def _enqueue_evaluate_round_trip(stream, h_piece, h_color, h_scores, d_piece, d_color, d_scores):
+    """Queue upload, evaluate kernel and download on `stream`; does not wait."""
+    with stream:
+        d_piece.set(h_piece, stream=stream)
+        d_color.set(h_color, stream=stream)
+        _launch_evaluate(d_piece, d_color, *d_scores)
+        d_scores.get(stream=stream, out=h_scores, blocking=False)
+
+
+# Batch sizes that get a captured CUDA graph for the host evaluate path; a
+# call is padded up to the next bucket. The largest covers one board per
+# legal move. Bigger batches, or drivers that cannot capture, fall back to
+# queuing the same work directly.
+_EVALUATE_GRAPH_BUCKETS = (1, 4, 8, 16, 32, 64, 128, 256)
+_graphs_supported = True
 
 
-def _compute_sliding_attacks_batch_gpu(piece_batch, color_batch, white_att, black_att):
+class _EvaluateGraph:
     """
-    Compute sliding piece attacks (bishops, rooks, queens).
-    For now, use CPU implementation per board (sliding pieces are complex on GPU).
-    TODO: Implement proper ray-tracing CUDA kernel.
+    The pinned-upload / evaluate / download sequence for `n` boards,
+    captured once and replayed per call. The graph bakes in its buffers'
+    addresses, so it owns them rather than using the growable scratch.
     """
-    N = piece_batch.shape[0]
 
-    # Convert to CPU, compute, convert back
-    # This is a temporary solution - proper GPU implementation would use ray-tracing
-    for i in range(N):
-        piece_np = cp.asnumpy(piece_batch[i])
-        color_np = cp.asnumpy(color_batch[i])
-
-        # Compute sliding attacks on CPU
-        for sq in range(64):
-            piece = piece_np[sq]
-            if piece == 0 or color_np[sq] == -1:
-                continue
-
-            color = color_np[sq]
-            attacks = []
-
-            if piece == 3:  # Bishop
-                from .chess_utils import get_bishop_attacks
-                attacks = get_bishop_attacks(sq, piece_np)
-            elif piece == 4:  # Rook
-                from .chess_utils import get_rook_attacks
-                attacks = get_rook_attacks(sq, piece_np)
-            elif piece == 5:  # Queen
-                from .chess_utils import get_queen_attacks
-                attacks = get_queen_attacks(sq, piece_np)
-
-            # Mark attacked squares
-            for target in attacks:
-                if color == 0:
-                    white_att[i, target] = True
-                else:
-                    black_att[i, target] = True
-
-
-def _generate_moves_batch_gpu(piece_batch, color_batch, stm_batch, moves_buffer, move_counts):
+    __slots__ = ('h_piece', 'h_color', 'h_scores', '_device', 'graph')
+
+    def __init__(self, n, stream):
+        self.h_piece = cupyx.empty_pinned((n, 64), dtype=np.int8)
+        self.h_color = cupyx.empty_pinned((n, 64), dtype=np.int8)
+        self.h_scores = cupyx.empty_pinned((4, n), dtype=np.int32)
+        # Padding rows keep whatever board they last held; start them as
+        # valid empty boards. Their scores are never read.
+        self.h_piece[...] = 0
+        self.h_color[...] = -1
+        self._device = (
+            cp.empty((n, 64), dtype=cp.int8),
+            cp.empty((n, 64), dtype=cp.int8),
+            cp.empty((4, n), dtype=cp.int32),
+        )
+        stream.begin_capture()
+        try:
+            _enqueue_evaluate_round_trip(
+                stream, self.h_piece, self.h_color, self.h_scores, *self._device
+            )
+        finally:
+            self.graph = stream.end_capture()
+
+
+def _get_evaluate_graph(n_boards, stream):
+    """This thread's captured graph for the bucket holding n_boards, or None."""
+    global _graphs_supported
+    if not _graphs_supported or n_boards == 0 or n_boards > _EVALUATE_GRAPH_BUCKETS[-1]:
+        return None
+    bucket = next(b for b in _EVALUATE_GRAPH_BUCKETS if b >= n_boards)
+    graphs = _SCRATCH.__dict__.setdefault('evaluate_graphs', {})
+    graph = graphs.get(bucket)
+    if graph is None:
+        try:
+            graph = graphs[bucket] = _EvaluateGraph(bucket, stream)
+        except Exception:
+            # Capture needs CUDA 11+ and CuPy's graph API; use plain launches
+            _graphs_supported = False
+            return None
+    return graph
+
+
+def _evaluate_batch_host_gpu(piece_batch, color_batch):
     """
-    Generate moves for batch (CPU fallback for now).
-    TODO: Implement proper CUDA kernel for move generation.
+    Host-to-host evaluate_batch through pinned staging buffers.
+
+    Pageable copies make CuPy stage and sync each transfer; from pinned
+    memory the H2D copy, the kernel and the D2H copy are all queued on this
+    thread's stream and waited on once. For batch sizes with a captured
+    graph the three are replayed as one graph launch.
     """
     N = piece_batch.shape[0]
+    stream = _get_stream()
+
+    graph = _get_evaluate_graph(N, stream)
+    if graph is not None:
+        np.copyto(graph.h_piece[:N], piece_batch, casting='unsafe')
+        np.copyto(graph.h_color[:N], color_batch, casting='unsafe')
+        graph.graph.launch(stream=stream)
+        stream.synchronize()
+        return tuple(graph.h_scores[:, :N].copy())
+
+    h_piece = _get_pinned('eval_piece', (N, 64), np.int8)
+    h_color = _get_pinned('eval_color', (N, 64), np.int8)
+    h_scores = _get_pinned('eval_scores', (4, N), np.int32)
+    np.copyto(h_piece, piece_batch, casting='unsafe')
+    np.copyto(h_color, color_batch, casting='unsafe')
+
+    d_piece = _get_scratch('eval_piece', (N, 64), cp.int8)
+    d_color = _get_scratch('eval_color', (N, 64), cp.int8)
+    d_scores = _get_scratch('eval_scores', (4, N), cp.int32)
+
+    _enqueue_evaluate_round_trip(stream, h_piece, h_color, h_scores, d_piece, d_color, d_scores)
+    stream.synchronize()
+    # The pinned buffer is reused by the next call, so hand out a copy
+    return tuple(h_scores.copy())
+
+
+def _compute_attack_bitboards_batch_gpu(piece_batch, color_batch):
+    """Launch the fused kernel; returns (white_bb, black_bb) uint64 arrays (N,)."""
+    N = piece_batch.shape[0]
+    piece_batch = cp.ascontiguousarray(piece_batch, dtype=cp.int8)
+    color_batch = cp.ascontiguousarray(color_batch, dtype=cp.int8)
+    white_bb = cp.empty(N, dtype=cp.uint64)
+    black_bb = cp.empty(N, dtype=cp.uint64)
+    if N == 0:
+        return white_bb, black_bb
+
+    _ATTACK_BITBOARDS_KERNEL(
+        *_board_launch(N),
+        (piece_batch, color_batch, *_ATTACK_TABLES, white_bb, black_bb, cp.int32(N))
+    )
+    return white_bb, black_bb
 
-    # For now, use CPU implementation per board
-    offset = 0
-    for i in range(N):
-        piece_np = cp.asnumpy(piece_batch[i])
-        color_np = cp.asnumpy(color_batch[i])
-        stm = int(stm_batch[i])
 
-        # Generate moves on CPU
-        moves_np = EngineCPU.generate_pseudo_legal_moves(piece_np, color_np, stm)
-        count = moves_np.shape[0]
+def _bitboards_to_bool_gpu(bb):
+    """Expand (N,) uint64 bitboards into (N, 64) bool maps on the device."""
+    # Little-endian bytes, least significant bit first, is square order a1..h8;
+    # one unpack pass instead of (N, 64) uint64 shift and mask temporaries
+    return cp.unpackbits(bb.view(cp.uint8), bitorder='little').reshape(-1, 64).view(cp.bool_)
 
-        if count > 0:
-            # Copy to buffer
-            moves_buffer[offset:offset+count, 0] = i  # board_idx
-            moves_buffer[offset:offset+count, 1:5] = cp.asarray(moves_np)
-            move_counts[i] = count
-            offset += count
 
+def _generate_moves_batch_gpu(piece_batch, color_batch, stm_batch):
+    """
+    Launch the move kernel.
 
-def _compact_moves_gpu(moves_buffer, move_counts, offsets, moves, N):
+    Returns:
+        (moves_buffer, move_counts): (N * _GPU_MAX_MOVES, 5) int16 slots, of
+        which the first move_counts[i] rows of board i's section are filled
     """
-    Compact moves buffer by removing empty slots.
-    Uses prefix sum offsets to determine where each board's moves go.
+    N = piece_batch.shape[0]
+    piece_batch = cp.ascontiguousarray(piece_batch, dtype=cp.int8)
+    color_batch = cp.ascontiguousarray(color_batch, dtype=cp.int8)
+    stm_batch = cp.ascontiguousarray(stm_batch, dtype=cp.int8)
+
+    # Slots past a board's count are never read, and the kernel resets each
+    # board's count itself, so neither buffer needs initializing here
+    moves_buffer = _get_scratch('moves_buffer', (N * _GPU_MAX_MOVES, 5), cp.int16)
+    move_counts = _get_scratch('move_counts', (N,), cp.int32)
+    if N == 0:
+        return moves_buffer, move_counts
+
+    _GENERATE_MOVES_KERNEL(
+        *_board_launch(N),
+        (piece_batch, color_batch, stm_batch, *_ATTACK_TABLES,
+         moves_buffer, move_counts, cp.int32(N))
+    )
+    return moves_buffer, move_counts
+
+
+def _compact_moves_gpu(moves_buffer, move_counts):
+    """
+    Gather each board's filled slots into one dense (M, 5) array.
+
+    An exclusive prefix sum of the counts gives every board's destination
+    offset, then one kernel launch scatters all boards in parallel. The only
+    host sync is reading the total to size the output: 8 bytes copied
+    straight into pinned memory, with no pageable staging copy.
     """
-    # Simple implementation: copy non-empty moves
-    dest_idx = 0
-    for i in range(N):
-        count = int(move_counts[i])
-        if count > 0:
-            src_start = int(offsets[i])
-            moves[dest_idx:dest_idx+count] = moves_buffer[src_start:src_start+count]
-            dest_idx += count
+    N = move_counts.shape[0]
+    # move_counts is scratch, so clamp it in place; the scan widens to int64 itself
+    counts = cp.minimum(move_counts, _GPU_MAX_MOVES, out=move_counts)
+    ends = cp.cumsum(counts, dtype=cp.int64)
+    total_moves = 0
+    if N:
+        total_host = _get_pinned_total()
+        ends[-1:].get(out=total_host)
+        total_moves = int(total_host[0])
+    moves = cp.empty((total_moves, 5), dtype=cp.int16)
+    if total_moves == 0:
+        return moves
+
+    _COMPACT_MOVES_KERNEL(
+        (N,), (_GPU_MAX_MOVES,),  # grid and block dimensions
+        (moves_buffer, move_counts, ends - counts, moves, cp.int32(N), cp.int32(_GPU_MAX_MOVES))
+    )
+    return moves
@@ -3,6 +3,8 @@ FEN (Forsyth-Edwards Notation) conversion utilities.
 Convert between FEN strings and engine's internal board representation.
 """
 
+import functools
+
 import numpy as np
 from .chess_utils import (
     PIECE_NONE, PIECE_PAWN, PIECE_KNIGHT, PIECE_BISHOP,
@@ -11,10 +13,41 @@ from .chess_utils import (
 )
 
 
+# Byte-to-byte tables for bytes.translate, so the per-square mapping runs in C.
+# Non-piece bytes map to PIECE_NONE / COLOR_EMPTY (stored as its int8 bit pattern).
+_FEN_PIECE_CHARS = b'pnbrqkPNBRQK'
+_FEN_PIECE_LUT = bytearray(256)
+_FEN_COLOR_LUT = bytearray([COLOR_EMPTY & 0xFF] * 256)
+for _ch, _piece in zip('pnbrqk', (PIECE_PAWN, PIECE_KNIGHT, PIECE_BISHOP,
+                                  PIECE_ROOK, PIECE_QUEEN, PIECE_KING)):
+    _FEN_PIECE_LUT[ord(_ch)] = _FEN_PIECE_LUT[ord(_ch.upper())] = _piece
+    _FEN_COLOR_LUT[ord(_ch)] = COLOR_BLACK
+    _FEN_COLOR_LUT[ord(_ch.upper())] = COLOR_WHITE
+_FEN_PIECE_LUT = bytes(_FEN_PIECE_LUT)
+_FEN_COLOR_LUT = bytes(_FEN_COLOR_LUT)
+
+# Digit -> run of '.' placeholders. Eight str.replace calls beat one
+# str.translate here: translate with multi-character entries goes through
+# a per-character mapping lookup.
+_FEN_DIGIT_RUNS = [(str(n), '.' * n) for n in range(1, 9)]
+# Piece letters map to themselves; '.' (missing) maps to None
+_FEN_CELLS = {ch: ch for ch in _FEN_PIECE_CHARS.decode('ascii')}
+
+
+def _expand_empty_squares(placement: str) -> str:
+    """Replace each digit of a FEN placement with that many '.' placeholders."""
+    for digit, run in _FEN_DIGIT_RUNS:
+        placement = placement.replace(digit, run)
+    return placement
+
+
 def fen_to_arrays(fen: str) -> tuple[np.ndarray, np.ndarray, int]:
     """
     Convert FEN to engine arrays.
     
+    Parsing goes through an LRU cache; the caller gets its own writable
+    copies, so the shared cached arrays never leave this module.
+    
     Args:
         fen: FEN string (e.g., "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
     
@@ -23,40 +56,62 @@ def fen_to_arrays(fen: str) -> tuple[np.ndarray, np.ndarray, int]:
         color_arr: (64,) array of colors
         stm: side to move (0=white, 1=black)
     """
+    piece_arr, color_arr, stm = _fen_to_arrays_cached(fen)
+    return piece_arr.copy(), color_arr.copy(), stm
+
+
+@functools.lru_cache(maxsize=4096)
+def _fen_to_arrays_cached(fen: str) -> tuple[np.ndarray, np.ndarray, int]:
+    """Parse a FEN into read-only engine arrays shared by every caller of the cache."""
     parts = fen.split()
     position = parts[0]
     stm_char = parts[1] if len(parts) > 1 else 'w'
     
-    piece_arr = np.zeros(64, dtype=np.int8)
-    color_arr = np.full(64, COLOR_EMPTY, dtype=np.int8)
-    
-    # Piece character to type mapping
-    piece_map = {
-        'p': PIECE_PAWN, 'n': PIECE_KNIGHT, 'b': PIECE_BISHOP,
-        'r': PIECE_ROOK, 'q': PIECE_QUEEN, 'k': PIECE_KING
-    }
-    
-    # Parse position (FEN starts from rank 8, we start from rank 0)
-    sq = 56  # Start at a8 (rank 7, file 0)
-    for ch in position:
-        if ch == '/':
-            sq -= 16  # Move to next rank (down 2 ranks because we already moved forward)
-        elif ch.isdigit():
-            sq += int(ch)  # Skip empty squares
-        else:
-            # Determine piece type and color
-            piece_type = piece_map[ch.lower()]
-            color = COLOR_WHITE if ch.isupper() else COLOR_BLACK
-            
-            piece_arr[sq] = piece_type
-            color_arr[sq] = color
-            sq += 1
+    # FEN lists rank 8 first; engine squares start at a1, so reverse the ranks
+    # and expand empties to get one byte per square in a1..h8 order
+    squares = _expand_empty_squares(''.join(reversed(position.split('/')))).encode('ascii')
+    if len(squares) != 64:
+        raise ValueError(f"FEN board must describe 64 squares, got {len(squares)}: {position!r}")
+    if squares.translate(None, b'.' + _FEN_PIECE_CHARS):
+        raise ValueError(f"Invalid piece character in FEN: {position!r}")
+    
+    # Read-only views of the translated bytes: the cache shares them, so
+    # they must not be writable anyway
+    piece_arr = np.frombuffer(squares.translate(_FEN_PIECE_LUT), dtype=np.int8)
+    color_arr = np.frombuffer(squares.translate(_FEN_COLOR_LUT), dtype=np.int8)
     
     stm = COLOR_WHITE if stm_char == 'w' else COLOR_BLACK
     
     return piece_arr, color_arr, stm
 
 
+def fen_list_to_arrays(fens) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Convert a list of FENs straight into batch arrays.
+    
+    The outputs are allocated once and each position is written into its
+    row, instead of parsing into N pairs of arrays and stacking them.
+    
+    Returns:
+        piece_batch: (N, 64) int8 array of piece types
+        color_batch: (N, 64) int8 array of colors
+        stm_batch: (N,) int8 array of sides to move
+    """
+    n = len(fens)
+    piece_batch = np.empty((n, 64), dtype=np.int8)
+    color_batch = np.empty((n, 64), dtype=np.int8)
+    stm_batch = np.empty(n, dtype=np.int8)
+    for i, fen in enumerate(fens):
+        piece_batch[i], color_batch[i], stm_batch[i] = _fen_to_arrays_cached(fen)
+    return piece_batch, color_batch, stm_batch
+
+
+# FEN letter for (color_arr[sq] == COLOR_BLACK) * 8 + piece; empty squares
+# become '1' so runs can be merged into counts afterwards
+_FEN_CHAR_LUT = np.frombuffer(b'1PNBRQK\x00' + b'1pnbrqk\x00', dtype=np.uint8)
+_FEN_EMPTY_RUNS = [('1' * n, str(n)) for n in range(8, 1, -1)]
+
+
 def arrays_to_fen(piece_arr: np.ndarray, color_arr: np.ndarray, stm: int) -> str:
     """
     Convert engine arrays to FEN.
@@ -69,43 +124,87 @@ def arrays_to_fen(piece_arr: np.ndarray, color_arr: np.ndarray, stm: int) -> str
     Returns:
         FEN string (simplified, without castling/en passant/clocks)
     """
-    piece_chars = {
-        PIECE_PAWN: 'p', PIECE_KNIGHT: 'n', PIECE_BISHOP: 'b',
-        PIECE_ROOK: 'r', PIECE_QUEEN: 'q', PIECE_KING: 'k'
-    }
-    
-    fen_parts = []
-    for rank in range(7, -1, -1):  # 8 to 1 (FEN starts from rank 8)
-        empty_count = 0
-        rank_str = ""
-        
-        for file in range(8):  # a to h
-            sq = rank * 8 + file
-            
-            if piece_arr[sq] == PIECE_NONE:
-                empty_count += 1
-            else:
-                if empty_count > 0:
-                    rank_str += str(empty_count)
-                    empty_count = 0
-                
-                ch = piece_chars[piece_arr[sq]]
-                if color_arr[sq] == COLOR_WHITE:
-                    ch = ch.upper()
-                rank_str += ch
-        
-        if empty_count > 0:
-            rank_str += str(empty_count)
-        
-        fen_parts.append(rank_str)
-    
-    position = '/'.join(fen_parts)
+    piece_arr = np.asarray(piece_arr)
+    color_arr = np.asarray(color_arr)
+    
+    # One character per square, ranks flipped into FEN order (rank 8 first)
+    chars = _FEN_CHAR_LUT[piece_arr + (color_arr == COLOR_BLACK) * 8]
+    rows = chars.reshape(8, 8)[::-1].tobytes().decode('ascii')
+    position = '/'.join(rows[i:i + 8] for i in range(0, 64, 8))
+    
+    # Merge runs of empty squares, longest first; '/' keeps runs within a rank
+    for run, count in _FEN_EMPTY_RUNS:
+        position = position.replace(run, count)
+    
     stm_char = 'w' if stm == COLOR_WHITE else 'b'
     
     # Simplified FEN (no castling rights, en passant, or move counters)
     return f"{position} {stm_char} - - 0 1"
 
 
+def apply_move_to_arrays(
+    piece_arr: np.ndarray,
+    color_arr: np.ndarray,
+    move,
+    is_castling: bool = False,
+    is_en_passant: bool = False,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Apply a move to copies of the engine arrays, without a FEN round trip.
+    
+    Args:
+        piece_arr: (64,) array of piece types
+        color_arr: (64,) array of colors
+        move: object with from_square, to_square and promotion attributes
+              (e.g. chess.Move; square and piece numbering match the engine's)
+        is_castling: the move is a castling king move (rook moves too)
+        is_en_passant: the move is an en passant capture (captured pawn is
+                       behind the target square)
+    
+    Returns:
+        (piece_arr, color_arr) after the move, as new arrays
+    """
+    piece_after = piece_arr.copy()
+    color_after = color_arr.copy()
+    apply_move_in_place(piece_after, color_after, move, is_castling, is_en_passant)
+    return piece_after, color_after
+
+
+def apply_move_in_place(
+    piece_arr: np.ndarray,
+    color_arr: np.ndarray,
+    move,
+    is_castling: bool = False,
+    is_en_passant: bool = False,
+) -> None:
+    """
+    apply_move_to_arrays without the copies: the arrays (e.g. rows of a
+    batch already filled with the starting position) are edited directly.
+    """
+    from_sq, to_sq = move.from_square, move.to_square
+    mover = color_arr[from_sq]
+    
+    piece_arr[to_sq] = move.promotion or piece_arr[from_sq]
+    color_arr[to_sq] = mover
+    piece_arr[from_sq] = PIECE_NONE
+    color_arr[from_sq] = COLOR_EMPTY
+    
+    if is_castling:
+        # King lands on the g- or c-file; the rook jumps to its other side
+        if to_sq % 8 == 6:
+            rook_from, rook_to = to_sq + 1, to_sq - 1
+        else:
+            rook_from, rook_to = to_sq - 2, to_sq + 1
+        piece_arr[rook_to] = piece_arr[rook_from]
+        color_arr[rook_to] = mover
+        piece_arr[rook_from] = PIECE_NONE
+        color_arr[rook_from] = COLOR_EMPTY
+    elif is_en_passant:
+        captured_sq = to_sq - 8 if mover == COLOR_WHITE else to_sq + 8
+        piece_arr[captured_sq] = PIECE_NONE
+        color_arr[captured_sq] = COLOR_EMPTY
+
+
 def fen_to_board_2d(fen: str) -> list[list[str | None]]:
     """
     Convert FEN to 2D board representation for display.
@@ -117,25 +216,13 @@ def fen_to_board_2d(fen: str) -> list[list[str | None]]:
         8x8 list where board[rank][file] is piece character or None
         rank 0 = rank 8, rank 7 = rank 1 (display order)
     """
-    parts = fen.split()
-    position = parts[0]
-    rows = position.split('/')
+    position = fen.split()[0]
     
-    board = []
-    for row in rows:
-        out_row = []
-        for ch in row:
-            if ch.isdigit():
-                # Add empty squares
-                for _ in range(int(ch)):
-                    out_row.append(None)
-            else:
-                out_row.append(ch)
-        board.append(out_row)
-    
-    return board
+    # Expand empties with C-level replaces, map cells with a C-level dict
+    # lookup, then cut the 64 cells into ranks
+    cells = list(map(_FEN_CELLS.get, _expand_empty_squares(position.replace('/', ''))))
+    return [cells[i:i + 8] for i in range(0, len(cells), 8)]
 
 
 # Standard starting position FEN
 STARTING_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
-
@@ -1,4 +1,14 @@
 # main_test.py
+"""
+Smoke test plus steady-state timing for the batch API on the active backend.
+
+Run with `python -m app.engine_core.main_test`. Each batch size gets an
+untimed warmup call first so Numba/NVRTC compilation and first-touch
+allocations are excluded; small N shows launch/transfer overhead, large N
+shows throughput.
+"""
+
+import time
 
 from .backend import xp, GPU
 from .engine_batch import (
@@ -6,22 +16,65 @@ from .engine_batch import (
     evaluate_batch,
     generate_moves_batch,
 )
+from .fen_utils import fen_to_arrays, STARTING_FEN
+
+BATCH_SIZES = (1, 16, 256, 4096)
+ITERATIONS = 100
+
+
+def _sync():
+    """Wait for queued GPU work so timings cover execution, not just launch."""
+    if GPU:
+        xp.cuda.Stream.null.synchronize()
+
+
+def smoke_test():
+    """Run each batch operation once on empty boards."""
+    N = 3
+    piece_arr_batch = xp.zeros((N, 64), dtype=xp.int8)
+    color_arr_batch = xp.full((N, 64), -1, dtype=xp.int8)
+    stm_batch = xp.zeros(N, dtype=xp.int8)
+
+    white, black = compute_attack_maps_batch(piece_arr_batch, color_arr_batch)
+    print("Attack maps OK:", white.shape, black.shape)
+
+    wo, wd, bo, bd = evaluate_batch(piece_arr_batch, color_arr_batch)
+    print("Eval OK:", wo, wd, bo, bd)
+
+    moves = generate_moves_batch(piece_arr_batch, color_arr_batch, stm_batch)
+    print("Moves OK:", moves.shape)
+
 
-print("Backend:", "GPU" if GPU else "CPU")
+def time_batches(batch_sizes=BATCH_SIZES, iterations=ITERATIONS):
+    """Print mean per-call time of each batch operation on starting positions."""
+    piece_arr, color_arr, _ = fen_to_arrays(STARTING_FEN)
 
-# Example: batch of 3 empty boards
-N = 3
-piece_arr_batch = xp.zeros((N, 64), dtype=xp.int8)
-color_arr_batch = xp.full((N, 64), -1, dtype=xp.int8)
-stm_batch = xp.zeros(N, dtype=xp.int8)
+    print(f"\n{'Batch Size':<12} {'Attack maps':>14} {'Evaluate':>14} {'Moves':>14}")
+    for N in batch_sizes:
+        piece_batch = xp.asarray(piece_arr[None, :].repeat(N, axis=0))
+        color_batch = xp.asarray(color_arr[None, :].repeat(N, axis=0))
+        stm_batch = xp.zeros(N, dtype=xp.int8)
 
-white, black = compute_attack_maps_batch(piece_arr_batch, color_arr_batch)
-print("Attack maps OK:", white.shape, black.shape)
+        ops = (
+            lambda: compute_attack_maps_batch(piece_batch, color_batch),
+            lambda: evaluate_batch(piece_batch, color_batch),
+            lambda: generate_moves_batch(piece_batch, color_batch, stm_batch),
+        )
+        timings = []
+        for op in ops:
+            op()  # warmup
+            _sync()
+            start = time.perf_counter()
+            for _ in range(iterations):
+                op()
+            _sync()
+            timings.append((time.perf_counter() - start) / iterations)
 
-wo, wd, bo, bd = evaluate_batch(piece_arr_batch, color_arr_batch)
-print("Eval OK:", wo, wd, bo, bd)
+        print(f"{N:<12}" + "".join(f"{t * 1e6:>11.1f} us" for t in timings))
 
-moves = generate_moves_batch(piece_arr_batch, color_arr_batch, stm_batch)
-print("Moves OK:", moves.shape)
 
-print("All good.")
+if __name__ == "__main__":
+    print("Backend:", "GPU" if GPU else "CPU")
+    smoke_test()
+    time_batches()
+    print("All good.")
@@ -1,7 +1,39 @@
 # moves.py
 
+import numpy as np
+
 MOVE_IDX   = 0
 MOVE_FROM  = 1
 MOVE_TO    = 2
 MOVE_PROMO = 3
 MOVE_FLAGS = 4
+
+# Packed encoding of a (M, 5) move array, one integer per move:
+#   bits 0-5 from, 6-11 to, 12-14 promo, 15-19 flags, 20+ board index
+# Moves fit in uint32 while the board index fits in the remaining 12 bits
+# (up to 4096 boards); larger batches pack into uint64. Used to shrink
+# device-to-host copies of batch move lists.
+PACK_SHIFTS = (20, 0, 6, 12, 15)  # indexed by MOVE_* column
+PACK_WIDTHS = (44, 6, 6, 3, 5)
+PACK_MAX_BOARDS_U32 = 1 << 12
+
+
+def pack_moves(moves, n_boards):
+    """
+    Pack (M, 5) move rows into one integer per move.
+
+    Works on NumPy or CuPy arrays (the result stays on the same device).
+    """
+    dtype = np.uint32 if n_boards <= PACK_MAX_BOARDS_U32 else np.uint64
+    packed = moves[:, MOVE_FROM].astype(dtype)
+    for col in (MOVE_IDX, MOVE_TO, MOVE_PROMO, MOVE_FLAGS):
+        packed |= moves[:, col].astype(dtype) << dtype(PACK_SHIFTS[col])
+    return packed
+
+
+def unpack_moves(packed):
+    """Inverse of pack_moves: (M,) packed integers back to (M, 5) int16 rows."""
+    moves = np.empty((packed.shape[0], 5), dtype=np.int16)
+    for col in (MOVE_IDX, MOVE_FROM, MOVE_TO, MOVE_PROMO, MOVE_FLAGS):
+        moves[:, col] = (packed >> packed.dtype.type(PACK_SHIFTS[col])) & ((1 << PACK_WIDTHS[col]) - 1)
+    return moves
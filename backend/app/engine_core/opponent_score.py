@@ -0,0 +1,61 @@
+# opponent_score.py
+"""
+Profile scoring for the strategic opponent.
+
+Each candidate move is scored from the change in the four evaluation terms
+it causes, seen from the side to move. The whole candidate vector is scored
+in one native call rather than a chain of small NumPy temporaries.
+"""
+
+import numpy as np
+from numba import njit
+
+PROFILE_OFFENSIVE = 0  # fallback for unknown profile names
+PROFILE_AGGRESSIVE = 1
+PROFILE_DEFENSIVE = 2
+PROFILE_MODERATE = 3
+PROFILE_DEFENSIVE_PASSIVE = 4
+
+PROFILE_IDS = {
+    "aggressive": PROFILE_AGGRESSIVE,
+    "defensive": PROFILE_DEFENSIVE,
+    "moderate": PROFILE_MODERATE,
+    "defensive_passive": PROFILE_DEFENSIVE_PASSIVE,
+}
+
+
+@njit(cache=True)
+def score_profiles(after, current, is_white, profile_id):
+    """
+    Score candidate positions for one profile.
+
+    Args:
+        after: (N, 4) scores (white_off, white_def, black_off, black_def)
+            of the position after each candidate move
+        current: (4,) scores of the position before the move
+        is_white: True when White is the side to move
+        profile_id: one of the PROFILE_* constants
+
+    Returns:
+        (N,) int64 scores; higher is better for the side to move
+    """
+    mine = 0 if is_white else 2
+    theirs = 2 - mine
+    n = after.shape[0]
+    scores = np.empty(n, dtype=np.int64)
+    for i in range(n):
+        my_off = after[i, mine] - current[mine]
+        my_def = after[i, mine + 1] - current[mine + 1]
+        opp_off = after[i, theirs] - current[theirs]
+        opp_def = after[i, theirs + 1] - current[theirs + 1]
+        if profile_id == PROFILE_AGGRESSIVE:
+            scores[i] = my_off - opp_off
+        elif profile_id == PROFILE_DEFENSIVE:
+            scores[i] = my_def - opp_off
+        elif profile_id == PROFILE_MODERATE:
+            scores[i] = my_off + my_def
+        elif profile_id == PROFILE_DEFENSIVE_PASSIVE:
+            scores[i] = my_def - opp_def
+        else:
+            scores[i] = my_off
+    return scores
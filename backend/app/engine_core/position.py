@@ -0,0 +1,178 @@
+# position.py
+"""
+Mutable board state with incremental make/unmake.
+
+Search-style callers (try a move, evaluate, take it back) keep one Position
+and update it in place instead of rebuilding arrays and bitboards for every
+candidate. A move touches a handful of bits, so make/unmake is a few XORs
+rather than a 64-square rescan.
+"""
+
+import numpy as np
+from numba import njit
+
+from .chess_utils import (
+    PIECE_NONE, PIECE_PAWN, PIECE_ROOK,
+    COLOR_EMPTY, COLOR_WHITE, BB_EMPTY, BB_SQUARES,
+    board_to_bitboards, next_sq,
+)
+from .engine_cpu import (
+    MAX_MOVES, FLAG_EN_PASSANT, FLAG_CASTLING, _evaluate_bb, _generate_moves_bb,
+)
+from .fen_utils import fen_to_arrays
+
+# Zobrist keys indexed [color, piece, square]; the PIECE_NONE slot is unused.
+# Fixed seed so hashes are stable across processes.
+_zobrist_rng = np.random.default_rng(0x5EED)
+ZOBRIST_KEYS = _zobrist_rng.integers(0, 2**64, size=(2, 7, 64), dtype=np.uint64)
+ZOBRIST_KEYS[:, PIECE_NONE, :] = 0
+ZOBRIST_SIDE = np.uint64(_zobrist_rng.integers(0, 2**64, dtype=np.uint64))
+
+
+@njit(cache=True)
+def _zobrist_hash(piece_bb, stm):
+    """Full Zobrist hash of a (2, 7) bitboard position; used once per Position."""
+    key = BB_EMPTY
+    for color in range(2):
+        for piece in range(PIECE_PAWN, 7):
+            bb = piece_bb[color, piece]
+            while bb:
+                sq, bb = next_sq(bb)
+                key ^= ZOBRIST_KEYS[color, piece, sq]
+    if stm != COLOR_WHITE:
+        key ^= ZOBRIST_SIDE
+    return key
+
+
+@njit(cache=True, inline='always')
+def _toggle(piece_bb, piece_arr, color_arr, color, piece, sq, put):
+    """Add (put=True) or remove one piece on both the bitboards and the square arrays."""
+    bit = BB_SQUARES[sq]
+    piece_bb[color, piece] ^= bit
+    piece_bb[color, PIECE_NONE] ^= bit
+    if put:
+        piece_arr[sq] = piece
+        color_arr[sq] = color
+    else:
+        piece_arr[sq] = PIECE_NONE
+        color_arr[sq] = COLOR_EMPTY
+    return ZOBRIST_KEYS[color, piece, sq]
+
+
+@njit(cache=True, inline='always')
+def _castling_rook_squares(king_to):
+    """Rook (from, to) for a king castling onto `king_to` (g- or c-file)."""
+    if king_to % 8 == 6:
+        return king_to + 1, king_to - 1
+    return king_to - 2, king_to + 1
+
+
+@njit(cache=True)
+def _make_move(piece_bb, piece_arr, color_arr, stm, from_sq, to_sq, promo, flags):
+    """
+    Apply a move for side `stm` in place.
+
+    Returns:
+        (captured piece, Zobrist delta including the side-to-move flip)
+    """
+    them = 1 - stm
+    piece = piece_arr[from_sq]
+    key = ZOBRIST_SIDE
+
+    captured = PIECE_NONE
+    if flags & FLAG_EN_PASSANT:
+        captured = PIECE_PAWN
+        cap_sq = to_sq - 8 if stm == COLOR_WHITE else to_sq + 8
+        key ^= _toggle(piece_bb, piece_arr, color_arr, them, PIECE_PAWN, cap_sq, False)
+    elif piece_arr[to_sq] != PIECE_NONE:
+        captured = piece_arr[to_sq]
+        key ^= _toggle(piece_bb, piece_arr, color_arr, them, captured, to_sq, False)
+
+    key ^= _toggle(piece_bb, piece_arr, color_arr, stm, piece, from_sq, False)
+    key ^= _toggle(piece_bb, piece_arr, color_arr, stm, promo if promo else piece, to_sq, True)
+
+    if flags & FLAG_CASTLING:
+        rook_from, rook_to = _castling_rook_squares(to_sq)
+        key ^= _toggle(piece_bb, piece_arr, color_arr, stm, PIECE_ROOK, rook_from, False)
+        key ^= _toggle(piece_bb, piece_arr, color_arr, stm, PIECE_ROOK, rook_to, True)
+
+    return captured, key
+
+
+@njit(cache=True)
+def _unmake_move(piece_bb, piece_arr, color_arr, stm, from_sq, to_sq, promo, flags, captured):
+    """Undo _make_move for side `stm`, given the piece it captured."""
+    them = 1 - stm
+    placed = piece_arr[to_sq]
+
+    if flags & FLAG_CASTLING:
+        rook_from, rook_to = _castling_rook_squares(to_sq)
+        _toggle(piece_bb, piece_arr, color_arr, stm, PIECE_ROOK, rook_to, False)
+        _toggle(piece_bb, piece_arr, color_arr, stm, PIECE_ROOK, rook_from, True)
+
+    _toggle(piece_bb, piece_arr, color_arr, stm, placed, to_sq, False)
+    _toggle(piece_bb, piece_arr, color_arr, stm, PIECE_PAWN if promo else placed, from_sq, True)
+
+    if flags & FLAG_EN_PASSANT:
+        cap_sq = to_sq - 8 if stm == COLOR_WHITE else to_sq + 8
+        _toggle(piece_bb, piece_arr, color_arr, them, PIECE_PAWN, cap_sq, True)
+    elif captured != PIECE_NONE:
+        _toggle(piece_bb, piece_arr, color_arr, them, captured, to_sq, True)
+
+
+class Position:
+    """
+    One board kept in sync across bitboards, square arrays, side to move and
+    Zobrist hash.
+
+    Moves are rows in the engine's (from_sq, to_sq, promo, flags) layout, as
+    returned by generate_moves() / EngineCPU.generate_pseudo_legal_moves.
+    unmake_move() must be called with the most recently made move.
+    """
+
+    __slots__ = ("piece_arr", "color_arr", "piece_bb", "stm", "zobrist_hash", "_undo")
+
+    def __init__(self, piece_arr, color_arr, stm=COLOR_WHITE):
+        # Copies: the arrays are mutated in place by make/unmake
+        self.piece_arr = np.array(piece_arr, dtype=np.int8)
+        self.color_arr = np.array(color_arr, dtype=np.int8)
+        self.piece_bb = board_to_bitboards(self.piece_arr, self.color_arr)
+        self.stm = int(stm)
+        self.zobrist_hash = int(_zobrist_hash(self.piece_bb, self.stm))
+        self._undo = []
+
+    @classmethod
+    def from_fen(cls, fen: str) -> "Position":
+        return cls(*fen_to_arrays(fen))
+
+    def bitboards(self):
+        """(2, 7) uint64 bitboards for the Numba kernels (live view, not a copy)."""
+        return self.piece_bb
+
+    def make_move(self, move) -> None:
+        from_sq, to_sq, promo, flags = (int(v) for v in move[:4])
+        captured, delta = _make_move(
+            self.piece_bb, self.piece_arr, self.color_arr, self.stm, from_sq, to_sq, promo, flags
+        )
+        self._undo.append((int(captured), self.zobrist_hash))
+        self.zobrist_hash ^= int(delta)
+        self.stm ^= 1
+
+    def unmake_move(self, move) -> None:
+        from_sq, to_sq, promo, flags = (int(v) for v in move[:4])
+        captured, self.zobrist_hash = self._undo.pop()
+        self.stm ^= 1
+        _unmake_move(
+            self.piece_bb, self.piece_arr, self.color_arr, self.stm,
+            from_sq, to_sq, promo, flags, captured
+        )
+
+    def evaluate(self):
+        """(white_off, white_def, black_off, black_def), as EngineCPU.evaluate."""
+        return _evaluate_bb(self.piece_bb)
+
+    def generate_moves(self) -> np.ndarray:
+        """(M, 4) pseudo-legal moves for the side to move."""
+        moves_buffer = np.empty((MAX_MOVES, 4), dtype=np.int16)
+        move_count = _generate_moves_bb(self.piece_bb, self.stm, moves_buffer)
+        return moves_buffer[:move_count]
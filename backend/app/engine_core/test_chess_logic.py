@@ -3,11 +3,25 @@ Unit tests for chess logic implementation.
 """
 
 import numpy as np
-from .engine_cpu import EngineCPU
+import pytest
+from .engine_cpu import EngineCPU, _count_moves_bb
+from .engine_batch import (
+    evaluate_batch, generate_moves_batch,
+    compute_attack_maps_batch, compute_attack_bitboards_batch, unpack_bitboards,
+)
+from .coalesce import BatchCoalescer
+from .fen_utils import fen_to_arrays, arrays_to_fen
+from .moves import pack_moves, unpack_moves, PACK_MAX_BOARDS_U32
+from .position import Position, _zobrist_hash
+from .engine_cpu import FLAG_CAPTURE, FLAG_EN_PASSANT, FLAG_CASTLING
 from .chess_utils import (
     PIECE_NONE, PIECE_PAWN, PIECE_KNIGHT, PIECE_BISHOP,
     PIECE_ROOK, PIECE_QUEEN, PIECE_KING,
-    COLOR_EMPTY, COLOR_WHITE, COLOR_BLACK
+    COLOR_EMPTY, COLOR_WHITE, COLOR_BLACK, bb_to_bool64,
+    BISHOP_DIRECTIONS, ROOK_DIRECTIONS, _slow_ray_attacks,
+    get_bishop_attacks, get_rook_attacks, get_pawn_attacks,
+    HAS_PEXT, _bishop_attacks_magic, _rook_attacks_magic,
+    board_to_bitboards, bitboards_to_board, pawn_attacks_white, pawn_attacks_black
 )
 
 
@@ -18,8 +32,8 @@ def create_empty_board():
     return piece_arr, color_arr
 
 
-def create_starting_position():
-    """Create the standard chess starting position."""
+def _build_starting_position():
+    """Build the standard chess starting position arrays."""
     piece_arr = np.zeros(64, dtype=np.int8)
     color_arr = np.full(64, COLOR_EMPTY, dtype=np.int8)
     
@@ -40,6 +54,34 @@ def create_starting_position():
     return piece_arr, color_arr
 
 
+# Built once at import as one (2, 64) block, piece row then color row;
+# tests get copies, since some of them edit the board
+_STARTING = np.stack(_build_starting_position())
+_STARTING.flags.writeable = False
+
+
+def create_starting_position():
+    """Create the standard chess starting position (writable copies of the template)."""
+    # One copy of the block; the two rows are views into it
+    piece_arr, color_arr = _STARTING.copy()
+    return piece_arr, color_arr
+
+
+def test_bitboard_round_trip():
+    """Test conversion between array and bitboard layouts."""
+    print("Test: Bitboard round trip")
+    piece_arr, color_arr = create_starting_position()
+
+    piece_bb = board_to_bitboards(piece_arr, color_arr)
+    assert int(piece_bb[COLOR_WHITE, PIECE_NONE]) == 0xFFFF
+    assert int(piece_bb[COLOR_BLACK, PIECE_PAWN]) == 0xFF << 48
+
+    piece_back, color_back = bitboards_to_board(piece_bb)
+    assert np.array_equal(piece_back, piece_arr)
+    assert np.array_equal(color_back, color_arr)
+    print("✓ Passed")
+
+
 def test_attack_maps_empty_board():
     """Test attack maps on empty board."""
     print("Test: Attack maps on empty board")
@@ -64,9 +106,10 @@ def test_attack_maps_single_knight():
     white_att, black_att = EngineCPU.compute_attack_maps(piece_arr, color_arr)
     
     # Knight on e4 should attack 8 squares
-    assert white_att.sum() == 8, f"Knight on e4 should attack 8 squares, got {white_att.sum()}"
+    attacked = np.count_nonzero(white_att)
+    assert attacked == 8, f"Knight on e4 should attack 8 squares, got {attacked}"
     assert not black_att.any(), "No black pieces, so no black attacks"
-    print(f"✓ Passed - Knight attacks {white_att.sum()} squares")
+    print(f"✓ Passed - Knight attacks {attacked} squares")
 
 
 def test_attack_maps_rook():
@@ -81,8 +124,85 @@ def test_attack_maps_rook():
     white_att, black_att = EngineCPU.compute_attack_maps(piece_arr, color_arr)
     
     # Rook on a1 should attack 14 squares (7 horizontal + 7 vertical)
-    assert white_att.sum() == 14, f"Rook on a1 should attack 14 squares, got {white_att.sum()}"
-    print(f"✓ Passed - Rook attacks {white_att.sum()} squares")
+    attacked = np.count_nonzero(white_att)
+    assert attacked == 14, f"Rook on a1 should attack 14 squares, got {attacked}"
+    print(f"✓ Passed - Rook attacks {attacked} squares")
+
+
+def test_attack_bitboards_match_maps():
+    """Test that attack bitboards expand to the bool attack maps."""
+    print("\nTest: Attack bitboards match attack maps")
+    piece_arr, color_arr = create_starting_position()
+
+    white_bb, black_bb = EngineCPU.compute_attack_bitboards(piece_arr, color_arr)
+    white_att, black_att = EngineCPU.compute_attack_maps(piece_arr, color_arr)
+
+    assert np.array_equal(bb_to_bool64(white_bb), white_att)
+    assert np.array_equal(bb_to_bool64(black_bb), black_att)
+    # Starting position: white attacks all of rank 3, black all of rank 6
+    assert int(white_bb) & 0xFF0000 == 0xFF0000
+    assert int(black_bb) & 0xFF0000000000 == 0xFF0000000000
+    print("✓ Passed")
+
+
+def test_attack_bitboards_batch():
+    """Test packed batch attack bitboards against the bool maps."""
+    print("\nTest: Batch attack bitboards")
+    boards = [create_starting_position(), create_empty_board()]
+    piece_batch = np.stack([piece_arr for piece_arr, _ in boards])
+    color_batch = np.stack([color_arr for _, color_arr in boards])
+
+    white_bb, black_bb = (np.asarray(bb) for bb in compute_attack_bitboards_batch(piece_batch, color_batch))
+    assert white_bb.dtype == np.uint64 and white_bb.shape == (2,)
+    white_att, black_att = (np.asarray(att) for att in compute_attack_maps_batch(piece_batch, color_batch))
+    assert np.array_equal(unpack_bitboards(white_bb), white_att)
+    assert np.array_equal(unpack_bitboards(black_bb), black_att)
+
+    for i, (piece_arr, color_arr) in enumerate(boards):
+        w, b = EngineCPU.compute_attack_maps(piece_arr, color_arr)
+        assert np.array_equal(white_att[i], w) and np.array_equal(black_att[i], b)
+    assert white_bb[1] == 0 and black_bb[1] == 0
+    print("✓ Passed")
+
+
+def test_magic_slider_attacks():
+    """Test magic (and PEXT, if selected) lookups against a plain ray walk."""
+    print("\nTest: Magic slider attacks")
+    print(f"  PEXT backend: {HAS_PEXT}")
+    rng = np.random.default_rng(0)
+
+    for _ in range(200):
+        occ = np.uint64(rng.integers(0, 2**63) & rng.integers(0, 2**63))
+        for sq in range(64):
+            bishop = _slow_ray_attacks(sq, occ, BISHOP_DIRECTIONS)
+            rook = _slow_ray_attacks(sq, occ, ROOK_DIRECTIONS)
+            assert _bishop_attacks_magic(sq, occ) == bishop
+            assert _rook_attacks_magic(sq, occ) == rook
+            assert get_bishop_attacks(sq, occ) == bishop
+            assert get_rook_attacks(sq, occ) == rook
+    print("✓ Passed")
+
+
+def test_pawn_attack_table():
+    """Test edge-file and last-rank entries of the pawn attack table."""
+    print("\nTest: Pawn attack table")
+    assert int(get_pawn_attacks(8, COLOR_WHITE)) == 1 << 17   # a2 -> b3
+    assert int(get_pawn_attacks(55, COLOR_BLACK)) == 1 << 46  # h7 -> g6
+    assert int(get_pawn_attacks(12, COLOR_WHITE)) == (1 << 19) | (1 << 21)  # e2 -> d3, f3
+    assert int(get_pawn_attacks(60, COLOR_WHITE)) == 0  # nothing beyond rank 8
+    assert int(get_pawn_attacks(3, COLOR_BLACK)) == 0   # nothing beyond rank 1
+
+    # Set-wise shifts agree with the per-square table
+    pawns = np.uint64(0x0000_5A00_0081_FF00)
+    white_union = 0
+    black_union = 0
+    for sq in range(64):
+        if int(pawns) >> sq & 1:
+            white_union |= int(get_pawn_attacks(sq, COLOR_WHITE))
+            black_union |= int(get_pawn_attacks(sq, COLOR_BLACK))
+    assert int(pawn_attacks_white(pawns)) == white_union
+    assert int(pawn_attacks_black(pawns)) == black_union
+    print("✓ Passed")
 
 
 def test_evaluation_starting_position():
@@ -135,6 +255,25 @@ def test_move_generation_knight():
     print("✓ Passed - Correct number of knight moves")
 
 
+def test_move_count_matches_generation():
+    """Test that the popcount-only move counter agrees with the generator."""
+    print("\nTest: Move count matches generation")
+    piece_arr, color_arr = create_starting_position()
+    # Open some lines and put a white pawn on the 7th rank next to a capture
+    piece_arr[12] = PIECE_NONE
+    color_arr[12] = COLOR_EMPTY
+    piece_arr[51] = PIECE_PAWN
+    color_arr[51] = COLOR_WHITE
+    piece_arr[59] = PIECE_NONE
+    color_arr[59] = COLOR_EMPTY
+
+    piece_bb = board_to_bitboards(piece_arr, color_arr)
+    for stm in (COLOR_WHITE, COLOR_BLACK):
+        moves = EngineCPU.generate_pseudo_legal_moves(piece_arr, color_arr, stm)
+        assert _count_moves_bb(piece_bb, stm) == len(moves)
+    print("✓ Passed")
+
+
 def test_pawn_promotion():
     """Test pawn promotion moves."""
     print("\nTest: Pawn promotion")
@@ -153,25 +292,162 @@ def test_pawn_promotion():
     print("✓ Passed - Correct number of promotion moves")
 
 
-def run_all_tests():
-    """Run all tests."""
-    print("=" * 60)
-    print("Running Chess Logic Tests")
-    print("=" * 60)
-    
-    test_attack_maps_empty_board()
-    test_attack_maps_single_knight()
-    test_attack_maps_rook()
-    test_evaluation_starting_position()
-    test_move_generation_starting_position()
-    test_move_generation_knight()
-    test_pawn_promotion()
-    
-    print("\n" + "=" * 60)
-    print("All tests passed! ✓")
-    print("=" * 60)
+def test_packed_move_round_trip():
+    """Test packing batch move rows into integers and back."""
+    print("\nTest: Packed move round trip")
+    piece_arr, color_arr = create_starting_position()
+    piece_batch = np.broadcast_to(piece_arr, (3, 64))
+    color_batch = np.broadcast_to(color_arr, (3, 64))
+    moves = np.asarray(generate_moves_batch(piece_batch, color_batch, np.array([0, 1, 0])))
 
+    packed = pack_moves(moves, 3)
+    assert packed.dtype == np.uint32
+    assert np.array_equal(unpack_moves(packed), moves)
 
-if __name__ == "__main__":
-    run_all_tests()
+    # Past the 12-bit board index range the encoding widens to uint64
+    moves[:, 0] = PACK_MAX_BOARDS_U32 + 7
+    packed = pack_moves(moves, PACK_MAX_BOARDS_U32 + 8)
+    assert packed.dtype == np.uint64
+    assert np.array_equal(unpack_moves(packed), moves)
+    print("✓ Passed")
+
+
+def test_position_make_unmake():
+    """Test incremental make/unmake against full recomputation."""
+    print("\nTest: Position make/unmake")
+
+    def assert_consistent(pos):
+        assert np.array_equal(pos.piece_bb, board_to_bitboards(pos.piece_arr, pos.color_arr))
+        assert pos.zobrist_hash == int(_zobrist_hash(pos.piece_bb, pos.stm))
+        assert pos.evaluate() == EngineCPU.evaluate(pos.piece_arr, pos.color_arr)
+
+    # Every pseudo-legal reply from the start position, made and unmade
+    pos = Position(*create_starting_position())
+    start_arr, start_hash = pos.piece_arr.copy(), pos.zobrist_hash
+    for move in pos.generate_moves():
+        pos.make_move(move)
+        assert_consistent(pos)
+        assert pos.stm == COLOR_BLACK
+        pos.unmake_move(move)
+    assert np.array_equal(pos.piece_arr, start_arr) and pos.zobrist_hash == start_hash
+
+    # Capture-promotion, castling and en passant
+    cases = [
+        ("r3k3/1P6/8/8/8/8/8/4K3 w - - 0 1", (49, 56, PIECE_QUEEN, FLAG_CAPTURE), PIECE_QUEEN, 56),
+        ("4k3/8/8/8/8/8/8/4K2R w K - 0 1", (4, 6, 0, FLAG_CASTLING), PIECE_ROOK, 5),
+        ("4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1", (36, 43, 0, FLAG_EN_PASSANT), PIECE_NONE, 35),
+    ]
+    for fen, move, expected_piece, check_sq in cases:
+        pos = Position.from_fen(fen)
+        before_arr, before_hash = pos.piece_arr.copy(), pos.zobrist_hash
+        pos.make_move(move)
+        assert_consistent(pos)
+        assert pos.piece_arr[check_sq] == expected_piece
+        pos.unmake_move(move)
+        assert_consistent(pos)
+        assert np.array_equal(pos.piece_arr, before_arr) and pos.zobrist_hash == before_hash
+    print("✓ Passed")
+
+
+def test_fen_round_trip():
+    """Test FEN parsing and formatting against the board arrays."""
+    print("\nTest: FEN round trip")
+    piece_arr, color_arr = create_starting_position()
+    fen = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w - - 0 1"
+    parsed_piece, parsed_color, stm = fen_to_arrays(fen)
+    assert np.array_equal(parsed_piece, piece_arr)
+    assert np.array_equal(parsed_color, color_arr)
+    assert stm == COLOR_WHITE
+    assert arrays_to_fen(piece_arr, color_arr, COLOR_WHITE) == fen
+
+    fen = "r3k2r/1p3pp1/2n5/3Pp2Q/8/8/PP3PPP/R3K2R b - - 0 1"
+    assert arrays_to_fen(*fen_to_arrays(fen)) == fen
+
+    for bad in ("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP w", "rnbqkbnr/ppppxppp/8/8/8/8/PPPPPPPP/RNBQKBNR w"):
+        try:
+            fen_to_arrays(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"Expected ValueError for {bad!r}")
+    print("✓ Passed")
+
+
+def test_batch_coalescer():
+    """Test that coalesced single-board evaluations match direct evaluation."""
+    print("\nTest: Batch coalescer")
+    calls = []
+
+    def batch_fn(piece_batch, color_batch):
+        calls.append(piece_batch.shape[0])
+        return evaluate_batch(piece_batch, color_batch)
+
+    coalescer = BatchCoalescer(batch_fn, batch_max=8, flush_us=50_000)
+    boards = [create_starting_position(), create_empty_board()] * 4
+    futures = [coalescer.submit(piece_arr, color_arr) for piece_arr, color_arr in boards]
 
+    for (piece_arr, color_arr), future in zip(boards, futures):
+        assert future.result(timeout=5) == EngineCPU.evaluate(piece_arr, color_arr)
+    # Eight submissions within the window fill exactly one batch
+    assert calls == [8], f"Expected one batch of 8, got {calls}"
+    print("✓ Passed")
+
+
+def test_batch_coalescer_cancelled_future():
+    """Test that a cancelled submission is skipped and the worker keeps serving."""
+    print("\nTest: Batch coalescer with a cancelled Future")
+    calls = []
+
+    def batch_fn(piece_batch, color_batch):
+        calls.append(piece_batch.shape[0])
+        return evaluate_batch(piece_batch, color_batch)
+
+    coalescer = BatchCoalescer(batch_fn, batch_max=8, flush_us=50_000)
+    piece_arr, color_arr = create_starting_position()
+    cancelled = coalescer.submit(piece_arr, color_arr)
+    kept = coalescer.submit(piece_arr, color_arr)
+    assert cancelled.cancel()
+
+    expected = EngineCPU.evaluate(piece_arr, color_arr)
+    assert kept.result(timeout=5) == expected
+    # The cancelled board is dropped before the batch call
+    assert calls == [1], f"Expected one batch of 1, got {calls}"
+    # A later submission is still served by the same worker
+    assert coalescer.submit(piece_arr, color_arr).result(timeout=5) == expected
+    print("✓ Passed")
+
+
+def test_batch_kernels_concurrent_threads():
+    """Test that CPU batch kernels can be launched from several threads at once."""
+    print("\nTest: Concurrent batch kernel launches")
+    import threading
+    import numba
+
+    piece_arr, color_arr = create_starting_position()
+    piece_batch = np.broadcast_to(piece_arr, (32, 64))
+    color_batch = np.broadcast_to(color_arr, (32, 64))
+    stm_batch = np.zeros(32, dtype=np.int8)
+    expected = np.stack(evaluate_batch(piece_batch, color_batch))
+    errors = []
+
+    def worker():
+        try:
+            for _ in range(20):
+                generate_moves_batch(piece_batch, color_batch, stm_batch)
+                assert np.array_equal(np.stack(evaluate_batch(piece_batch, color_batch)), expected)
+        except Exception as exc:  # surfaced in the main thread below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not errors, errors
+    # The default workqueue layer is not thread-safe; see engine_batch
+    assert numba.threading_layer() in ('omp', 'tbb')
+    print("✓ Passed")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -1,9 +1,15 @@
 from __future__ import annotations
 
-from fastapi import FastAPI
+import logging
+
+from fastapi import FastAPI, Request
+from fastapi.exception_handlers import request_validation_exception_handler
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from .config import settings
+from .models import FEN_FIELD_LABELS
 from .routers import analysis, moves, study, pgn, sessions, opponent
 
 # Import engine_manager only if it exists (for backward compatibility)
@@ -14,6 +20,8 @@ except (ImportError, AttributeError):
     engine_manager = None
     HAS_ENGINE_MANAGER = False
 
+logger = logging.getLogger(__name__)
+
 
 app = FastAPI(
     title="Project BishopForge API",
@@ -33,8 +41,31 @@ if settings.ALLOW_CORS:
     )
 
 
+@app.exception_handler(RequestValidationError)
+async def fen_validation_exception_handler(request: Request, exc: RequestValidationError):
+    # A malformed FEN is reported as 400 "Invalid FEN: ...", the same as when
+    # chess.Board rejects it in a router; other validation errors stay 422
+    for error in exc.errors():
+        loc = error.get("loc", ())
+        if error.get("type") == "value_error" and loc and loc[-1] in FEN_FIELD_LABELS:
+            detail = f"{FEN_FIELD_LABELS[loc[-1]]}: {error['ctx']['error']}"
+            return JSONResponse(status_code=400, content={"detail": detail})
+    return await request_validation_exception_handler(request, exc)
+
+
 @app.on_event("startup")
 async def on_startup() -> None:
+    if settings.LOG_LEVEL.lower() == "debug":
+        from .engine_core.backend import backend_info
+
+        logger.debug(backend_info())
+
+    # Load the Numba kernels now rather than on the first request. This runs
+    # off the main thread; engine_batch pins a thread-safe Numba threading
+    # layer so that is safe for the parallel kernels.
+    from .engine import warmup as engine_warmup
+
+    engine_warmup()
     if HAS_ENGINE_MANAGER and engine_manager:
         await engine_manager.startup()
 
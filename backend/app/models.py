@@ -1,12 +1,38 @@
 from __future__ import annotations
 
-from typing import Optional, List
+import re
+from typing import Annotated, Optional, List
 
-from pydantic import BaseModel, Field
+import chess
+from pydantic import AfterValidator, BaseModel, Field, field_validator
+
+# Shape-only FEN check applied while the request body is validated: eight
+# ranks of piece/digit characters, then optionally the side to move and at
+# most four more fields. Anything it rejects chess.Board would reject too,
+# so malformed input is refused without building a Board; strings that pass
+# still get chess.Board's full validation in the routers.
+FEN_RE = re.compile(
+    r"\s*[1-8pnbrqkPNBRQK~]+(?:/[1-8pnbrqkPNBRQK~]+){7}"
+    r"(?:\s+[wb](?:\s+\S+){0,4})?\s*"
+)
+
+# Request fields checked with FEN_RE, and the error prefix each one reports
+FEN_FIELD_LABELS = {"fen": "Invalid FEN", "starting_fen": "Invalid starting FEN"}
+
+
+def _check_fen_shape(fen: str) -> str:
+    if FEN_RE.fullmatch(fen) is None:
+        # Rejections are rare, so let chess.Board raise its specific message
+        chess.Board(fen)
+        raise ValueError("malformed FEN string")
+    return fen
+
+
+FenStr = Annotated[str, AfterValidator(_check_fen_shape)]
 
 
 class AnalyzeRequest(BaseModel):
-    fen: str = Field(..., description="FEN position to analyze")
+    fen: FenStr = Field(..., description="FEN position to analyze")
     max_depth: int = Field(8, ge=1, le=40, description="Search depth (1–40)")
 
 
@@ -22,7 +48,7 @@ class AnalyzeResponse(BaseModel):
 
 
 class MovesRequest(BaseModel):
-    fen: str = Field(..., description="FEN position")
+    fen: FenStr = Field(..., description="FEN position")
     square: Optional[str] = Field(None, description="Optional from-square (e.g. e2) to filter moves")
 
 
@@ -32,7 +58,7 @@ class MovesResponse(BaseModel):
 
 
 class StudyCheckRequest(BaseModel):
-    fen: str
+    fen: FenStr
     san: str
 
 
@@ -51,9 +77,15 @@ class PGNLoadResponse(BaseModel):
 
 
 class PGNSaveRequest(BaseModel):
-    starting_fen: Optional[str] = None
+    starting_fen: Optional[FenStr] = None
     moves_uci: List[str]
 
+    @field_validator("starting_fen", mode="before")
+    @classmethod
+    def _empty_starting_fen(cls, value):
+        # An empty string has always meant the standard starting position
+        return None if value == "" else value
+
 
 class PGNSaveResponse(BaseModel):
     pgn: str
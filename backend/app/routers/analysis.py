@@ -22,10 +22,11 @@ async def analyze_position(req: AnalyzeRequest) -> AnalyzeResponse:
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=f"Invalid FEN: {exc}") from exc
 
-    # Check cache
-    cached = cache.get(board.fen(), req.max_depth)
+    # Serialize once; the same FEN keys both the cache lookup and the store
+    fen = board.fen()
+    cached = cache.get(fen, req.max_depth)
     if cached is not None:
-        return AnalyzeResponse(best_move=MoveSuggestion(**cached))
+        return AnalyzeResponse.model_construct(best_move=MoveSuggestion.model_construct(**cached))
 
     if board.is_game_over():
         raise HTTPException(status_code=400, detail="Game is already over in this position")
@@ -35,8 +36,9 @@ async def analyze_position(req: AnalyzeRequest) -> AnalyzeResponse:
 
     result = await engine_manager.analyze(board, max_depth=req.max_depth)
 
-    suggestion = MoveSuggestion(**result)
+    # Built from engine output, not client input: skip field validation
+    suggestion = MoveSuggestion.model_construct(**result)
 
-    cache.set(board.fen(), req.max_depth, result)
+    cache.set(fen, req.max_depth, result)
 
-    return AnalyzeResponse(best_move=suggestion)
+    return AnalyzeResponse.model_construct(best_move=suggestion)
@@ -16,18 +16,76 @@ async def list_moves(req: MovesRequest) -> MovesResponse:
         raise HTTPException(status_code=400, detail=f"Invalid FEN: {exc}") from exc
 
     if board.is_game_over():
-        return MovesResponse(moves_san=[], moves_uci=[])
+        return MovesResponse.model_construct(moves_san=[], moves_uci=[])
 
-    moves = list(board.legal_moves)
+    legal_moves = list(board.legal_moves)
+    moves = legal_moves
 
     if req.square:
-        # Filter by from-square if provided
-        moves = [m for m in moves if chess.square_name(m.from_square) == req.square]
+        # Filter by from-square if provided; an unknown square name matches nothing
+        try:
+            from_sq = chess.parse_square(req.square)
+        except ValueError:
+            from_sq = None
+        moves = [m for m in moves if m.from_square == from_sq]
 
-    moves_san: list[str] = []
-    moves_uci: list[str] = []
+    moves_uci = [mv.uci() for mv in moves]
+    moves_san = legal_moves_san(board, moves, legal_moves)
+
+    return MovesResponse.model_construct(moves_san=moves_san, moves_uci=moves_uci)
+
+
+def legal_moves_san(
+    board: chess.Board,
+    moves: list[chess.Move],
+    legal_moves: list[chess.Move] | None = None,
+) -> list[str]:
+    """
+    SAN for each of `moves` (all legal in `board`); same strings as board.san().
+
+    board.san() finds ambiguous origins with a masked legal-move generation
+    for every move. Here the origins come from one pass over the legal move
+    list, so only the check/mate look-ahead is paid per move.
+    """
+    if legal_moves is None:
+        legal_moves = list(board.legal_moves)
+
+    # Origins of each piece type's legal moves, by target square
+    origins: dict[tuple[int, int], int] = {}
+    for mv in legal_moves:
+        key = (board.piece_type_at(mv.from_square), mv.to_square)
+        origins[key] = origins.get(key, 0) | chess.BB_SQUARES[mv.from_square]
+
+    sans = []
     for mv in moves:
-        moves_uci.append(mv.uci())
-        moves_san.append(board.san(mv))
+        if board.is_castling(mv):
+            san = "O-O-O" if chess.square_file(mv.to_square) < chess.square_file(mv.from_square) else "O-O"
+        else:
+            piece_type = board.piece_type_at(mv.from_square)
+            capture = board.is_capture(mv)
+            if piece_type == chess.PAWN:
+                san = chess.FILE_NAMES[chess.square_file(mv.from_square)] if capture else ""
+            else:
+                san = chess.piece_symbol(piece_type).upper()
+                others = origins[piece_type, mv.to_square] & ~chess.BB_SQUARES[mv.from_square]
+                if others:
+                    # File if it tells the candidates apart, else rank, else both
+                    file_clash = others & chess.BB_FILES[chess.square_file(mv.from_square)]
+                    rank_clash = others & chess.BB_RANKS[chess.square_rank(mv.from_square)]
+                    if rank_clash or not file_clash:
+                        san += chess.FILE_NAMES[chess.square_file(mv.from_square)]
+                    if file_clash:
+                        san += chess.RANK_NAMES[chess.square_rank(mv.from_square)]
+            if capture:
+                san += "x"
+            san += chess.SQUARE_NAMES[mv.to_square]
+            if mv.promotion:
+                san += "=" + chess.piece_symbol(mv.promotion).upper()
+
+        board.push(mv)
+        if board.is_check():
+            san += "#" if board.is_checkmate() else "+"
+        board.pop()
+        sans.append(san)
 
-    return MovesResponse(moves_san=moves_san, moves_uci=moves_uci)
+    return sans
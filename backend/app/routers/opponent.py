@@ -4,24 +4,40 @@ opponent.py - AI opponent move generation with different playing styles.
 from __future__ import annotations
 
 import random
+from collections import OrderedDict
+
 import chess
+import numpy as np
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 from typing import Optional
 
+from ..engine import evaluate_position_batch
+from ..models import FenStr
 from ..engine_core.backend import GPU as GPU_AVAILABLE
-from ..engine_core.fen_utils import fen_to_arrays
+from ..engine_core.fen_utils import fen_to_arrays, apply_move_in_place
 from ..engine_core.engine_cpu import EngineCPU
+from ..engine_core.opponent_score import PROFILE_IDS, PROFILE_OFFENSIVE, score_profiles
 
 router = APIRouter(prefix="/opponent", tags=["opponent"])
 
 # Global flag to force CPU mode (can be toggled by frontend)
 _force_cpu_mode = False
 
+# LRU of position scores keyed by the 128 bytes of (piece_arr, color_arr).
+# Opening positions and transpositions recur across requests, and the scores
+# depend only on the arrays and on which backend produced them.
+_EVAL_CACHE_MAX = 100_000
+_eval_cache: OrderedDict[bytes, np.ndarray] = OrderedDict()
+
 
 class OpponentMoveRequest(BaseModel):
-    fen: str = Field(..., description="Current position FEN")
+    fen: FenStr = Field(..., description="Current position FEN")
     profile: str = Field("random", description="Opponent profile: random, aggressive, defensive, moderate, defensive_passive")
+    include_san: bool = Field(
+        True,
+        description="Also return the move in SAN. Clients that only need UCI (e.g. doing their own move validation) should set false to skip the SAN computation.",
+    )
 
 
 class OpponentMoveResponse(BaseModel):
@@ -52,6 +68,10 @@ async def get_gpu_status() -> GPUStatusResponse:
 async def toggle_gpu(enable: bool) -> dict:
     """Toggle GPU usage (force CPU mode on/off)."""
     global _force_cpu_mode
+    if _force_cpu_mode != (not enable):
+        # The GPU kernels score with a simplified model, so cached scores
+        # from the other backend no longer apply
+        _eval_cache.clear()
     _force_cpu_mode = not enable
     
     return {
@@ -91,7 +111,8 @@ async def get_opponent_move(req: OpponentMoveRequest) -> OpponentMoveResponse:
     else:
         selected_move, evaluation = _select_strategic_move(board, legal_moves, req.profile)
     
-    move_san = board.san(selected_move)
+    # board.san() re-derives legality and disambiguation; only pay for it on request
+    move_san = board.san(selected_move) if req.include_san else None
     move_uci = selected_move.uci()
     
     return OpponentMoveResponse(
@@ -101,64 +122,93 @@ async def get_opponent_move(req: OpponentMoveRequest) -> OpponentMoveResponse:
     )
 
 
+def _evaluate_uncached(piece_batch: np.ndarray, color_batch: np.ndarray) -> np.ndarray:
+    """
+    Evaluate (N, 64) positions; returns an (N, 4) array of
+    (white_off, white_def, black_off, black_def).
+
+    All positions go through one batched call (one GPU kernel launch, or
+    one parallel Numba kernel on CPU-only hosts). When the GPU is present
+    but switched off, positions are evaluated one by one on the CPU.
+    """
+    if GPU_AVAILABLE and _force_cpu_mode:
+        return np.array(
+            [EngineCPU.evaluate(piece, color) for piece, color in zip(piece_batch, color_batch)],
+            dtype=np.int64,
+        ).reshape(-1, 4)
+
+    scores = evaluate_position_batch(piece_batch, color_batch)
+    return np.stack(
+        [scores.white_off, scores.white_def, scores.black_off, scores.black_def], axis=1
+    ).astype(np.int64)
+
+
+def _evaluate_candidates(piece_batch: np.ndarray, color_batch: np.ndarray) -> np.ndarray:
+    """
+    Evaluate (N, 64) candidate positions as _evaluate_uncached does, reusing
+    scores of positions already seen in this or earlier requests.
+
+    Only distinct positions missing from the cache are evaluated.
+    """
+    n = piece_batch.shape[0]
+    # One 128-byte key per row: the row's piece bytes followed by its color bytes
+    raw = np.concatenate([piece_batch, color_batch], axis=1).astype(np.int8, copy=False).tobytes()
+    keys = [raw[i * 128:(i + 1) * 128] for i in range(n)]
+
+    misses = [key for key in dict.fromkeys(keys) if key not in _eval_cache]
+    if misses:
+        rows = np.frombuffer(b"".join(misses), dtype=np.int8).reshape(-1, 128)
+        for key, scores in zip(misses, _evaluate_uncached(rows[:, :64], rows[:, 64:])):
+            _eval_cache[key] = scores
+        while len(_eval_cache) > _EVAL_CACHE_MAX:
+            _eval_cache.popitem(last=False)
+
+    out = np.empty((n, 4), dtype=np.int64)
+    for i, key in enumerate(keys):
+        _eval_cache.move_to_end(key)
+        out[i] = _eval_cache[key]
+    return out
+
+
 def _select_strategic_move(board: chess.Board, legal_moves: list, profile: str) -> tuple:
     """Select move based on strategic profile using single-level evaluation."""
-    best_move = None
-    best_score = float('-inf')
-    evaluation_details = {}
-    
-    # Get current position evaluation
-    piece_arr, color_arr, stm = fen_to_arrays(board.fen())
-    current_eval = EngineCPU.evaluate(piece_arr, color_arr)
-    current_wo, current_wd, current_bo, current_bd = current_eval
-    
-    # Evaluate each legal move
-    for move in legal_moves:
-        board.push(move)
-        piece_arr_after, color_arr_after, stm_after = fen_to_arrays(board.fen())
-        after_eval = EngineCPU.evaluate(piece_arr_after, color_arr_after)
-        wo_after, wd_after, bo_after, bd_after = after_eval
-        board.pop()
-        
-        # Calculate score based on profile
-        # Note: If black to move, we flip the perspective
-        is_white = board.turn == chess.WHITE
-        
-        if is_white:
-            my_off, my_def, opp_off, opp_def = wo_after, wd_after, bo_after, bd_after
-            my_off_delta = wo_after - current_wo
-            my_def_delta = wd_after - current_wd
-            opp_off_delta = bo_after - current_bo
-            opp_def_delta = bd_after - current_bd
-        else:
-            my_off, my_def, opp_off, opp_def = bo_after, bd_after, wo_after, wd_after
-            my_off_delta = bo_after - current_bo
-            my_def_delta = bd_after - current_bd
-            opp_off_delta = wo_after - current_wo
-            opp_def_delta = wd_after - current_wd
-        
-        # Score based on profile
-        if profile == "aggressive":
-            score = my_off_delta - opp_off_delta
-        elif profile == "defensive":
-            score = my_def_delta - opp_off_delta
-        elif profile == "moderate":
-            score = my_off_delta + my_def_delta
-        elif profile == "defensive_passive":
-            score = my_def_delta - opp_def_delta
-        else:
-            score = my_off_delta  # Default to offensive
-        
-        if score > best_score:
-            best_score = score
-            best_move = move
-            evaluation_details = {
-                "score": int(best_score),
-                "my_offense": int(my_off),
-                "my_defense": int(my_def),
-                "opponent_offense": int(opp_off),
-                "opponent_defense": int(opp_def)
-            }
-    
-    return best_move, evaluation_details
+    # Row 0 is the current position and row i + 1 the position after
+    # legal_moves[i]: the board is copied into every row once, then each
+    # move is applied to its own row, with no push/pop or per-move arrays
+    piece_arr, color_arr, _ = fen_to_arrays(board.fen())
+    piece_batch = np.tile(piece_arr, (len(legal_moves) + 1, 1))
+    color_batch = np.tile(color_arr, (len(legal_moves) + 1, 1))
+    for row, move in enumerate(legal_moves, 1):
+        apply_move_in_place(
+            piece_batch[row], color_batch[row], move,
+            is_castling=board.is_castling(move),
+            is_en_passant=board.is_en_passant(move),
+        )
+
+    evals = _evaluate_candidates(piece_batch, color_batch)
+    current, after = evals[0], evals[1:]
+    is_white = board.turn == chess.WHITE
+    scores = score_profiles(
+        after, current, is_white, PROFILE_IDS.get(profile, PROFILE_OFFENSIVE)
+    )
 
+    # Columns are (white_off, white_def, black_off, black_def); view them
+    # from the side to move
+    if is_white:
+        mine, theirs = slice(0, 2), slice(2, 4)
+    else:
+        mine, theirs = slice(2, 4), slice(0, 2)
+
+    # argmax takes the first of equal scores, as the sequential scan did
+    best = int(np.argmax(scores))
+    my_off, my_def = after[best, mine]
+    opp_off, opp_def = after[best, theirs]
+    evaluation_details = {
+        "score": int(scores[best]),
+        "my_offense": int(my_off),
+        "my_defense": int(my_def),
+        "opponent_offense": int(opp_off),
+        "opponent_defense": int(opp_def)
+    }
+    
+    return legal_moves[best], evaluation_details
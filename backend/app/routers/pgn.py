@@ -11,37 +11,68 @@ from ..models import PGNLoadRequest, PGNLoadResponse, PGNSaveRequest, PGNSaveRes
 router = APIRouter(prefix="/pgn", tags=["pgn"])
 
 
+class _MainlineVisitor(chess.pgn.BaseVisitor):
+    """
+    read_game() visitor that keeps only the mainline moves and the starting
+    board, instead of building a GameNode tree. Variations are skipped
+    unparsed.
+    """
+
+    def begin_game(self) -> None:
+        self.board: chess.Board | None = None
+        self.moves: list[chess.Move] = []
+
+    def begin_variation(self):
+        return chess.pgn.SKIP
+
+    def visit_board(self, board: chess.Board) -> None:
+        # Called first with the starting position, then after every move
+        if self.board is None:
+            self.board = board.copy(stack=False)
+
+    def visit_move(self, board: chess.Board, move: chess.Move) -> None:
+        self.moves.append(move)
+
+    def handle_error(self, error: Exception) -> None:
+        # Like the default GameBuilder: an unparsable move ends the mainline
+        # rather than failing the whole game
+        pass
+
+    def result(self):
+        return self.board, self.moves
+
+
 @router.post("/load", response_model=PGNLoadResponse)
 async def load_pgn(req: PGNLoadRequest) -> PGNLoadResponse:
     try:
-        game = chess.pgn.read_game(io.StringIO(req.pgn))
+        game = chess.pgn.read_game(io.StringIO(req.pgn), Visitor=_MainlineVisitor)
     except Exception as exc:  # python-chess can raise generic error
         raise HTTPException(status_code=400, detail=f"Invalid PGN: {exc}") from exc
 
     if game is None:
         raise HTTPException(status_code=400, detail="No game found in PGN")
 
-    board = game.board()
-    moves_san: list[str] = []
-    for move in game.mainline_moves():
-        moves_san.append(board.san(move))
-        board.push(move)
+    board, moves = game
+    if board is None:
+        raise HTTPException(status_code=400, detail="Invalid PGN: unusable FEN header")
+    # One push per move; san() followed by push() would push, pop, then push again
+    moves_san = [board.san_and_push(move) for move in moves]
 
-    return PGNLoadResponse(moves_san=moves_san, final_fen=board.fen())
+    return PGNLoadResponse.model_construct(moves_san=moves_san, final_fen=board.fen())
 
 
 @router.post("/save", response_model=PGNSaveResponse)
 async def save_pgn(req: PGNSaveRequest) -> PGNSaveResponse:
+    game = chess.pgn.Game()
     if req.starting_fen:
         try:
             board = chess.Board(fen=req.starting_fen)
         except ValueError as exc:
             raise HTTPException(status_code=400, detail=f"Invalid starting FEN: {exc}") from exc
+        game.setup(board)
     else:
+        # A new Game already starts from the standard position
         board = chess.Board()
-
-    game = chess.pgn.Game()
-    game.setup(board)
     node = game
 
     for uci in req.moves_uci:
@@ -52,7 +83,9 @@ async def save_pgn(req: PGNSaveRequest) -> PGNSaveResponse:
         node = node.add_variation(move)
         board.push(move)
 
-    out = io.StringIO()
-    print(game, file=out, end="\n")
+    # The game has no comments or variations, so the exporter skips those
+    # passes; same text as str(game), which also exports without wrapping
+    exporter = chess.pgn.StringExporter(columns=None, headers=True, variations=False, comments=False)
+    pgn_str = game.accept(exporter)
 
-    return PGNSaveResponse(pgn=out.getvalue())
+    return PGNSaveResponse.model_construct(pgn=pgn_str + "\n")
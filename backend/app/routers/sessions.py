@@ -1,70 +1,80 @@
 from __future__ import annotations
 
 import uuid
-from typing import Dict, List
 
 import chess
 from fastapi import APIRouter, HTTPException
 
 from ..models import NewSessionResponse, SessionMoveRequest, SessionStateResponse
+from ..session_store import SessionState, SessionUpdate, session_store
 
 router = APIRouter(prefix="/session", tags=["session"])
 
-# In-memory session store (good enough for dev; replace with Redis later)
-_sessions: Dict[str, chess.Board] = {}
-_session_moves: Dict[str, List[str]] = {}
-
 
 @router.post("/new", response_model=NewSessionResponse)
 async def new_session() -> NewSessionResponse:
     session_id = str(uuid.uuid4())
-    board = chess.Board()
-    _sessions[session_id] = board
-    _session_moves[session_id] = []
-    return NewSessionResponse(session_id=session_id, fen=board.fen())
+    fen = chess.STARTING_FEN
+    await session_store.set(session_id, SessionState(fen=fen, moves_uci=[], starting_fen=fen))
+    return NewSessionResponse.model_construct(session_id=session_id, fen=fen)
+
+
+async def _get_session(session_id: str) -> SessionState:
+    state = await session_store.get(session_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return state
 
 
-def _get_session(session_id: str) -> chess.Board:
-    board = _sessions.get(session_id)
-    if board is None:
+async def _update_session(session_id: str, fn: SessionUpdate) -> SessionState:
+    state = await session_store.update(session_id, fn)
+    if state is None:
         raise HTTPException(status_code=404, detail="Session not found")
-    return board
+    return state
 
 
 @router.get("/{session_id}", response_model=SessionStateResponse)
 async def get_session_state(session_id: str) -> SessionStateResponse:
-    board = _get_session(session_id)
-    moves = _session_moves.get(session_id, [])
-    return SessionStateResponse(session_id=session_id, fen=board.fen(), moves_uci=moves)
+    # Served straight from the store; no Board is built on reads
+    state = await _get_session(session_id)
+    return SessionStateResponse.model_construct(session_id=session_id, fen=state.fen, moves_uci=state.moves_uci)
 
 
 @router.post("/{session_id}/move", response_model=SessionStateResponse)
 async def apply_session_move(session_id: str, req: SessionMoveRequest) -> SessionStateResponse:
-    board = _get_session(session_id)
+    def apply(state: SessionState) -> SessionState:
+        # The stored FEN is the current position; no history replay per move
+        board = chess.Board(state.fen)
 
-    try:
-        move = board.parse_uci(req.move_uci)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid UCI move")
+        try:
+            move = board.parse_uci(req.move_uci)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid UCI move")
 
-    if move not in board.legal_moves:
-        raise HTTPException(status_code=400, detail="Illegal move in this position")
+        if move not in board.legal_moves:
+            raise HTTPException(status_code=400, detail="Illegal move in this position")
 
-    board.push(move)
-    _session_moves.setdefault(session_id, []).append(req.move_uci)
+        board.push(move)
+        return state._replace(fen=board.fen(), moves_uci=state.moves_uci + [req.move_uci])
 
-    return SessionStateResponse(session_id=session_id, fen=board.fen(), moves_uci=_session_moves[session_id])
+    state = await _update_session(session_id, apply)
+    return SessionStateResponse.model_construct(session_id=session_id, fen=state.fen, moves_uci=state.moves_uci)
 
 
 @router.post("/{session_id}/undo", response_model=SessionStateResponse)
 async def undo_session_move(session_id: str) -> SessionStateResponse:
-    board = _get_session(session_id)
-    moves = _session_moves.get(session_id, [])
-
-    if not moves:
-        raise HTTPException(status_code=400, detail="No moves to undo")
-
-    board.pop()
-    moves.pop()
-
-    return SessionStateResponse(session_id=session_id, fen=board.fen(), moves_uci=moves)
+    def undo(state: SessionState) -> SessionState:
+        if not state.moves_uci:
+            raise HTTPException(status_code=400, detail="No moves to undo")
+
+        # Only the current FEN is stored, so replay the remaining history from
+        # the session's starting position; these moves were validated when
+        # they were applied. Undo is rare next to moves, so it pays the O(n).
+        moves = state.moves_uci[:-1]
+        board = chess.Board(state.starting_fen)
+        for uci in moves:
+            board.push(chess.Move.from_uci(uci))
+        return state._replace(fen=board.fen(), moves_uci=moves)
+
+    state = await _update_session(session_id, undo)
+    return SessionStateResponse.model_construct(session_id=session_id, fen=state.fen, moves_uci=state.moves_uci)
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import json
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import chess
+
+try:
+    import redis.asyncio as redis_asyncio  # type: ignore
+except Exception:
+    redis_asyncio = None
+
+from .config import settings
+
+
+class SessionState(NamedTuple):
+    """
+    Stored session: the current FEN (already serialized), the UCI move
+    history and the FEN that history starts from.
+    """
+
+    fen: str
+    moves_uci: List[str]
+    starting_fen: str = chess.STARTING_FEN
+
+
+# Maps the stored state to the new one; may raise to abort the update
+SessionUpdate = Callable[[SessionState], SessionState]
+
+
+class MemorySessionStore:
+    """
+    Process-local session store.
+
+    Used when no Redis URL is configured; sessions are only visible to the
+    worker that created them.
+    """
+
+    def __init__(self) -> None:
+        self._sessions: Dict[str, SessionState] = {}
+
+    async def get(self, session_id: str) -> Optional[SessionState]:
+        return self._sessions.get(session_id)
+
+    async def set(self, session_id: str, state: SessionState) -> None:
+        self._sessions[session_id] = state
+
+    async def update(self, session_id: str, fn: SessionUpdate) -> Optional[SessionState]:
+        """Apply ``fn`` to the stored state; None if the session does not exist."""
+        # No await between the read and the write, so this is atomic on the event loop
+        state = self._sessions.get(session_id)
+        if state is None:
+            return None
+        state = self._sessions[session_id] = fn(state)
+        return state
+
+
+class RedisSessionStore:
+    """
+    Session store shared by all workers, one JSON value per session under
+    ``session:{id}``. Every write resets the key's expiry, so abandoned
+    sessions are dropped after ``ttl_seconds`` without activity.
+    """
+
+    KEY_PREFIX = "session:"
+
+    def __init__(self, url: str, ttl_seconds: Optional[int] = None) -> None:
+        self._client = redis_asyncio.from_url(url, decode_responses=True)
+        self._ttl = settings.SESSION_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+
+    @staticmethod
+    def _decode(raw: str) -> SessionState:
+        data = json.loads(raw)
+        return SessionState(
+            fen=data["fen"],
+            moves_uci=data["moves_uci"],
+            starting_fen=data.get("starting_fen", chess.STARTING_FEN),
+        )
+
+    @staticmethod
+    def _encode(state: SessionState) -> str:
+        return json.dumps(state._asdict())
+
+    async def get(self, session_id: str) -> Optional[SessionState]:
+        raw = await self._client.get(self.KEY_PREFIX + session_id)
+        if raw is None:
+            return None
+        return self._decode(raw)
+
+    async def set(self, session_id: str, state: SessionState) -> None:
+        await self._client.set(self.KEY_PREFIX + session_id, self._encode(state), ex=self._ttl)
+
+    async def update(self, session_id: str, fn: SessionUpdate) -> Optional[SessionState]:
+        """
+        Apply ``fn`` to the stored state inside a WATCH/MULTI transaction,
+        retrying if another worker wrote the session in between; None if the
+        session does not exist.
+        """
+        key = self.KEY_PREFIX + session_id
+        async with self._client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(key)
+                    raw = await pipe.get(key)
+                    if raw is None:
+                        return None
+                    state = fn(self._decode(raw))
+                    pipe.multi()
+                    pipe.set(key, self._encode(state), ex=self._ttl)
+                    await pipe.execute()
+                    return state
+                except redis_asyncio.WatchError:
+                    continue
+
+
+def make_session_store():
+    """Redis-backed store when BF_REDIS_URL is set, else the in-memory store."""
+    if not settings.REDIS_URL:
+        return MemorySessionStore()
+    if redis_asyncio is None:
+        raise RuntimeError("BF_REDIS_URL is set but the 'redis' package is not installed")
+    return RedisSessionStore(settings.REDIS_URL)
+
+
+session_store = make_session_store()
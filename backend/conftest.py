@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+import pytest
+
+from app import engine
+
+
+@pytest.fixture(scope="session", autouse=True)
+def engine_warmup():
+    """
+    Load every engine kernel once before any test runs, so Numba's
+    first-call load/compile is not charged to whichever test happens to
+    hit a kernel first.
+    """
+    engine.warmup()
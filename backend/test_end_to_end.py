@@ -2,75 +2,78 @@
 End-to-end test: FEN → Engine → Results
 """
 
+import logging
+
+import numpy as np
+import pytest
 from app import engine
-from app.engine_core.fen_utils import fen_to_arrays, STARTING_FEN
+from app.engine_core.fen_utils import fen_to_arrays, fen_list_to_arrays, STARTING_FEN
+
+# Per-test detail goes to DEBUG so plain pytest runs skip the formatting;
+# running this file as a script turns it back on.
+logger = logging.getLogger(__name__)
+
+# Square index (a1=0 .. h8=63) to its algebraic name
+_SQ_NAMES = [f"{chr(ord('a') + f)}{r + 1}" for r in range(8) for f in range(8)]
 
 
 def test_starting_position_analysis():
     """Analyze the starting position."""
-    print("Test: Starting position analysis")
-    print("=" * 60)
+    logger.debug("Test: Starting position analysis")
+    logger.debug("=" * 60)
     
     piece_arr, color_arr, stm = fen_to_arrays(STARTING_FEN)
     
     # Evaluate position
     eval_result = engine.evaluate_position_single(piece_arr, color_arr)
-    print(f"\nEvaluation:")
-    print(f"  White: offensive={eval_result.white_off}, defensive={eval_result.white_def}")
-    print(f"  Black: offensive={eval_result.black_off}, defensive={eval_result.black_def}")
-    print(f"  Balance: {eval_result.white_off - eval_result.black_off}")
+    logger.debug("\nEvaluation:")
+    logger.debug("  White: offensive=%s, defensive=%s", eval_result.white_off, eval_result.white_def)
+    logger.debug("  Black: offensive=%s, defensive=%s", eval_result.black_off, eval_result.black_def)
+    logger.debug("  Balance: %s", eval_result.white_off - eval_result.black_off)
     
     # Generate moves
     moves = engine.generate_moves_single(piece_arr, color_arr, stm)
-    print(f"\nMove Generation:")
-    print(f"  Total moves: {len(moves)}")
-    print(f"  First 5 moves:")
+    logger.debug("\nMove Generation:")
+    logger.debug("  Total moves: %s", len(moves))
+    logger.debug("  First 5 moves:")
     for i, move in enumerate(moves[:5]):
-        from_sq = move.from_sq
-        to_sq = move.to_sq
-        from_file = chr(ord('a') + (from_sq % 8))
-        from_rank = (from_sq // 8) + 1
-        to_file = chr(ord('a') + (to_sq % 8))
-        to_rank = (to_sq // 8) + 1
-        print(f"    {i+1}. {from_file}{from_rank}{to_file}{to_rank}")
+        logger.debug("    %s. %s%s", i+1, _SQ_NAMES[move.from_sq], _SQ_NAMES[move.to_sq])
     
     # Attack maps
     white_att, black_att = engine.attack_maps_single(piece_arr, color_arr)
-    print(f"\nAttack Maps:")
-    print(f"  White attacks: {white_att.sum()} squares")
-    print(f"  Black attacks: {black_att.sum()} squares")
+    logger.debug("\nAttack Maps:")
+    logger.debug("  White attacks: %s squares", np.count_nonzero(white_att))
+    logger.debug("  Black attacks: %s squares", np.count_nonzero(black_att))
     
-    print("\n✓ Starting position analyzed successfully")
-
+    logger.debug("\n✓ Starting position analyzed successfully")
 
 def test_position_after_e4():
     """Analyze position after 1. e4."""
-    print("\n" + "=" * 60)
-    print("Test: Position after 1. e4")
-    print("=" * 60)
+    logger.debug("\n" + "=" * 60)
+    logger.debug("Test: Position after 1. e4")
+    logger.debug("=" * 60)
     
     fen = "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1"
     piece_arr, color_arr, stm = fen_to_arrays(fen)
     
     # Evaluate
     eval_result = engine.evaluate_position_single(piece_arr, color_arr)
-    print(f"\nEvaluation:")
-    print(f"  White: offensive={eval_result.white_off}, defensive={eval_result.white_def}")
-    print(f"  Black: offensive={eval_result.black_off}, defensive={eval_result.black_def}")
-    print(f"  Balance: {eval_result.white_off - eval_result.black_off}")
+    logger.debug("\nEvaluation:")
+    logger.debug("  White: offensive=%s, defensive=%s", eval_result.white_off, eval_result.white_def)
+    logger.debug("  Black: offensive=%s, defensive=%s", eval_result.black_off, eval_result.black_def)
+    logger.debug("  Balance: %s", eval_result.white_off - eval_result.black_off)
     
     # Generate moves for black
     moves = engine.generate_moves_single(piece_arr, color_arr, stm)
-    print(f"\nBlack has {len(moves)} legal moves")
+    logger.debug("\nBlack has %s legal moves", len(moves))
     
-    print("\n✓ Position after e4 analyzed successfully")
-
+    logger.debug("\n✓ Position after e4 analyzed successfully")
 
 def test_endgame_position():
     """Analyze a simple endgame position."""
-    print("\n" + "=" * 60)
-    print("Test: King and pawn endgame")
-    print("=" * 60)
+    logger.debug("\n" + "=" * 60)
+    logger.debug("Test: King and pawn endgame")
+    logger.debug("=" * 60)
     
     # White: King on e1, Pawn on e2
     # Black: King on e8
@@ -79,29 +82,28 @@ def test_endgame_position():
     
     # Evaluate
     eval_result = engine.evaluate_position_single(piece_arr, color_arr)
-    print(f"\nEvaluation:")
-    print(f"  White: offensive={eval_result.white_off}, defensive={eval_result.white_def}")
-    print(f"  Black: offensive={eval_result.black_off}, defensive={eval_result.black_def}")
-    print(f"  Material advantage: {eval_result.white_off - eval_result.black_off}")
+    logger.debug("\nEvaluation:")
+    logger.debug("  White: offensive=%s, defensive=%s", eval_result.white_off, eval_result.white_def)
+    logger.debug("  Black: offensive=%s, defensive=%s", eval_result.black_off, eval_result.black_def)
+    logger.debug("  Material advantage: %s", eval_result.white_off - eval_result.black_off)
     
     # Generate moves
     moves = engine.generate_moves_single(piece_arr, color_arr, stm)
-    print(f"\nWhite has {len(moves)} legal moves")
+    logger.debug("\nWhite has %s legal moves", len(moves))
     
     # Attack maps
     white_att, black_att = engine.attack_maps_single(piece_arr, color_arr)
-    print(f"\nAttack Maps:")
-    print(f"  White attacks: {white_att.sum()} squares")
-    print(f"  Black attacks: {black_att.sum()} squares")
+    logger.debug("\nAttack Maps:")
+    logger.debug("  White attacks: %s squares", np.count_nonzero(white_att))
+    logger.debug("  Black attacks: %s squares", np.count_nonzero(black_att))
     
-    print("\n✓ Endgame position analyzed successfully")
-
+    logger.debug("\n✓ Endgame position analyzed successfully")
 
 def test_tactical_position():
     """Analyze a tactical position with pieces."""
-    print("\n" + "=" * 60)
-    print("Test: Tactical position")
-    print("=" * 60)
+    logger.debug("\n" + "=" * 60)
+    logger.debug("Test: Tactical position")
+    logger.debug("=" * 60)
     
     # Position with knights and bishops
     fen = "rnbqkb1r/pppp1ppp/5n2/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 4 3"
@@ -109,25 +111,22 @@ def test_tactical_position():
     
     # Evaluate
     eval_result = engine.evaluate_position_single(piece_arr, color_arr)
-    print(f"\nEvaluation:")
-    print(f"  White: offensive={eval_result.white_off}, defensive={eval_result.white_def}")
-    print(f"  Black: offensive={eval_result.black_off}, defensive={eval_result.black_def}")
-    print(f"  Balance: {eval_result.white_off - eval_result.black_off}")
+    logger.debug("\nEvaluation:")
+    logger.debug("  White: offensive=%s, defensive=%s", eval_result.white_off, eval_result.white_def)
+    logger.debug("  Black: offensive=%s, defensive=%s", eval_result.black_off, eval_result.black_def)
+    logger.debug("  Balance: %s", eval_result.white_off - eval_result.black_off)
     
     # Generate moves
     moves = engine.generate_moves_single(piece_arr, color_arr, stm)
-    print(f"\nWhite has {len(moves)} legal moves")
+    logger.debug("\nWhite has %s legal moves", len(moves))
     
-    print("\n✓ Tactical position analyzed successfully")
-
+    logger.debug("\n✓ Tactical position analyzed successfully")
 
 def test_batch_analysis():
     """Test batch analysis of multiple positions."""
-    print("\n" + "=" * 60)
-    print("Test: Batch analysis")
-    print("=" * 60)
-    
-    import numpy as np
+    logger.debug("\n" + "=" * 60)
+    logger.debug("Test: Batch analysis")
+    logger.debug("=" * 60)
     
     # Analyze 3 different positions
     fens = [
@@ -136,47 +135,19 @@ def test_batch_analysis():
         "4k3/8/8/8/8/8/4P3/4K3 w - - 0 1"
     ]
     
-    piece_arrays = []
-    color_arrays = []
-    
-    for fen in fens:
-        piece_arr, color_arr, _ = fen_to_arrays(fen)
-        piece_arrays.append(piece_arr)
-        color_arrays.append(color_arr)
-    
-    piece_batch = np.stack(piece_arrays)
-    color_batch = np.stack(color_arrays)
+    piece_batch, color_batch, _ = fen_list_to_arrays(fens)
     
     # Batch evaluation
     result = engine.evaluate_position_batch(piece_batch, color_batch)
     
-    print(f"\nBatch Evaluation Results:")
+    logger.debug("\nBatch Evaluation Results:")
     for i in range(len(fens)):
-        print(f"  Position {i+1}:")
-        print(f"    White: off={result.white_off[i]}, def={result.white_def[i]}")
-        print(f"    Black: off={result.black_off[i]}, def={result.black_def[i]}")
+        logger.debug("  Position %s:", i+1)
+        logger.debug("    White: off=%s, def=%s", result.white_off[i], result.white_def[i])
+        logger.debug("    Black: off=%s, def=%s", result.black_off[i], result.black_def[i])
     
-    print("\n✓ Batch analysis completed successfully")
-
-
-def run_all_tests():
-    """Run all end-to-end tests."""
-    print("\n" + "=" * 60)
-    print("END-TO-END CHESS ENGINE TESTS")
-    print("=" * 60)
-    print(f"Backend: {engine.backend_name()}")
-    
-    test_starting_position_analysis()
-    test_position_after_e4()
-    test_endgame_position()
-    test_tactical_position()
-    test_batch_analysis()
-    
-    print("\n" + "=" * 60)
-    print("ALL END-TO-END TESTS PASSED! ✓")
-    print("=" * 60)
+    logger.debug("\n✓ Batch analysis completed successfully")
 
 
 if __name__ == "__main__":
-    run_all_tests()
-
+    pytest.main([__file__, "-v", "--log-cli-level=DEBUG"])
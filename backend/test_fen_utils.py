@@ -2,9 +2,12 @@
 Test FEN conversion utilities.
 """
 
+import chess
 import numpy as np
+import pytest
 from app.engine_core.fen_utils import (
-    fen_to_arrays, arrays_to_fen, fen_to_board_2d, STARTING_FEN
+    fen_to_arrays, fen_list_to_arrays, arrays_to_fen, fen_to_board_2d, apply_move_to_arrays,
+    STARTING_FEN,
 )
 from app.engine_core.chess_utils import (
     PIECE_PAWN, PIECE_KNIGHT, PIECE_ROOK, PIECE_KING,
@@ -109,6 +112,12 @@ def test_board_2d():
     assert all(board[1][i] == 'p' for i in range(8)), "Rank 7 should have black pawns"
     assert all(board[6][i] == 'P' for i in range(8)), "Rank 2 should have white pawns"
     
+    # Check empty squares, including runs split by pieces
+    assert all(board[3][i] is None for i in range(8)), "Rank 5 should be empty"
+    board = fen_to_board_2d("r3k2r/8/8/8/8/8/8/4K3 w - - 0 1")
+    assert board[0] == ['r', None, None, None, 'k', None, None, 'r']
+    assert board[7] == [None, None, None, None, 'K', None, None, None]
+    
     # Check empty squares
     assert all(board[3][i] is None for i in range(8)), "Rank 5 should be empty"
     
@@ -130,23 +139,80 @@ def test_empty_board():
     print("✓ Passed")
 
 
-def run_all_tests():
-    """Run all FEN utility tests."""
-    print("=" * 60)
-    print("Running FEN Utility Tests")
-    print("=" * 60)
+def test_apply_move_to_arrays():
+    """Test direct array move application against a FEN round trip."""
+    print("\nTest: Apply move to arrays")
+    
+    # Castling both ways, en passant, and capture-promotion
+    fens = [
+        "r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1",
+        "r3k2r/8/8/8/8/8/8/R3K2R b KQkq - 0 1",
+        "4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1",
+        "4k3/8/8/8/3Pp3/8/8/4K3 b - d3 0 1",
+        "1r2k3/P7/8/8/8/8/8/4K3 w - - 0 1",
+        STARTING_FEN,
+    ]
+    for fen in fens:
+        board = chess.Board(fen)
+        piece_arr, color_arr, _ = fen_to_arrays(fen)
+        for move in board.legal_moves:
+            piece_after, color_after = apply_move_to_arrays(
+                piece_arr, color_arr, move,
+                is_castling=board.is_castling(move),
+                is_en_passant=board.is_en_passant(move),
+            )
+            board.push(move)
+            expected_piece, expected_color, _ = fen_to_arrays(board.fen())
+            board.pop()
+            assert np.array_equal(piece_after, expected_piece), f"{fen} {move}"
+            assert np.array_equal(color_after, expected_color), f"{fen} {move}"
+    
+    # The input arrays are left untouched
+    assert np.array_equal(piece_arr, fen_to_arrays(STARTING_FEN)[0])
+    
+    print("✓ Passed")
+
+
+def test_fen_cache_returns_copies():
+    """Test cached FEN parsing hands out private writable arrays."""
+    print("\nTest: FEN cache returns independent copies")
+    
+    piece_arr, color_arr, _ = fen_to_arrays(STARTING_FEN)
+    piece_again, _, _ = fen_to_arrays(STARTING_FEN)
+    
+    assert piece_arr.flags.writeable and color_arr.flags.writeable
+    assert not np.shares_memory(piece_arr, piece_again)
+    
+    # Mutating one result must not corrupt the cached entry
+    piece_arr[0] = PIECE_PAWN
+    assert fen_to_arrays(STARTING_FEN)[0][0] == PIECE_ROOK
+    
+    print("✓ Passed")
+
+
+def test_fen_list_to_arrays():
+    """Test batch FEN parsing matches per-FEN parsing row by row."""
+    print("\nTest: FEN list to batch arrays")
+    
+    fens = [
+        STARTING_FEN,
+        "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1",
+        "4k3/8/8/8/8/8/4P3/4K3 w - - 0 1",
+    ]
+    piece_batch, color_batch, stm_batch = fen_list_to_arrays(fens)
     
-    test_starting_position()
-    test_round_trip()
-    test_custom_position()
-    test_board_2d()
-    test_empty_board()
+    assert piece_batch.shape == color_batch.shape == (3, 64)
+    assert piece_batch.dtype == color_batch.dtype == np.int8
+    assert piece_batch.flags.c_contiguous and color_batch.flags.c_contiguous
+    assert piece_batch.flags.writeable, "Batch arrays are fresh, not cached views"
+    for i, fen in enumerate(fens):
+        piece_arr, color_arr, stm = fen_to_arrays(fen)
+        assert np.array_equal(piece_batch[i], piece_arr)
+        assert np.array_equal(color_batch[i], color_arr)
+        assert stm_batch[i] == stm
     
-    print("\n" + "=" * 60)
-    print("All FEN utility tests passed! ✓")
-    print("=" * 60)
+    print("✓ Passed")
 
 
 if __name__ == "__main__":
-    run_all_tests()
-
+    pytest.main([__file__, "-v"])
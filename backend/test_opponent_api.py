@@ -4,12 +4,19 @@ Test script for opponent API endpoints.
 import requests
 import json
 
+import pytest
+
 BASE_URL = "http://localhost:8000"
 
+# One keep-alive connection pool for every request in the script
+session = requests.Session()
+
+PROFILES = ["random", "aggressive", "defensive", "moderate", "defensive_passive"]
+
 def test_gpu_status():
     """Test GPU status endpoint."""
     print("\n=== Testing GPU Status ===")
-    response = requests.get(f"{BASE_URL}/opponent/gpu-status")
+    response = session.get(f"{BASE_URL}/opponent/gpu-status")
     print(f"Status: {response.status_code}")
     data = response.json()
     print(f"GPU Available: {data['gpu_available']}")
@@ -22,12 +29,12 @@ def test_gpu_toggle():
     print("\n=== Testing GPU Toggle ===")
     
     # Disable GPU
-    response = requests.post(f"{BASE_URL}/opponent/gpu-toggle?enable=false")
+    response = session.post(f"{BASE_URL}/opponent/gpu-toggle?enable=false")
     print(f"Disable GPU - Status: {response.status_code}")
     print(f"Response: {response.json()}")
     
     # Enable GPU
-    response = requests.post(f"{BASE_URL}/opponent/gpu-toggle?enable=true")
+    response = session.post(f"{BASE_URL}/opponent/gpu-toggle?enable=true")
     print(f"Enable GPU - Status: {response.status_code}")
     print(f"Response: {response.json()}")
 
@@ -43,7 +50,7 @@ def test_opponent_move(profile="random"):
         "profile": profile
     }
     
-    response = requests.post(
+    response = session.post(
         f"{BASE_URL}/opponent/move",
         headers={"Content-Type": "application/json"},
         data=json.dumps(payload)
@@ -61,12 +68,10 @@ def test_opponent_move(profile="random"):
     
     return response.json() if response.status_code == 200 else None
 
-def test_all_profiles():
-    """Test all opponent profiles."""
-    profiles = ["random", "aggressive", "defensive", "moderate", "defensive_passive"]
-    
-    for profile in profiles:
-        test_opponent_move(profile)
+@pytest.mark.parametrize("profile", PROFILES)
+def test_all_profiles(profile):
+    """Test each opponent profile."""
+    test_opponent_move(profile)
 
 if __name__ == "__main__":
     print("=" * 60)
@@ -81,7 +86,8 @@ if __name__ == "__main__":
         test_gpu_toggle()
         
         # Test all opponent profiles
-        test_all_profiles()
+        for profile in PROFILES:
+            test_opponent_move(profile)
         
         print("\n" + "=" * 60)
         print("✅ All tests completed!")
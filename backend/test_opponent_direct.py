@@ -2,7 +2,12 @@
 Direct test of opponent AI logic without API server.
 """
 import chess
+import numpy as np
+import pytest
+from app.routers import opponent
 from app.routers.opponent import _select_strategic_move
+from app.engine_core.engine_cpu import EngineCPU
+from app.engine_core.fen_utils import fen_to_arrays
 
 def test_opponent_profiles():
     """Test all opponent profiles."""
@@ -25,6 +30,64 @@ def test_opponent_profiles():
     print("✅ All profiles tested successfully!")
     print("=" * 60)
 
-if __name__ == "__main__":
-    test_opponent_profiles()
 
+def test_evaluation_cache():
+    """Cached candidate scores match direct evaluation, and repeats are not re-evaluated."""
+    opponent._eval_cache.clear()
+    piece_arr, color_arr, _ = fen_to_arrays(chess.Board().fen())
+    empty_piece = np.zeros(64, dtype=np.int8)
+    empty_color = np.full(64, -1, dtype=np.int8)
+    piece_batch = np.stack([piece_arr, empty_piece, piece_arr])
+    color_batch = np.stack([color_arr, empty_color, color_arr])
+    
+    scores = opponent._evaluate_candidates(piece_batch, color_batch)
+    assert scores.shape == (3, 4)
+    for row, piece, color in zip(scores, piece_batch, color_batch):
+        assert tuple(row) == EngineCPU.evaluate(piece, color)
+    # The repeated starting position is stored once
+    assert len(opponent._eval_cache) == 2
+    
+    # A second request for the same positions is served from the cache
+    opponent._eval_cache[piece_arr.tobytes() + color_arr.tobytes()] = np.array([1, 2, 3, 4])
+    assert tuple(opponent._evaluate_candidates(piece_batch[:1], color_batch[:1])[0]) == (1, 2, 3, 4)
+    opponent._eval_cache.clear()
+
+
+def test_score_profiles():
+    """Native profile scores match the per-profile delta formulas, for both sides."""
+    from app.engine_core.opponent_score import PROFILE_IDS, PROFILE_OFFENSIVE, score_profiles
+
+    rng = np.random.default_rng(0)
+    after = rng.integers(0, 500, size=(20, 4))
+    current = rng.integers(0, 500, size=4)
+    delta = after - current
+    for is_white, (my_off, my_def, opp_off, opp_def) in (
+        (True, delta.T),
+        (False, delta[:, [2, 3, 0, 1]].T),
+    ):
+        expected = {
+            PROFILE_IDS["aggressive"]: my_off - opp_off,
+            PROFILE_IDS["defensive"]: my_def - opp_off,
+            PROFILE_IDS["moderate"]: my_off + my_def,
+            PROFILE_IDS["defensive_passive"]: my_def - opp_def,
+            PROFILE_OFFENSIVE: my_off,
+        }
+        for profile_id, scores in expected.items():
+            np.testing.assert_array_equal(score_profiles(after, current, is_white, profile_id), scores)
+
+
+def test_opponent_move_include_san():
+    """SAN is returned by default and skipped when include_san is false."""
+    import asyncio
+
+    fen = chess.Board().fen()
+    for include_san in (True, False):
+        req = opponent.OpponentMoveRequest(fen=fen, profile="moderate", include_san=include_san)
+        resp = asyncio.run(opponent.get_opponent_move(req))
+        move = chess.Move.from_uci(resp.move_uci)
+        assert move in chess.Board().legal_moves
+        assert resp.move_san == (chess.Board().san(move) if include_san else None)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import chess
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+@pytest.fixture(scope="session")
+def client():
+    """One TestClient for the whole run; app startup/shutdown runs once around it."""
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
+def starting_fen() -> str:
+    return chess.STARTING_FEN
+
+
+@pytest.fixture(scope="session")
+def mid_game_fen() -> str:
+    """Position after 1. e4 e5 2. Nf3 Nc6 3. Bb5."""
+    return "r1bqkbnr/pppp1ppp/2n5/1B2p3/4P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3"
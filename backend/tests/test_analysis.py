@@ -1,24 +1,21 @@
 from __future__ import annotations
 
 import chess
-from fastapi.testclient import TestClient
+import pytest
 
-from app.main import app
+FOOLS_MATE_FEN = "rnb1kbnr/pppp1ppp/8/4p3/6Pq/5P2/PPPPP2P/RNBQKBNR w KQkq - 1 3"  # 1. f3 e5 2. g4 Qh4#
 
-client = TestClient(app)
 
-
-def test_health():
+def test_health(client):
     res = client.get("/health")
     assert res.status_code == 200
     assert res.json()["status"] == "ok"
 
 
-def test_analysis_valid_start_position():
-    board = chess.Board()  # starting FEN
+def test_analysis_valid_start_position(client, starting_fen):
     res = client.post(
         "/analysis/",
-        json={"fen": board.fen(), "max_depth": 4},
+        json={"fen": starting_fen, "max_depth": 4},
     )
     assert res.status_code == 200
     data = res.json()
@@ -26,7 +23,7 @@ def test_analysis_valid_start_position():
     assert data["best_move"]["uci"] is not None
 
 
-def test_analysis_invalid_fen():
+def test_analysis_invalid_fen(client):
     res = client.post(
         "/analysis/",
         json={"fen": "invalid fen string", "max_depth": 4},
@@ -35,14 +32,10 @@ def test_analysis_invalid_fen():
     assert "Invalid FEN" in res.json()["detail"]
 
 
-def test_analysis_game_over():
+def test_analysis_game_over(client):
     """Test that game over position returns error"""
     # Fool's mate position
-    board = chess.Board()
-    board.push_san("f3")
-    board.push_san("e5")
-    board.push_san("g4")
-    board.push_san("Qh4")  # Checkmate
+    board = chess.Board(FOOLS_MATE_FEN)
 
     res = client.post(
         "/analysis/",
@@ -52,38 +45,21 @@ def test_analysis_game_over():
     assert "already over" in res.json()["detail"].lower()
 
 
-def test_analysis_different_depths():
+@pytest.mark.parametrize("depth", [1, 20])
+def test_analysis_different_depths(client, starting_fen, depth):
     """Test analysis with different depth values"""
-    board = chess.Board()
-
-    # Test with depth 1
-    res1 = client.post(
-        "/analysis/",
-        json={"fen": board.fen(), "max_depth": 1},
-    )
-    assert res1.status_code == 200
-
-    # Test with depth 20
-    res2 = client.post(
+    res = client.post(
         "/analysis/",
-        json={"fen": board.fen(), "max_depth": 20},
+        json={"fen": starting_fen, "max_depth": depth},
     )
-    assert res2.status_code == 200
+    assert res.status_code == 200
 
 
-def test_analysis_mid_game_position():
+def test_analysis_mid_game_position(client, mid_game_fen):
     """Test analysis of a mid-game position"""
-    # Position after 1. e4 e5 2. Nf3 Nc6 3. Bb5
-    board = chess.Board()
-    board.push_san("e4")
-    board.push_san("e5")
-    board.push_san("Nf3")
-    board.push_san("Nc6")
-    board.push_san("Bb5")
-
     res = client.post(
         "/analysis/",
-        json={"fen": board.fen(), "max_depth": 8},
+        json={"fen": mid_game_fen, "max_depth": 8},
     )
     assert res.status_code == 200
     data = res.json()
@@ -92,12 +68,11 @@ def test_analysis_mid_game_position():
     assert data["best_move"]["san"] is not None
 
 
-def test_analysis_response_structure():
+def test_analysis_response_structure(client, starting_fen):
     """Test that response has correct structure"""
-    board = chess.Board()
     res = client.post(
         "/analysis/",
-        json={"fen": board.fen(), "max_depth": 4},
+        json={"fen": starting_fen, "max_depth": 4},
     )
     assert res.status_code == 200
     data = res.json()
@@ -111,14 +86,12 @@ def test_analysis_response_structure():
     assert "mate" in best_move
 
 
-def test_analysis_caching():
+def test_analysis_caching(client, starting_fen):
     """Test that caching works (if enabled)"""
-    board = chess.Board()
-
     # First request
     res1 = client.post(
         "/analysis/",
-        json={"fen": board.fen(), "max_depth": 4},
+        json={"fen": starting_fen, "max_depth": 4},
     )
     assert res1.status_code == 200
     data1 = res1.json()
@@ -126,7 +99,7 @@ def test_analysis_caching():
     # Second request (should be cached if caching enabled)
     res2 = client.post(
         "/analysis/",
-        json={"fen": board.fen(), "max_depth": 4},
+        json={"fen": starting_fen, "max_depth": 4},
     )
     assert res2.status_code == 200
     data2 = res2.json()
@@ -135,7 +108,7 @@ def test_analysis_caching():
     assert data1 == data2
 
 
-def test_analysis_endgame_position():
+def test_analysis_endgame_position(client):
     """Test analysis of an endgame position"""
     # King and pawn endgame
     fen = "8/8/8/4k3/8/4K3/4P3/8 w - - 0 1"
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# Runs in a fresh interpreter so nothing (e.g. the root conftest's warmup)
+# has touched the engine kernels before the app's own startup does
+_START_STOP_APP = """
+from fastapi.testclient import TestClient
+from app.main import app
+
+with TestClient(app) as client:
+    assert client.get("/health").status_code == 200
+"""
+
+
+def test_app_starts_and_stops_cleanly():
+    """Test that a cold app start (with kernel warmup) and shutdown exits the process"""
+    result = subprocess.run(
+        [sys.executable, "-c", _START_STOP_APP],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import pytest
+
+from app import cache as cache_module
+from app.cache import SimpleCache
+from app.config import settings
+
+
+@pytest.fixture(autouse=True)
+def enable_cache(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_ENABLED", True)
+
+
+def test_cache_set_and_get():
+    """Test that a stored value is returned for the same key"""
+    cache = SimpleCache(max_entries=4, shards=1)
+    cache.set("fen-a", 4, {"uci": "e2e4"})
+    assert cache.get("fen-a", 4) == {"uci": "e2e4"}
+    assert cache.get("fen-a", 5) is None
+    assert cache.get("fen-b", 4) is None
+
+
+def test_cache_disabled(monkeypatch):
+    """Test that nothing is stored or returned when caching is disabled"""
+    monkeypatch.setattr(settings, "CACHE_ENABLED", False)
+    cache = SimpleCache(max_entries=4, shards=1)
+    cache.set("fen-a", 4, "value")
+    assert cache.get("fen-a", 4) is None
+    assert len(cache) == 0
+
+
+def test_cache_evicts_least_recently_used():
+    """Test that the cache stays bounded and evicts the LRU entry first"""
+    cache = SimpleCache(max_entries=2, shards=1)
+    cache.set("fen-a", 1, "a")
+    cache.set("fen-b", 1, "b")
+
+    # Touch "a" so that "b" becomes the least recently used entry
+    assert cache.get("fen-a", 1) == "a"
+    cache.set("fen-c", 1, "c")
+
+    assert len(cache) == 2
+    assert cache.get("fen-b", 1) is None
+    assert cache.get("fen-a", 1) == "a"
+    assert cache.get("fen-c", 1) == "c"
+
+
+def test_cache_expired_entry():
+    """Test that entries older than the TTL are not returned"""
+    cache = SimpleCache(max_entries=4, shards=1)
+    cache.ttl_seconds = -1
+    cache.set("fen-a", 1, "a")
+    assert cache.get("fen-a", 1) is None
+    assert len(cache) == 0
+
+
+def test_cache_evict_expired_sweeps_all_keys():
+    """Test that a sweep removes expired entries that are never looked up"""
+    cache = SimpleCache(max_entries=16, shards=1)
+    for i in range(3):
+        cache.set(f"fen-{i}", 1, i)
+
+    assert cache.evict_expired() == 0
+    cache.ttl_seconds = -1
+    assert cache.evict_expired() == 3
+    assert len(cache) == 0
+
+
+def test_cache_set_sweeps_idle_shards(monkeypatch):
+    """Test that every sweep_interval-th write expires entries in untouched shards"""
+    clock = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: clock[0])
+    cache = SimpleCache(max_entries=256, shards=4)
+    cache.ttl_seconds = 10
+    cache.sweep_interval = 4
+    for i in range(32):
+        cache.set(f"fen-{i}", 1, i)
+    cache._writes = 0
+
+    clock[0] += 20
+    for i in range(3):
+        cache.set("fen-new", 1, i)
+    # Only fen-new's shard has rotated so far
+    assert len(cache) > 1
+    cache.set("fen-new", 1, 3)
+    assert len(cache) == 1
+
+
+def test_cache_generations_expire(monkeypatch):
+    """Test that entries survive one rotation and are dropped on the next"""
+    clock = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: clock[0])
+    cache = SimpleCache(max_entries=16, shards=1)
+    cache.ttl_seconds = 10
+
+    cache.set("fen-a", 1, "a")
+    clock[0] += 6  # past ttl/2: "a" moves to the warm generation
+    assert cache.get("fen-a", 1) == "a"
+
+    cache.set("fen-b", 1, "b")
+    clock[0] += 6  # next rotation drops the warm generation
+    assert cache.get("fen-a", 1) is None
+    assert cache.get("fen-b", 1) == "b"
+
+    clock[0] += 20  # a long idle period expires everything at once
+    assert cache.get("fen-b", 1) is None
+    assert len(cache) == 0
+
+
+def test_cache_never_returns_entry_past_ttl(monkeypatch):
+    """Test that no entry is served at or beyond the TTL, whenever lookups happen"""
+    clock = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: clock[0])
+    cache = SimpleCache(max_entries=1024, shards=1)
+    cache.ttl_seconds = 300
+
+    inserted = {}
+    for step in range(200):
+        # Irregular lookups: rotation only happens when the shard is touched
+        clock[0] += 7 + (step * 13) % 50
+        fen = f"fen-{step}"
+        cache.set(fen, 1, step)
+        inserted[fen] = clock[0]
+        for old_fen, at in inserted.items():
+            if cache.get(old_fen, 1) is not None:
+                assert clock[0] - at < cache.ttl_seconds, f"{old_fen} served at age {clock[0] - at}"
+
+
+def test_cache_key_is_int():
+    """Test that keys are pre-hashed ints that distinguish depth"""
+    cache = SimpleCache()
+    key = cache.make_key("fen-a", 4)
+    assert isinstance(key, int)
+    assert key == cache.make_key("fen-a", 4)
+    assert key != cache.make_key("fen-a", 5)
+
+
+def test_cache_key_collision_is_a_miss(monkeypatch):
+    """Test that a colliding key never returns another position's value"""
+    cache = SimpleCache(max_entries=16, shards=1)
+    monkeypatch.setattr(cache, "make_key", lambda fen, depth: 42)
+    cache.set("fen-a", 1, "a")
+    assert cache.get("fen-b", 1) is None
+    assert cache.get("fen-a", 2) is None
+    assert cache.get("fen-a", 1) == "a"
+
+
+def test_cache_sharded_store():
+    """Test that entries spread across shards are all reachable"""
+    cache = SimpleCache(max_entries=256, shards=4)
+    for i in range(32):
+        cache.set(f"fen-{i}", 1, i)
+    assert len(cache) == 32
+    assert [cache.get(f"fen-{i}", 1) for i in range(32)] == list(range(32))
+
+
+def test_cache_shard_count_must_be_power_of_two():
+    """Test that an invalid shard count is rejected"""
+    with pytest.raises(ValueError):
+        SimpleCache(shards=3)
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import chess
+import pytest
+
+from app.models import (
+    FEN_RE,
+    AnalyzeResponse,
+    MovesResponse,
+    NewSessionResponse,
+    PGNLoadResponse,
+    PGNSaveResponse,
+    SessionStateResponse,
+)
+
+
+@pytest.mark.parametrize(
+    "fen",
+    [
+        pytest.param(chess.STARTING_FEN, id="full"),
+        pytest.param("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR", id="placement_only"),
+        pytest.param("8/8/8/8/8/8/8/K6k b", id="placement_and_turn"),
+        pytest.param("  8/8/8/8/8/8/8/K6k w - - 0 1  ", id="surrounding_whitespace"),
+    ],
+)
+def test_fen_re_accepts(fen):
+    """Test that well-formed FEN strings pass the shape check"""
+    assert FEN_RE.fullmatch(fen) is not None
+
+
+@pytest.mark.parametrize(
+    "fen",
+    [
+        pytest.param("", id="empty"),
+        pytest.param("invalid fen", id="garbage"),
+        pytest.param("8/8/8/8/8/8/8 w", id="seven_ranks"),
+        pytest.param("8/8/8/8/8/8/8/8/8 w", id="nine_ranks"),
+        pytest.param("8/8/8/8/8/8/8/K6x w", id="bad_piece"),
+        pytest.param("8/8/8/8/8/8/8/K6k x", id="bad_turn"),
+        pytest.param("8/8/8/8/8/8/8/K6k w - - 0 1 extra", id="too_many_fields"),
+    ],
+)
+def test_fen_re_rejects(fen):
+    """Test that malformed FEN strings fail the shape check"""
+    assert FEN_RE.fullmatch(fen) is None
+
+
+@pytest.mark.parametrize(
+    "path,body,prefix",
+    [
+        pytest.param("/moves/", {"fen": "invalid fen"}, "Invalid FEN: ", id="fen"),
+        pytest.param(
+            "/pgn/save",
+            {"starting_fen": "invalid fen", "moves_uci": []},
+            "Invalid starting FEN: ",
+            id="starting_fen",
+        ),
+    ],
+)
+def test_malformed_fen_maps_to_400(client, path, body, prefix):
+    """Test that a FEN rejected during validation is a 400 with chess.Board's message"""
+    res = client.post(path, json=body)
+    assert res.status_code == 400
+    assert res.json()["detail"] == prefix + "expected 'w' or 'b' for turn part of fen: 'invalid fen'"
+
+
+def test_other_validation_errors_stay_422(client):
+    """Test that non-FEN validation errors keep FastAPI's 422 response"""
+    res = client.post("/analysis/", json={"fen": chess.STARTING_FEN, "max_depth": 0})
+    assert res.status_code == 422
+
+
+class _FakeEngine:
+    async def analyze(self, board, max_depth):
+        return {"uci": "e2e4", "san": "e4", "score_cp": 25, "mate": None}
+
+
+@pytest.fixture
+def fake_analysis(monkeypatch):
+    """Serve /analysis/ from a fixed engine result and a fresh, enabled cache."""
+    from app.cache import SimpleCache
+    from app.config import settings
+    from app.routers import analysis
+
+    monkeypatch.setattr(analysis, "engine_manager", _FakeEngine())
+    monkeypatch.setattr(analysis, "cache", SimpleCache(max_entries=4, shards=1))
+    monkeypatch.setattr(settings, "CACHE_ENABLED", True)
+
+
+@pytest.mark.parametrize(
+    "method,path,body,model,calls",
+    [
+        pytest.param("post", "/moves/", {"fen": chess.STARTING_FEN, "square": "g1"}, MovesResponse, 1, id="moves"),
+        # The second call is served from the cache
+        pytest.param("post", "/analysis/", {"fen": chess.STARTING_FEN}, AnalyzeResponse, 2, id="analysis"),
+        pytest.param("post", "/pgn/load", {"pgn": "1. e4 e5 2. Nf3"}, PGNLoadResponse, 1, id="pgn_load"),
+        pytest.param("post", "/pgn/save", {"moves_uci": ["e2e4", "e7e5"]}, PGNSaveResponse, 1, id="pgn_save"),
+        pytest.param("post", "/session/new", None, NewSessionResponse, 1, id="session_new"),
+        pytest.param("get", "/session/{session}", None, SessionStateResponse, 1, id="session_get"),
+        pytest.param("post", "/session/{session}/move", {"move_uci": "e7e5"}, SessionStateResponse, 1, id="session_move"),
+        pytest.param("post", "/session/{session}/undo", None, SessionStateResponse, 1, id="session_undo"),
+    ],
+)
+def test_constructed_responses_round_trip(client, fake_analysis, method, path, body, model, calls):
+    """Test responses the routers build without validation are well-typed on the wire"""
+    session_id = client.post("/session/new").json()["session_id"]
+    client.post(f"/session/{session_id}/move", json={"move_uci": "e2e4"}).raise_for_status()
+
+    for _ in range(calls):
+        res = client.request(method, path.format(session=session_id), json=body)
+        assert res.status_code == 200
+        # Strict parsing rejects any field of the wrong JSON type
+        parsed = model.model_validate_json(res.content, strict=True)
+        assert parsed.model_dump(mode="json") == res.json()
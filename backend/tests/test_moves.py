@@ -1,19 +1,16 @@
 from __future__ import annotations
 
 import chess
-from fastapi.testclient import TestClient
 
-from app.main import app
+FOOLS_MATE_FEN = "rnb1kbnr/pppp1ppp/8/4p3/6Pq/5P2/PPPPP2P/RNBQKBNR w KQkq - 1 3"  # 1. f3 e5 2. g4 Qh4#
+RUY_LOPEZ_FEN = "r1bqkbnr/pppp1ppp/2n5/1B2p3/4P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3"  # 1. e4 e5 2. Nf3 Nc6 3. Bb5
 
-client = TestClient(app)
 
-
-def test_moves_starting_position():
+def test_moves_starting_position(client):
     """Test legal moves from starting position"""
-    board = chess.Board()
     res = client.post(
         "/moves/",
-        json={"fen": board.fen()},
+        json={"fen": chess.STARTING_FEN},
     )
     assert res.status_code == 200
     data = res.json()
@@ -28,12 +25,11 @@ def test_moves_starting_position():
     assert "e2e4" in data["moves_uci"]
 
 
-def test_moves_with_square_filter():
+def test_moves_with_square_filter(client):
     """Test filtering moves by from-square"""
-    board = chess.Board()
     res = client.post(
         "/moves/",
-        json={"fen": board.fen(), "square": "e2"},
+        json={"fen": chess.STARTING_FEN, "square": "e2"},
     )
     assert res.status_code == 200
     data = res.json()
@@ -45,7 +41,7 @@ def test_moves_with_square_filter():
     assert "e2e4" in data["moves_uci"]
 
 
-def test_moves_invalid_fen():
+def test_moves_invalid_fen(client):
     """Test error handling for invalid FEN"""
     res = client.post(
         "/moves/",
@@ -55,14 +51,10 @@ def test_moves_invalid_fen():
     assert "Invalid FEN" in res.json()["detail"]
 
 
-def test_moves_game_over():
+def test_moves_game_over(client):
     """Test that game over position returns empty move list"""
     # Fool's mate position
-    board = chess.Board()
-    board.push_san("f3")
-    board.push_san("e5")
-    board.push_san("g4")
-    board.push_san("Qh4")  # Checkmate
+    board = chess.Board(FOOLS_MATE_FEN)
     
     res = client.post(
         "/moves/",
@@ -74,13 +66,12 @@ def test_moves_game_over():
     assert len(data["moves_uci"]) == 0
 
 
-def test_moves_square_with_no_moves():
+def test_moves_square_with_no_moves(client):
     """Test filtering by square that has no legal moves"""
-    board = chess.Board()
     # a1 rook has no legal moves in starting position
     res = client.post(
         "/moves/",
-        json={"fen": board.fen(), "square": "a1"},
+        json={"fen": chess.STARTING_FEN, "square": "a1"},
     )
     assert res.status_code == 200
     data = res.json()
@@ -88,15 +79,9 @@ def test_moves_square_with_no_moves():
     assert len(data["moves_uci"]) == 0
 
 
-def test_moves_complex_position():
+def test_moves_complex_position(client):
     """Test moves in a more complex mid-game position"""
-    # Position after 1. e4 e5 2. Nf3 Nc6 3. Bb5
-    board = chess.Board()
-    board.push_san("e4")
-    board.push_san("e5")
-    board.push_san("Nf3")
-    board.push_san("Nc6")
-    board.push_san("Bb5")
+    board = chess.Board(RUY_LOPEZ_FEN)
     
     res = client.post(
         "/moves/",
@@ -110,4 +95,3 @@ def test_moves_complex_position():
     # Verify some expected moves for Black
     assert "a6" in data["moves_san"]  # Attack the bishop
     assert "Nf6" in data["moves_san"]  # Develop knight
-
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+
+import chess
+import pytest
+from fastapi import HTTPException
+
+from app import session_store as session_store_module
+from app.session_store import MemorySessionStore, RedisSessionStore, SessionState
+
+START = SessionState(fen=chess.STARTING_FEN, moves_uci=[])
+
+
+def _add_move(uci: str):
+    return lambda state: state._replace(moves_uci=state.moves_uci + [uci])
+
+
+def _reject(state: SessionState) -> SessionState:
+    raise HTTPException(status_code=400, detail="Illegal move in this position")
+
+
+@pytest.fixture
+def fake_redis_server():
+    fakeredis = pytest.importorskip("fakeredis")
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def redis_store(monkeypatch, fake_redis_server):
+    """A RedisSessionStore backed by an in-process fake server."""
+    import fakeredis
+
+    monkeypatch.setattr(
+        session_store_module.redis_asyncio,
+        "from_url",
+        lambda url, **kwargs: fakeredis.FakeAsyncRedis(server=fake_redis_server, **kwargs),
+    )
+    return RedisSessionStore("redis://fake", ttl_seconds=60)
+
+
+@pytest.fixture(params=["memory", "redis"])
+def store(request):
+    if request.param == "memory":
+        return MemorySessionStore()
+    return request.getfixturevalue("redis_store")
+
+
+def test_session_store_round_trip(store):
+    """Test a stored session reads back unchanged, and a missing one is None"""
+    state = SessionState(fen=chess.STARTING_FEN, moves_uci=["e2e4"], starting_fen=chess.STARTING_FEN)
+    asyncio.run(store.set("abc", state))
+    assert asyncio.run(store.get("abc")) == state
+    assert asyncio.run(store.get("missing")) is None
+
+
+def test_session_store_update(store):
+    """Test that update applies the function to the stored state, or returns None"""
+    asyncio.run(store.set("abc", START))
+    updated = asyncio.run(store.update("abc", _add_move("e2e4")))
+    assert updated.moves_uci == ["e2e4"]
+    assert asyncio.run(store.get("abc")) == updated
+    assert asyncio.run(store.update("missing", _add_move("e2e4"))) is None
+
+
+def test_session_store_update_error_leaves_state(store):
+    """Test that an exception from the update function propagates and writes nothing"""
+    asyncio.run(store.set("abc", START))
+    with pytest.raises(HTTPException):
+        asyncio.run(store.update("abc", _reject))
+    assert asyncio.run(store.get("abc")) == START
+    # The store is still usable afterwards
+    assert asyncio.run(store.update("abc", _add_move("e2e4"))).moves_uci == ["e2e4"]
+
+
+def test_redis_session_store_retries_on_conflict(redis_store, fake_redis_server):
+    """Test that a write by another worker mid-update makes the update retry on fresh state"""
+    import fakeredis
+
+    other_worker = fakeredis.FakeRedis(server=fake_redis_server, decode_responses=True)
+    seen = []
+
+    def apply(state: SessionState) -> SessionState:
+        seen.append(state.moves_uci)
+        if len(seen) == 1:
+            # Lands between the WATCHed read and MULTI/EXEC
+            other_worker.set("session:abc", RedisSessionStore._encode(_add_move("e2e4")(START)))
+        return _add_move("g1f3")(state)
+
+    asyncio.run(redis_store.set("abc", START))
+    result = asyncio.run(redis_store.update("abc", apply))
+    assert seen == [[], ["e2e4"]]
+    assert result.moves_uci == ["e2e4", "g1f3"]
+    assert asyncio.run(redis_store.get("abc")) == result
+
+
+def test_redis_session_store_sets_expiry(redis_store):
+    """Test that set and update both (re)set the key's TTL"""
+    async def scenario():
+        await redis_store.set("abc", START)
+        after_set = await redis_store._client.ttl("session:abc")
+        await redis_store._client.persist("session:abc")
+        await redis_store.update("abc", _add_move("e2e4"))
+        return after_set, await redis_store._client.ttl("session:abc")
+
+    assert asyncio.run(scenario()) == (60, 60)
@@ -1,14 +1,39 @@
 from __future__ import annotations
 
 import chess
-from fastapi.testclient import TestClient
+import pytest
 
-from app.main import app
+AFTER_E4_FEN = "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1"  # 1. e4
+AFTER_E4_E5_FEN = "rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2"  # 1. e4 e5
+AFTER_E4_C5_FEN = "rnbqkbnr/pp1ppppp/8/2p5/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2"  # 1. e4 c5
+AFTER_E4_E6_FEN = "rnbqkbnr/pppp1ppp/4p3/8/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2"  # 1. e4 e6
 
-client = TestClient(app)
 
+def _post_ok(client, url: str, **kwargs) -> dict:
+    """POST a setup request that must succeed; raises on any error status."""
+    res = client.post(url, **kwargs)
+    res.raise_for_status()
+    return res.json()
 
-def test_session_create():
+
+@pytest.fixture
+def new_session(client):
+    """Factory that creates a fresh session and returns its id."""
+    def _new_session() -> str:
+        return _post_ok(client, "/session/new")["session_id"]
+    return _new_session
+
+
+@pytest.fixture
+def opened_session(client, new_session):
+    """A fresh session with 1. e4 e5 already played; returns its id."""
+    session_id = new_session()
+    for move_uci in ("e2e4", "e7e5"):
+        _post_ok(client, f"/session/{session_id}/move", json={"move_uci": move_uci})
+    return session_id
+
+
+def test_session_create(client):
     """Test creating a new session"""
     res = client.post("/session/new")
     assert res.status_code == 200
@@ -16,36 +41,32 @@ def test_session_create():
     assert "session_id" in data
     assert "fen" in data
     # Should start with standard starting position
-    assert data["fen"] == chess.Board().fen()
+    assert data["fen"] == chess.STARTING_FEN
 
 
-def test_session_get_state():
+def test_session_get_state(client, new_session):
     """Test retrieving session state"""
-    # Create session
-    create_res = client.post("/session/new")
-    session_id = create_res.json()["session_id"]
+    session_id = new_session()
     
     # Get state
     res = client.get(f"/session/{session_id}")
     assert res.status_code == 200
     data = res.json()
     assert data["session_id"] == session_id
-    assert data["fen"] == chess.Board().fen()
+    assert data["fen"] == chess.STARTING_FEN
     assert data["moves_uci"] == []
 
 
-def test_session_get_invalid_id():
+def test_session_get_invalid_id(client):
     """Test error handling for invalid session ID"""
     res = client.get("/session/nonexistent-id")
     assert res.status_code == 404
     assert "not found" in res.json()["detail"].lower()
 
 
-def test_session_make_move():
+def test_session_make_move(client, new_session):
     """Test making a move in a session"""
-    # Create session
-    create_res = client.post("/session/new")
-    session_id = create_res.json()["session_id"]
+    session_id = new_session()
     
     # Make move
     res = client.post(
@@ -53,105 +74,55 @@ def test_session_make_move():
         json={"move_uci": "e2e4"},
     )
     assert res.status_code == 200
-    data = res.json()
-    assert data["session_id"] == session_id
-    assert len(data["moves_uci"]) == 1
-    assert data["moves_uci"][0] == "e2e4"
-    
-    # Verify FEN changed
-    board = chess.Board()
-    board.push_san("e4")
-    assert data["fen"] == board.fen()
+    assert res.json() == {"session_id": session_id, "fen": AFTER_E4_FEN, "moves_uci": ["e2e4"]}
 
 
-def test_session_make_multiple_moves():
+def test_session_make_multiple_moves(client, opened_session):
     """Test making multiple moves in a session"""
-    # Create session
-    create_res = client.post("/session/new")
-    session_id = create_res.json()["session_id"]
-    
-    # Make first move
-    client.post(
-        f"/session/{session_id}/move",
-        json={"move_uci": "e2e4"},
-    )
-    
-    # Make second move
-    res = client.post(
-        f"/session/{session_id}/move",
-        json={"move_uci": "e7e5"},
-    )
+    res = client.get(f"/session/{opened_session}")
     assert res.status_code == 200
-    data = res.json()
-    assert len(data["moves_uci"]) == 2
-    assert data["moves_uci"] == ["e2e4", "e7e5"]
+    assert res.json() == {
+        "session_id": opened_session,
+        "fen": AFTER_E4_E5_FEN,
+        "moves_uci": ["e2e4", "e7e5"],
+    }
+
+
+@pytest.mark.parametrize(
+    "move_uci,accepted",
+    [
+        # e5 for White in starting position; the message could be
+        # "Invalid UCI move" or "Illegal move"
+        pytest.param("e2e5", ("illegal", "invalid"), id="illegal_move"),
+        pytest.param("invalid", ("invalid",), id="invalid_uci"),
+    ],
+)
+def test_session_bad_move(client, new_session, move_uci, accepted):
+    """Test error handling for illegal moves and invalid UCI notation"""
+    session_id = new_session()
 
-
-def test_session_illegal_move():
-    """Test error handling for illegal move"""
-    # Create session
-    create_res = client.post("/session/new")
-    session_id = create_res.json()["session_id"]
-
-    # Try illegal move (e5 for White in starting position)
     res = client.post(
         f"/session/{session_id}/move",
-        json={"move_uci": "e2e5"},
+        json={"move_uci": move_uci},
     )
     assert res.status_code == 400
-    # The error message could be "Invalid UCI move" or "Illegal move"
     detail = res.json()["detail"].lower()
-    assert "illegal" in detail or "invalid" in detail
+    assert any(word in detail for word in accepted)
 
 
-def test_session_invalid_uci():
-    """Test error handling for invalid UCI notation"""
-    # Create session
-    create_res = client.post("/session/new")
-    session_id = create_res.json()["session_id"]
-    
-    # Try invalid UCI
-    res = client.post(
-        f"/session/{session_id}/move",
-        json={"move_uci": "invalid"},
-    )
-    assert res.status_code == 400
-    assert "invalid" in res.json()["detail"].lower()
-
-
-def test_session_undo():
+def test_session_undo(client, opened_session):
     """Test undoing a move"""
-    # Create session and make moves
-    create_res = client.post("/session/new")
-    session_id = create_res.json()["session_id"]
-    
-    client.post(
-        f"/session/{session_id}/move",
-        json={"move_uci": "e2e4"},
-    )
-    client.post(
-        f"/session/{session_id}/move",
-        json={"move_uci": "e7e5"},
-    )
+    session_id = opened_session
     
     # Undo last move
     res = client.post(f"/session/{session_id}/undo")
     assert res.status_code == 200
-    data = res.json()
-    assert len(data["moves_uci"]) == 1
-    assert data["moves_uci"] == ["e2e4"]
-    
-    # Verify FEN is correct
-    board = chess.Board()
-    board.push_san("e4")
-    assert data["fen"] == board.fen()
+    assert res.json() == {"session_id": session_id, "fen": AFTER_E4_FEN, "moves_uci": ["e2e4"]}
 
 
-def test_session_undo_empty():
+def test_session_undo_empty(client, new_session):
     """Test error handling when undoing with no moves"""
-    # Create session
-    create_res = client.post("/session/new")
-    session_id = create_res.json()["session_id"]
+    session_id = new_session()
     
     # Try to undo with no moves
     res = client.post(f"/session/{session_id}/undo")
@@ -159,44 +130,46 @@ def test_session_undo_empty():
     assert "no moves" in res.json()["detail"].lower()
 
 
-def test_session_undo_multiple():
+def test_session_undo_multiple(client, opened_session):
     """Test undoing multiple moves"""
-    # Create session and make moves
-    create_res = client.post("/session/new")
-    session_id = create_res.json()["session_id"]
-    
-    client.post(f"/session/{session_id}/move", json={"move_uci": "e2e4"})
-    client.post(f"/session/{session_id}/move", json={"move_uci": "e7e5"})
-    client.post(f"/session/{session_id}/move", json={"move_uci": "g1f3"})
+    session_id = opened_session
+    _post_ok(client, f"/session/{session_id}/move", json={"move_uci": "g1f3"})
     
     # Undo twice
-    client.post(f"/session/{session_id}/undo")
+    _post_ok(client, f"/session/{session_id}/undo")
     res = client.post(f"/session/{session_id}/undo")
     
     assert res.status_code == 200
-    data = res.json()
-    assert len(data["moves_uci"]) == 1
-    assert data["moves_uci"] == ["e2e4"]
+    assert res.json() == {"session_id": session_id, "fen": AFTER_E4_FEN, "moves_uci": ["e2e4"]}
 
 
-def test_session_move_after_undo():
-    """Test making a move after undo"""
-    # Create session and make moves
-    create_res = client.post("/session/new")
-    session_id = create_res.json()["session_id"]
-    
-    client.post(f"/session/{session_id}/move", json={"move_uci": "e2e4"})
-    client.post(f"/session/{session_id}/move", json={"move_uci": "e7e5"})
-    
-    # Undo
-    client.post(f"/session/{session_id}/undo")
+@pytest.mark.parametrize(
+    "reply,fen",
+    [("c7c5", AFTER_E4_C5_FEN), ("e7e6", AFTER_E4_E6_FEN)],
+)
+def test_session_move_after_undo(client, opened_session, reply, fen):
+    """Test making a different move after undo"""
+    session_id = opened_session
+    _post_ok(client, f"/session/{session_id}/undo")
     
-    # Make different move
     res = client.post(
         f"/session/{session_id}/move",
-        json={"move_uci": "c7c5"},
+        json={"move_uci": reply},
     )
     assert res.status_code == 200
-    data = res.json()
-    assert data["moves_uci"] == ["e2e4", "c7c5"]
+    assert res.json() == {"session_id": session_id, "fen": fen, "moves_uci": ["e2e4", reply]}
+
+
+def test_session_undo_replays_from_starting_fen(client):
+    """Test that undo rebuilds the position from the session's own starting FEN"""
+    import asyncio
 
+    from app.session_store import SessionState, session_store
+
+    asyncio.run(session_store.set(
+        "from-e4",
+        SessionState(fen=AFTER_E4_E5_FEN, moves_uci=["e7e5"], starting_fen=AFTER_E4_FEN),
+    ))
+    res = client.post("/session/from-e4/undo")
+    assert res.status_code == 200
+    assert res.json() == {"session_id": "from-e4", "fen": AFTER_E4_FEN, "moves_uci": []}
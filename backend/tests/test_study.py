@@ -1,68 +1,45 @@
 from __future__ import annotations
 
 import chess
-from fastapi.testclient import TestClient
+import pytest
 
-from app.main import app
+ITALIAN_FEN = "r1bqk1nr/pppp1ppp/2n5/2b1p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4"  # 1. e4 e5 2. Nf3 Nc6 3. Bc4 Bc5
+SCANDINAVIAN_FEN = "rnbqkbnr/ppp1pppp/8/3p4/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2"  # 1. e4 d5
+PROMOTION_FEN = "7k/4P3/8/8/8/8/8/7K w - - 0 1"  # White pawn on e7, Black king on h8
+TWO_KNIGHTS_FEN = "rnbqkbnr/pppppppp/8/8/8/2N2N2/PPPPPPPP/R1BQKB1R w KQkq - 0 1"  # Nc3 and Nf3 both reach d4
 
-client = TestClient(app)
-
-
-def test_study_check_valid_move():
-    """Test validating a legal SAN move"""
-    board = chess.Board()
-    res = client.post(
-        "/study/check",
-        json={"fen": board.fen(), "san": "e4"},
-    )
-    assert res.status_code == 200
-    data = res.json()
-    assert data["valid"] is True
-    assert data["reason"] is None
-
-
-def test_study_check_valid_knight_move():
-    """Test validating a legal knight move"""
-    board = chess.Board()
-    res = client.post(
-        "/study/check",
-        json={"fen": board.fen(), "san": "Nf3"},
-    )
-    assert res.status_code == 200
-    data = res.json()
-    assert data["valid"] is True
-    assert data["reason"] is None
-
-
-def test_study_check_invalid_move():
-    """Test validating an illegal move"""
-    board = chess.Board()
+# (fen, san, expected valid, substring expected in the reason; None when valid)
+STUDY_CHECK_CASES = [
+    pytest.param(chess.STARTING_FEN, "e4", True, None, id="valid_move"),
+    pytest.param(chess.STARTING_FEN, "Nf3", True, None, id="valid_knight_move"),
     # e5 is illegal for White in starting position
-    res = client.post(
-        "/study/check",
-        json={"fen": board.fen(), "san": "e5"},
-    )
-    assert res.status_code == 200
-    data = res.json()
-    assert data["valid"] is False
-    assert data["reason"] is not None
-    assert "not legal" in data["reason"].lower()
+    pytest.param(chess.STARTING_FEN, "e5", False, "not legal", id="invalid_move"),
+    pytest.param(chess.STARTING_FEN, "xyz123", False, "", id="malformed_san"),
+    pytest.param(ITALIAN_FEN, "O-O", True, None, id="castling"),
+    pytest.param(SCANDINAVIAN_FEN, "exd5", True, None, id="capture"),
+    pytest.param(PROMOTION_FEN, "e8=Q", True, None, id="promotion"),
+    # Nfd4: the knight from f3, disambiguated from the one on c3
+    pytest.param(TWO_KNIGHTS_FEN, "Nfd4", True, None, id="ambiguous_move"),
+]
 
 
-def test_study_check_malformed_san():
-    """Test validating malformed SAN notation"""
-    board = chess.Board()
+@pytest.mark.parametrize("fen,san,valid,reason", STUDY_CHECK_CASES)
+def test_study_check(client, fen, san, valid, reason):
+    """Test validating a SAN move in a position"""
     res = client.post(
         "/study/check",
-        json={"fen": board.fen(), "san": "xyz123"},
+        json={"fen": fen, "san": san},
     )
     assert res.status_code == 200
     data = res.json()
-    assert data["valid"] is False
-    assert data["reason"] is not None
+    assert data["valid"] is valid
+    if reason is None:
+        assert data["reason"] is None
+    else:
+        assert reason in data["reason"].lower()
 
 
-def test_study_check_invalid_fen():
+def test_study_check_invalid_fen(client):
     """Test error handling for invalid FEN"""
     res = client.post(
         "/study/check",
@@ -70,72 +47,3 @@ def test_study_check_invalid_fen():
     )
     assert res.status_code == 400
     assert "Invalid FEN" in res.json()["detail"]
-
-
-def test_study_check_castling():
-    """Test validating castling moves"""
-    # Set up position where castling is legal
-    board = chess.Board()
-    board.push_san("e4")
-    board.push_san("e5")
-    board.push_san("Nf3")
-    board.push_san("Nc6")
-    board.push_san("Bc4")
-    board.push_san("Bc5")
-    
-    # White can castle kingside
-    res = client.post(
-        "/study/check",
-        json={"fen": board.fen(), "san": "O-O"},
-    )
-    assert res.status_code == 200
-    data = res.json()
-    assert data["valid"] is True
-
-
-def test_study_check_capture():
-    """Test validating a capture move"""
-    # Set up position with a capture available
-    board = chess.Board()
-    board.push_san("e4")
-    board.push_san("d5")
-    
-    # White can capture with exd5
-    res = client.post(
-        "/study/check",
-        json={"fen": board.fen(), "san": "exd5"},
-    )
-    assert res.status_code == 200
-    data = res.json()
-    assert data["valid"] is True
-
-
-def test_study_check_promotion():
-    """Test validating a pawn promotion move"""
-    # Set up position where promotion is possible
-    # White pawn on e7, Black king on h8
-    fen = "7k/4P3/8/8/8/8/8/7K w - - 0 1"
-    
-    res = client.post(
-        "/study/check",
-        json={"fen": fen, "san": "e8=Q"},
-    )
-    assert res.status_code == 200
-    data = res.json()
-    assert data["valid"] is True
-
-
-def test_study_check_ambiguous_move():
-    """Test validating moves that require disambiguation"""
-    # Position with two knights that can move to same square
-    fen = "rnbqkbnr/pppppppp/8/8/8/2N2N2/PPPPPPPP/R1BQKB1R w KQkq - 0 1"
-    
-    # Nfd4 should be valid (knight from f3 to d4)
-    res = client.post(
-        "/study/check",
-        json={"fen": fen, "san": "Nfd4"},
-    )
-    assert res.status_code == 200
-    data = res.json()
-    assert data["valid"] is True
-